@@ -16,7 +16,6 @@ import json
 import openai
 import os
 from pydantic import ValidationError
-import re
 
 from .config import algolia_config
 from .models import (
@@ -30,6 +29,7 @@ from .models import (
     AlgoliaToolRecord,
 )
 from ..logger import logger
+from ..services.keyword_engine import keyword_engine
 
 
 class AlgoliaSearch:
@@ -190,84 +190,6 @@ class AlgoliaSearch:
         Returns:
             List of relevant keywords for search
         """
-        # Common stopwords to filter out
-        stopwords = {
-            "a",
-            "an",
-            "the",
-            "and",
-            "or",
-            "but",
-            "if",
-            "then",
-            "else",
-            "when",
-            "at",
-            "from",
-            "by",
-            "for",
-            "with",
-            "about",
-            "against",
-            "between",
-            "into",
-            "through",
-            "during",
-            "before",
-            "after",
-            "above",
-            "below",
-            "to",
-            "of",
-            "in",
-            "on",
-            "off",
-            "over",
-            "under",
-            "again",
-            "further",
-            "then",
-            "once",
-            "here",
-            "there",
-            "where",
-            "why",
-            "how",
-            "all",
-            "any",
-            "both",
-            "each",
-            "few",
-            "more",
-            "most",
-            "other",
-            "some",
-            "such",
-            "no",
-            "nor",
-            "not",
-            "only",
-            "own",
-            "same",
-            "so",
-            "than",
-            "too",
-            "very",
-            "can",
-            "will",
-            "just",
-            "should",
-            "now",
-            "tool",
-            "tools",
-            "ai",
-            "intelligence",
-            "artificial",
-            "model",
-            "models",
-            "system",
-        }
-
         # Extract only user messages as these contain the intent
         user_messages = [
             msg["content"] for msg in messages if msg.get("role") == "user"
@@ -278,30 +200,11 @@ class AlgoliaSearch:
 
         # Focus on the last 3 messages, with more weight on the most recent
         recent_messages = user_messages[-3:]
+        weights = [0.5, 0.75, 1.0][-len(recent_messages) :]
 
-        # Combine messages with more weight to more recent ones
-        weights = [0.5, 0.75, 1.0]
-        weighted_text = ""
-
-        for i, msg in enumerate(recent_messages):
-            if i < len(weights):
-                # Repeat more recent messages to give them more weight
-                repeats = int(weights[i] * 10)
-                weighted_text += " " + " ".join([msg] * repeats)
-            else:
-                weighted_text += " " + msg
-
-        # Extract words, normalize
-        words = re.findall(r"\b[a-zA-Z0-9_-]{3,}\b", weighted_text.lower())
-
-        # Remove stopwords and duplicates while preserving order
-        filtered_words = []
-        seen = set()
-
-        for word in words:
-            if word not in stopwords and word not in seen:
-                filtered_words.append(word)
-                seen.add(word)
+        filtered_words = keyword_engine.extract_weighted(
+            list(zip(recent_messages, weights)), limit=None
+        )
 
         # Check for synonyms and add them
         extended_keywords = []
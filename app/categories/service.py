@@ -10,6 +10,7 @@ import json
 from .models import Category, CategoryResponse
 from ..logger import logger
 from ..database import database
+from ..services.facets_service import facet_counter
 
 
 class CategoriesService:
@@ -95,6 +96,21 @@ class CategoriesService:
 
         return None
 
+    async def _tool_count(self, category: Dict[str, Any]) -> int:
+        """
+        Get the number of tools in a category from the in-memory facet counts
+
+        Args:
+            category: The category document
+
+        Returns:
+            The tool count, or the stored count until the facet counts are loaded
+        """
+        await facet_counter.refresh_if_stale()
+        if facet_counter.loaded:
+            return facet_counter.category_count(category["id"])
+        return category.get("count", 0)
+
     async def _get_tools_collection(self) -> AsyncIOMotorCollection:
         """Get the tools collection"""
         if self.tools_collection is None:
@@ -140,7 +156,7 @@ class CategoriesService:
                         id=cat["id"],
                         name=cat["name"],
                         slug=cat["slug"],
-                        count=cat.get("count", 0),
+                        count=await self._tool_count(cat),
                         svg=await self._get_svg_path(cat["id"], cat.get("svg")),
                     )
                     for cat in categories_list
@@ -165,10 +181,8 @@ class CategoriesService:
                     and "name" in category
                     and "id" in category
                 ):
-                    # Get count of tools in this category using aggregation
-                    count = await tools_collection.count_documents(
-                        {"categories.id": category["id"]}
-                    )
+                    # Get count of tools in this category from the facet counts
+                    count = await self._tool_count(category)
 
                     # Create category response
                     cat_name = category["name"]
@@ -252,7 +266,7 @@ class CategoriesService:
                     id=category["id"],
                     name=category["name"],
                     slug=category["slug"],
-                    count=category.get("count", 0),
+                    count=await self._tool_count(category),
                     svg=await self._get_svg_path(category["id"], category.get("svg")),
                 )
 
@@ -291,7 +305,7 @@ class CategoriesService:
                     id=category["id"],
                     name=category["name"],
                     slug=category["slug"],
-                    count=category.get("count", 0),
+                    count=await self._tool_count(category),
                     svg=await self._get_svg_path(category["id"], category.get("svg")),
                 )
 
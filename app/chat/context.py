@@ -0,0 +1,236 @@
+# app/chat/context.py
+"""
+Context window builder for chat turns
+Picks the history sent to the LLM so every prompt stays within a per-model
+token budget
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from .models import ChatModelType, MessageRole
+from ..logger import logger
+
+# Most recent messages considered for one turn, whatever their size
+CHAT_CONTEXT_MAX_MESSAGES = int(os.getenv("CHAT_CONTEXT_MAX_MESSAGES", "50"))
+
+# History token budget per model. It covers the messages (and the rolling
+# summary), not the system prompt or the reply.
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "4000"))
+MODEL_CONTEXT_BUDGETS = {
+    ChatModelType.GPT_4.value: int(
+        os.getenv("CHAT_CONTEXT_BUDGET_GPT", str(CHAT_CONTEXT_TOKEN_BUDGET))
+    ),
+    ChatModelType.CLAUDE.value: int(
+        os.getenv("CHAT_CONTEXT_BUDGET_CLAUDE", str(CHAT_CONTEXT_TOKEN_BUDGET))
+    ),
+    ChatModelType.LLAMA.value: int(os.getenv("CHAT_CONTEXT_BUDGET_LLAMA", "2000")),
+}
+
+# When enabled, turns that no longer fit (or fall out of the most recent
+# messages) are replaced by a rolling summary cached on the session and
+# refreshed in the background after the turn
+CHAT_CONTEXT_SUMMARIES = os.getenv("CHAT_CONTEXT_SUMMARIES", "false").lower() == "true"
+CHAT_CONTEXT_SUMMARY_MAX_TOKENS = int(
+    os.getenv("CHAT_CONTEXT_SUMMARY_MAX_TOKENS", "300")
+)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Estimate the number of tokens in a text string"""
+    # Simple estimate: ~4 characters per token
+    return len(text or "") // 4 + 1
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Return the token count stored on a message, estimating it for older messages"""
+    tokens = message.get("tokens")
+    if isinstance(tokens, int):
+        return tokens
+    return count_tokens(message.get("content"))
+
+
+def context_budget(model_type: Any) -> int:
+    """Return the history token budget for a model"""
+    model = getattr(model_type, "value", model_type)
+    return MODEL_CONTEXT_BUDGETS.get(model, CHAT_CONTEXT_TOKEN_BUDGET)
+
+
+class ChatContextBuilder:
+    """Builds the message list for one chat turn within a token budget"""
+
+    def __init__(
+        self,
+        max_messages: int = 50,
+        summaries: bool = False,
+        summary_max_tokens: int = 300,
+    ):
+        self.max_messages = max_messages
+        self.summaries = summaries
+        self.summary_max_tokens = summary_max_tokens
+        # Sessions with a summary refresh in flight in this process
+        self._refreshing: Set[str] = set()
+
+    def select(
+        self, messages: List[Dict[str, Any]], budget: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Pick the newest messages that fit in the budget.
+
+        Args:
+            messages: Candidate messages, oldest first
+            budget: Token budget for the selected messages
+
+        Returns:
+            The selected messages, oldest first. The newest message is always
+            included, even when it alone exceeds the budget.
+        """
+        selected = []
+        used = 0
+        for message in reversed(messages):
+            tokens = message_tokens(message)
+            if selected and used + tokens > budget:
+                break
+            selected.append(message)
+            used += tokens
+        selected.reverse()
+        return selected
+
+    async def build(
+        self, chat_db, session: Dict[str, Any], model_type: Any
+    ) -> List[Dict[str, str]]:
+        """
+        Build the messages to send to the LLM for a session.
+
+        Walks the history newest-first until the model's budget is used up.
+        With summaries enabled, a cached summary of older turns takes the
+        place of the ones that were left out, as a system message. Turns left
+        out that the summary does not cover yet are folded into it in the
+        background.
+
+        Args:
+            chat_db: ChatDB (or MockDB) for the session
+            session: The chat session document
+            model_type: Model the turn is sent to
+
+        Returns:
+            List of {"role", "content"} messages, oldest first
+        """
+        session_id = str(session["_id"])
+        # One message past the window shows whether older turns exist
+        recent = await chat_db.get_recent_messages(
+            session_id, limit=self.max_messages + 1
+        )
+        history = [
+            message
+            for message in recent[-self.max_messages :]
+            if message["role"] != MessageRole.SYSTEM
+        ]
+        older = [
+            message
+            for message in recent[: -self.max_messages]
+            if message["role"] != MessageRole.SYSTEM
+        ]
+
+        budget = context_budget(model_type)
+        selected = self.select(history, budget)
+
+        # The summary only takes budget when older turns are missing from
+        # the window, either cut here or beyond the max_messages kept
+        summary = session.get("context_summary") if self.summaries else None
+        if summary and (older or len(selected) < len(history)):
+            selected = self.select(history, budget - summary.get("tokens", 0))
+        else:
+            summary = None
+        left_out = older + history[: len(history) - len(selected)]
+
+        formatted = [
+            {"role": message["role"], "content": message["content"]}
+            for message in selected
+        ]
+        if summary:
+            formatted.insert(
+                0,
+                {
+                    "role": MessageRole.SYSTEM,
+                    "content": SUMMARY_PREFIX + summary["text"],
+                },
+            )
+        if not self.summaries or not left_out or not selected:
+            return formatted
+
+        # Fold turns that left the window into the summary for later turns,
+        # including the ones pushed out by newer messages rather than cut
+        session_summary = session.get("context_summary")
+        through = session_summary.get("through") if session_summary else None
+        if (through is None or left_out[-1]["timestamp"] > through) and (
+            session_id not in self._refreshing
+        ):
+            self._refreshing.add(session_id)
+            asyncio.create_task(
+                self._refresh_summary(
+                    chat_db, session_id, session_summary, selected[0]["timestamp"]
+                )
+            )
+        return formatted
+
+    async def _refresh_summary(
+        self,
+        chat_db,
+        session_id: str,
+        summary: Optional[Dict[str, Any]],
+        before: Any,
+    ) -> None:
+        """
+        Fold the turns between the summary and the window into the summary.
+
+        At most max_messages turns are folded per refresh, oldest first; a
+        longer gap is caught up over the following turns.
+        """
+        from .llm_service import llm_service
+
+        try:
+            messages = await chat_db.get_messages_between(
+                session_id,
+                summary.get("through") if summary else None,
+                before,
+                limit=self.max_messages,
+            )
+            turns = [
+                {"role": m["role"], "content": m["content"]}
+                for m in messages
+                if m["role"] != MessageRole.SYSTEM
+            ]
+            if not turns:
+                return
+            text = await llm_service.summarize_conversation(
+                turns,
+                previous_summary=summary["text"] if summary else None,
+                max_tokens=self.summary_max_tokens,
+            )
+            if not text:
+                return
+            await chat_db.update_session(
+                session_id,
+                {
+                    "context_summary": {
+                        "text": text,
+                        "tokens": count_tokens(text),
+                        "through": messages[-1]["timestamp"],
+                    }
+                },
+            )
+        except Exception as e:
+            logger.error(f"Error refreshing chat summary for {session_id}: {str(e)}")
+        finally:
+            self._refreshing.discard(session_id)
+
+
+# Create singleton instance
+context_builder = ChatContextBuilder(
+    max_messages=CHAT_CONTEXT_MAX_MESSAGES,
+    summaries=CHAT_CONTEXT_SUMMARIES,
+    summary_max_tokens=CHAT_CONTEXT_SUMMARY_MAX_TOKENS,
+)
@@ -11,10 +11,35 @@ import datetime
 from typing import Dict, List, Optional, Any
 import os
 
+from .context import count_tokens
+
 
 # Check for test mode
 TEST_MODE = os.getenv("TEST_MODE", "false").lower() == "true"
 
+# Message kinds, stored on every message when it is written so readers can
+# filter in the query instead of inspecting message content. Messages also
+# store their token count ("tokens") for the context builder.
+MESSAGE_KIND_CHAT = "chat"
+MESSAGE_KIND_TOOL_SUMMARY = "tool_summary"
+
+# Assistant messages starting with this are Algolia tool summaries
+TOOL_SUMMARY_PREFIX = "Hey! Great News!"
+
+# Matches every message except tool summaries, including any message written
+# before kinds existed that the startup backfill has not reached yet
+VISIBLE_MESSAGE_FILTER = {"kind": {"$ne": MESSAGE_KIND_TOOL_SUMMARY}}
+
+
+def classify_message(message_data: Dict[str, Any]) -> str:
+    """Return the kind of a message from its role and content"""
+    content = message_data.get("content") or ""
+    if message_data.get("role") == "assistant" and content.startswith(
+        TOOL_SUMMARY_PREFIX
+    ):
+        return MESSAGE_KIND_TOOL_SUMMARY
+    return MESSAGE_KIND_CHAT
+
 
 # Get MongoDB collections
 def get_chat_sessions_collection() -> AsyncIOMotorCollection:
@@ -93,6 +118,8 @@ class ChatDB:
         # Add timestamp if not present
         if "timestamp" not in message_data:
             message_data["timestamp"] = datetime.datetime.utcnow()
+        message_data["kind"] = classify_message(message_data)
+        message_data["tokens"] = count_tokens(message_data.get("content"))
 
         # Insert into database
         result = await self.messages.insert_one(message_data)
@@ -107,30 +134,71 @@ class ChatDB:
     async def get_messages(
         self, session_id: str, limit: int = 100, skip: int = 0
     ) -> List[Dict[str, Any]]:
-        """Get messages for a chat session, ordered by timestamp"""
-        # First fetch all messages ordered by timestamp
-        cursor = self.messages.find({"chat_id": ObjectId(session_id)}).sort(
-            "timestamp", 1
+        """
+        Get messages for a chat session, ordered by timestamp.
+
+        Tool summary messages are left out. Filtering, skip and limit all run
+        in MongoDB on the (chat_id, timestamp) index.
+        """
+        cursor = (
+            self.messages.find(
+                {"chat_id": ObjectId(session_id), **VISIBLE_MESSAGE_FILTER}
+            )
+            .sort("timestamp", 1)
+            .skip(skip)
+            .limit(limit)
         )
+        return await cursor.to_list(length=limit)
 
-        # Convert to list so we can filter
-        all_messages = await cursor.to_list(length=None)
-
-        # Filter out Algolia tool messages
-        filtered_messages = []
-        for message in all_messages:
-            print(f"message: {message}")
-            content = message.get("content", "")
-            # Skip Algolia summary messages which have this specific format
-            if message.get("role") == "assistant" and content.startswith(
-                "Hey! Great News!"
-            ):
-                pass
-            else:
-                filtered_messages.append(message)
-
-        # Apply skip and limit to the filtered list
-        return filtered_messages[skip : skip + limit]
+    async def get_recent_messages(
+        self, session_id: str, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the last messages of a chat session, oldest first.
+
+        Scans the (chat_id, timestamp) index backwards, so the cost depends on
+        limit rather than on the length of the session. Used to build LLM
+        context.
+        """
+        cursor = (
+            self.messages.find(
+                {"chat_id": ObjectId(session_id), **VISIBLE_MESSAGE_FILTER}
+            )
+            .sort("timestamp", -1)
+            .limit(limit)
+        )
+        messages = await cursor.to_list(length=limit)
+        messages.reverse()
+        return messages
+
+    async def get_messages_between(
+        self,
+        session_id: str,
+        after: Optional[datetime.datetime],
+        before: datetime.datetime,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the oldest messages of a session in a time range, oldest first.
+
+        Both bounds are exclusive; after=None starts at the first message.
+        Used to fold older turns into the rolling context summary.
+        """
+        timestamp = {"$lt": before}
+        if after is not None:
+            timestamp["$gt"] = after
+        cursor = (
+            self.messages.find(
+                {
+                    "chat_id": ObjectId(session_id),
+                    "timestamp": timestamp,
+                    **VISIBLE_MESSAGE_FILTER,
+                }
+            )
+            .sort("timestamp", 1)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
 
     async def get_user_sessions(
         self, user_id: str, limit: int = 20, skip: int = 0
@@ -259,6 +327,8 @@ class MockDB:
         # Add timestamp if not present
         if "timestamp" not in message:
             message["timestamp"] = datetime.datetime.utcnow()
+        message["kind"] = classify_message(message)
+        message["tokens"] = count_tokens(message.get("content"))
 
         # Store message
         self.chat_messages[message_id] = message
@@ -276,30 +346,44 @@ class MockDB:
         self, session_id: str, limit: int = 100, skip: int = 0
     ) -> List[Dict[str, Any]]:
         """Get messages for a chat session, ordered by timestamp"""
-        # Filter messages by session
+        filtered_messages = self._visible_messages(session_id)
+
+        # Apply skip and limit
+        return filtered_messages[skip : skip + limit]
+
+    async def get_recent_messages(
+        self, session_id: str, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Get the last messages of a chat session, oldest first"""
+        if limit <= 0:
+            return []
+        return self._visible_messages(session_id)[-limit:]
+
+    async def get_messages_between(
+        self,
+        session_id: str,
+        after: Optional[datetime.datetime],
+        before: datetime.datetime,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Get the oldest messages of a session in a time range, oldest first"""
+        return [
+            msg
+            for msg in self._visible_messages(session_id)
+            if (after is None or msg["timestamp"] > after)
+            and msg["timestamp"] < before
+        ][:limit]
+
+    def _visible_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """Messages of a session without tool summaries, ordered by timestamp"""
         session_messages = [
             msg
             for msg in self.chat_messages.values()
             if str(msg.get("chat_id")) == str(session_id)
+            and msg.get("kind") != MESSAGE_KIND_TOOL_SUMMARY
         ]
-
-        # Sort by timestamp
         session_messages.sort(key=lambda x: x.get("timestamp", datetime.datetime.min))
-
-        # Filter out Algolia tool messages
-        filtered_messages = []
-        for message in session_messages:
-            content = message.get("content", "")
-            # Skip Algolia summary messages which have this specific format
-            if message.get("role") == "assistant" and content.startswith(
-                "Hey! Great News! I have found Plenty of tools"
-            ):
-                continue
-
-            filtered_messages.append(message)
-
-        # Apply skip and limit
-        return filtered_messages[skip : skip + limit]
+        return session_messages
 
     async def get_user_sessions(
         self, user_id: str, limit: int = 20, skip: int = 0
@@ -12,6 +12,7 @@ import openai
 import re
 
 from app.tools.tools_service import get_keywords as tools_get_keywords
+from .context import count_tokens
 from .models import ChatModelType, MessageRole
 from ..logger import logger
 import aiohttp
@@ -561,18 +562,23 @@ class LLMService:
             # Prepare the messages list
             formatted_messages = []
 
-            # Add the chat history
+            # Set system prompt
+            sys_prompt = system_prompt if system_prompt else DEFAULT_SYSTEM_PROMPT
+
+            # Add the chat history. The messages array only takes user and
+            # assistant turns, so system entries (the session prompt, the
+            # rolling context summary) are appended to the system prompt.
             for msg in messages:
-                formatted_messages.append(
-                    {"role": msg["role"], "content": msg["content"]}
-                )
+                if msg["role"] == "system":
+                    sys_prompt = f"{sys_prompt}\n\n{msg['content']}"
+                else:
+                    formatted_messages.append(
+                        {"role": msg["role"], "content": msg["content"]}
+                    )
 
             # Get the model to use
             model = self.model_map[ChatModelType.CLAUDE]
 
-            # Set system prompt
-            sys_prompt = system_prompt if system_prompt else DEFAULT_SYSTEM_PROMPT
-
             # Make the API call using httpx
             async with httpx.AsyncClient(timeout=60.0) as client:
                 response = await client.post(
@@ -636,8 +642,44 @@ class LLMService:
 
     def estimate_tokens(self, text: str) -> int:
         """Estimate the number of tokens in a text string"""
-        # Simple estimate: ~4 characters per token
-        return len(text) // 4 + 1
+        return count_tokens(text)
+
+    async def summarize_conversation(
+        self,
+        messages: List[Dict[str, str]],
+        previous_summary: Optional[str] = None,
+        max_tokens: int = 300,
+    ) -> Optional[str]:
+        """
+        Summarize chat turns for the rolling context summary.
+
+        Args:
+            messages: Turns to fold into the summary, oldest first
+            previous_summary: Summary of the turns before them, if any
+            max_tokens: Maximum length of the summary
+
+        Returns:
+            The updated summary, or None if no summarization model is configured
+        """
+        if not self.openai_api_key:
+            return None
+
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        if previous_summary:
+            transcript = f"Earlier summary:\n{previous_summary}\n\n{transcript}"
+
+        return await self._get_openai_response(
+            messages=[{"role": MessageRole.USER, "content": transcript}],
+            model=os.getenv("DEFAULT_LLM_MODEL", "gpt-4o-mini"),
+            system_prompt=(
+                "Summarize this conversation between a user and an AI tool "
+                "discovery assistant. Keep the user's business, needs, "
+                "preferences and any keywords or tools already discussed. "
+                "Be brief and factual."
+            ),
+            temperature=0,
+            max_tokens=max_tokens,
+        )
 
     async def analyze_for_tool_search(self, messages, system_prompt=None):
         keywords = await get_keywords()
@@ -21,6 +21,7 @@ from .models import (
     MessageRole,
     ChatModelType,
 )
+from .context import context_builder
 from .database import ChatDB, get_chat_db
 from .llm_service import llm_service
 from ..logger import logger
@@ -219,20 +220,12 @@ async def stream_chat_message(
         # Get system prompt from session
         system_prompt = session.get("system_prompt")
 
-        # Get previous messages for context
-        previous_messages = await chat_db.get_messages(session_id, limit=20)
-
-        # Format messages for the LLM
-        formatted_messages = [
-            {"role": msg["role"], "content": msg["content"]}
-            for msg in previous_messages
-            if msg["role"]
-            != MessageRole.SYSTEM  # System messages are handled separately
-        ]
-
         # Use model from request or session
         model_type = request.model or session.get("model") or ChatModelType.DEFAULT
 
+        # Previous messages that fit in the model's context budget
+        formatted_messages = await context_builder.build(chat_db, session, model_type)
+
         # Create streaming response
         async def event_generator():
             # Variables to collect the full response
@@ -320,20 +313,12 @@ async def send_chat_message(
         # Get system prompt from session
         system_prompt = session.get("system_prompt")
 
-        # Get previous messages for context
-        previous_messages = await chat_db.get_messages(session_id, limit=20)
-
-        # Format messages for the LLM
-        formatted_messages = [
-            {"role": msg["role"], "content": msg["content"]}
-            for msg in previous_messages
-            if msg["role"]
-            != MessageRole.SYSTEM  # System messages are handled separately
-        ]
-
         # Use model from request or session
         model_type = request.model or session.get("model") or ChatModelType.DEFAULT
 
+        # Previous messages that fit in the model's context budget
+        formatted_messages = await context_builder.build(chat_db, session, model_type)
+
         # Get response from LLM
         llm_response = await llm_service.get_llm_response(
             messages=formatted_messages,
@@ -0,0 +1,143 @@
+# app/chat/streaming.py
+"""
+Streaming helpers for chat responses sent over the WebSocket
+Coalesces LLM chunks into the delta frames of the WebSocket stream protocol
+"""
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Union
+
+# A delta frame is sent once this many characters are buffered...
+STREAM_DELTA_MAX_CHARS = int(os.getenv("STREAM_DELTA_MAX_CHARS", "256"))
+# ...or once the oldest buffered character has waited this long
+STREAM_DELTA_MAX_DELAY_MS = int(os.getenv("STREAM_DELTA_MAX_DELAY_MS", "50"))
+
+# WebSocket stream formats, chosen per connection with ?stream_format=
+# "delta" sends only the new text in each frame; "full" resends the whole
+# response so far in each frame, for clients written before deltas existed
+STREAM_FORMAT_DELTA = "delta"
+STREAM_FORMAT_FULL = "full"
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterator[Union[str, Any]],
+    max_chars: int = 256,
+    max_delay: float = 0.05,
+) -> AsyncIterator[Union[str, Any]]:
+    """
+    Merge small text chunks from an LLM stream into larger ones.
+
+    Text is yielded once max_chars characters are buffered or max_delay
+    seconds after the first buffered chunk, whichever comes first, even if
+    the LLM stalls in between. Anything that is not a string (such as a
+    formatted_data dict) flushes the buffer and is passed through in order.
+
+    Args:
+        chunks: The LLM response stream
+        max_chars: Buffered characters that trigger a flush
+        max_delay: Seconds text may wait in the buffer
+
+    Yields:
+        Coalesced text chunks and pass-through items
+    """
+    iterator = chunks.__aiter__()
+    buffer = []
+    buffered = 0
+    deadline = None
+    pending = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            if buffer:
+                # Wait for the next chunk without cancelling it on timeout, since
+                # cancelling __anext__ would close the LLM stream
+                timeout = max(deadline - time.monotonic(), 0)
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+                if not done:
+                    yield "".join(buffer)
+                    buffer, buffered, deadline = [], 0, None
+                    continue
+
+            try:
+                chunk = await pending
+            except StopAsyncIteration:
+                break
+            pending = None
+
+            if isinstance(chunk, str):
+                if not chunk:
+                    continue
+                if not buffer:
+                    deadline = time.monotonic() + max_delay
+                buffer.append(chunk)
+                buffered += len(chunk)
+                if buffered >= max_chars:
+                    yield "".join(buffer)
+                    buffer, buffered, deadline = [], 0, None
+            else:
+                if buffer:
+                    yield "".join(buffer)
+                    buffer, buffered, deadline = [], 0, None
+                yield chunk
+    finally:
+        # Only left running if the consumer stops early
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+    if buffer:
+        yield "".join(buffer)
+
+
+class FullFrameAdapter:
+    """
+    Turns delta chat_response frames into "full" frames for old clients.
+
+    Only delta frames travel between workers; each worker rebuilds the
+    accumulated content for its own ?stream_format=full connections.
+    """
+
+    def __init__(self):
+        # message_id -> text received so far
+        self._content: Dict[str, List[str]] = {}
+
+    @property
+    def pending(self) -> bool:
+        """Whether any streamed response is still being accumulated"""
+        return bool(self._content)
+
+    def adapt(self, frame: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the full-format version of a frame.
+
+        Args:
+            frame: A decoded websocket frame
+
+        Returns:
+            The frame with "content" in place of "delta" (and added to the
+            complete frame), or the frame unchanged if it is not part of a
+            streamed chat response. Complete and error frames end the
+            response.
+        """
+        if "message_id" not in frame:
+            return frame
+        message_id = frame["message_id"]
+        if frame.get("type") == "error":
+            # The stream failed and no complete frame will follow
+            self._content.pop(message_id, None)
+            return frame
+        if frame.get("type") != "chat_response":
+            return frame
+        if frame.get("status") == "complete":
+            content = "".join(self._content.pop(message_id, []))
+            return {**frame, "content": frame.get("content", content)}
+        if "delta" not in frame:
+            return frame
+        parts = self._content.setdefault(message_id, [])
+        parts.append(frame["delta"])
+        full = {key: value for key, value in frame.items() if key != "delta"}
+        full["content"] = "".join(parts)
+        return full
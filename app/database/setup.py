@@ -5,8 +5,9 @@ from ..models.user import ServiceTier, UserInDB
 from ..auth.utils import get_password_hash
 import datetime
 import os
+import re
 from dotenv import load_dotenv
-from pymongo import ASCENDING, TEXT
+from pymongo import ASCENDING, TEXT, UpdateOne
 
 load_dotenv()
 
@@ -91,21 +92,81 @@ async def setup_database():
             [("content", "text")]
         )  # Full-text search index
 
+    # Message history and LLM context read one session's messages in
+    # timestamp order, forwards or backwards, on this index
+    await database.chat_messages.create_index(
+        [("chat_id", ASCENDING), ("timestamp", ASCENDING)]
+    )
+    await backfill_message_kinds()
+
     # Initialize tools collection
     if "tools" not in collections:
         await database.create_collection("tools")
         logger.info("Created tools collection")
 
         # Create indexes for tools collection
-        # await database.tools.create_index("id", unique=True)
         await database.tools.create_index("unique_id", unique=True)
         await database.tools.create_index("name")
         await database.tools.create_index("created_at")
         await database.tools.create_index("category")  # Index for category field
         await database.tools.create_index("is_featured")  # Index for is_featured field
-        await database.tools.create_index([("name", "text"), ("description", "text")])
         logger.info("Created indexes for tools collection")
 
+    # Sorted tool listings order by has_description first. Backfill the stored
+    # flag for tools written before it existed, then make sure every sortable
+    # field has compound indexes for both directions. These run on every
+    # startup so existing deployments pick them up; create_index is a no-op
+    # when the index already exists.
+    await database.tools.update_many(
+        {"has_description": {"$exists": False}},
+        [
+            {
+                "$set": {
+                    "has_description": {
+                        "$cond": [
+                            {"$in": [{"$ifNull": ["$description", ""]}, ["", None]]},
+                            0,
+                            1,
+                        ]
+                    }
+                }
+            }
+        ],
+    )
+    await database.tools.create_index([("has_description", -1), ("_id", 1)])
+    # Incremental exports (updated_since) walk this index
+    await database.tools.create_index([("updated_at", 1), ("_id", 1)])
+    for sort_field in ["name", "created_at", "updated_at", "price"]:
+        await database.tools.create_index(
+            [("has_description", -1), (sort_field, 1), ("_id", 1)]
+        )
+        await database.tools.create_index(
+            [("has_description", -1), (sort_field, -1), ("_id", -1)]
+        )
+
+    # get_tool_by_id looks tools up by their "id" field. Give every older
+    # tool the same deterministic UUID that create_tool_response derives from
+    # its _id, then make the field a unique index so lookups are one seek.
+    await backfill_tool_ids()
+    try:
+        await database.tools.create_index("id", unique=True, sparse=True)
+    except Exception as e:
+        logger.error(f"Could not create unique index on tools.id: {str(e)}")
+
+    # Keyword older tools in batches, after weighting terms by rarity across
+    # the catalog (if KEYWORD_ENGINE_IDF), so their search tokens include them
+    from ..services.keyword_engine import keyword_engine
+
+    await keyword_engine.fit_from_catalog()
+    await backfill_tool_keywords()
+
+    # Keyword search matches the stored search_tokens through a multikey index
+    await backfill_search_tokens()
+    await database.tools.create_index("search_tokens")
+
+    # $text searches (featured listings, search fallback) match keywords too
+    await ensure_tools_text_index()
+
     # Initialize sites collection
     if "sites" not in collections:
         await database.create_collection("sites")
@@ -188,10 +249,24 @@ async def setup_database():
         await database.create_collection("keywords")
         logger.info("Created keywords collection")
 
-        # Create indexes for keywords collection
-        await database.keywords.create_index("id", unique=True)
-        await database.keywords.create_index("word", unique=True)
-        logger.info("Created indexes for keywords collection")
+    # Keyword documents are keyed by the normalized "keyword" field. Earlier
+    # versions declared unique indexes on "id" and "word", which the code
+    # never writes; drop those and index the field the upserts look up.
+    keyword_indexes = await database.keywords.index_information()
+    for stale_index in ("id_1", "word_1"):
+        if stale_index in keyword_indexes:
+            await database.keywords.drop_index(stale_index)
+            logger.info(f"Dropped stale keywords index {stale_index}")
+    try:
+        # Partial so legacy "word" documents without a keyword don't collide
+        await database.keywords.create_index(
+            "keyword",
+            unique=True,
+            partialFilterExpression={"keyword": {"$exists": True}},
+        )
+    except Exception as e:
+        # Duplicates written before the index existed have to be merged first
+        logger.error(f"Could not create unique index on keywords.keyword: {str(e)}")
 
     # Initialize login_codes collection
     if "login_codes" not in collections:
@@ -221,6 +296,20 @@ async def setup_database():
         await database.favorites.create_index("created_at")
         logger.info("Created indexes for favorites collection")
 
+    # add_favorite relies on this index to reject duplicates atomically, so
+    # make sure it exists on collections created before it was declared
+    try:
+        await database.favorites.create_index(
+            [("user_id", ASCENDING), ("tool_unique_id", ASCENDING)], unique=True
+        )
+    except Exception as e:
+        logger.error(
+            f"Could not create unique index on favorites (user_id, tool_unique_id): {str(e)}"
+        )
+
+    # Favorite tool listings page through one user's favorites, newest first
+    await database.favorites.create_index([("user_id", ASCENDING), ("created_at", -1)])
+
     # Initialize shares collection
     if "shares" not in collections:
         await database.create_collection("shares")
@@ -233,9 +322,196 @@ async def setup_database():
         await database.shares.create_index("created_at")
         logger.info("Created indexes for shares collection")
 
+    # Share listings page through one user's shares, newest first
+    await database.shares.create_index([("user_id", ASCENDING), ("created_at", -1)])
+
     logger.info("Database setup completed successfully")
 
 
+async def ensure_tools_text_index() -> None:
+    """
+    Make the tools text index cover name, description and keywords.
+
+    A collection has at most one text index, so an older one over other
+    fields (name and description only) is dropped and rebuilt.
+    """
+    fields = ["name", "description", "keywords"]
+    try:
+        async for index in database.tools.list_indexes():
+            if "textIndexVersion" not in index:
+                continue
+            if set(index.get("weights", {})) == set(fields):
+                return
+            logger.info(f"Rebuilding tools text index {index['name']} with keywords")
+            await database.tools.drop_index(index["name"])
+        await database.tools.create_index([(field, TEXT) for field in fields])
+    except Exception as e:
+        logger.error(f"Could not update the tools text index: {str(e)}")
+
+
+async def backfill_tool_ids(batch_size: int = 1000) -> int:
+    """
+    Set a deterministic "id" on tools that have none.
+
+    The value is objectid_to_uuid(_id), which is what create_tool_response
+    already reports for these tools, so existing links keep working.
+
+    Returns:
+        Number of tools updated
+    """
+    from ..tools.tools_service import objectid_to_uuid
+
+    updated = 0
+    batch = []
+    cursor = database.tools.find({"id": {"$in": [None, ""]}}, {"_id": 1})
+    async for tool in cursor:
+        batch.append(
+            UpdateOne(
+                {"_id": tool["_id"], "id": {"$in": [None, ""]}},
+                {"$set": {"id": str(objectid_to_uuid(tool["_id"]))}},
+            )
+        )
+        if len(batch) >= batch_size:
+            await database.tools.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+
+    if batch:
+        await database.tools.bulk_write(batch, ordered=False)
+        updated += len(batch)
+
+    if updated:
+        logger.info(f"Backfilled deterministic ids for {updated} tools")
+    return updated
+
+
+async def backfill_tool_keywords(batch_size: int = 500) -> int:
+    """
+    Set "keywords" on tools that have none and record them in the keywords
+    collection, as create_tool_response would on the tool's next read.
+
+    Each batch is keyworded with one keyword engine pass.
+
+    Returns:
+        Number of tools updated
+    """
+    from ..services.keyword_store import keyword_store
+    from ..tools.tools_service import extract_keywords_batch
+
+    missing = {"keywords": {"$in": [None, []]}}
+    projection = {
+        "name": 1,
+        "description": 1,
+        "category": 1,
+        "features": 1,
+        "tags": 1,
+        "pricing_type": 1,
+    }
+
+    async def write(batch: list) -> int:
+        entries = [
+            (tool["_id"], tool.get("name") or "Unknown", keywords)
+            for tool, keywords in zip(batch, extract_keywords_batch(batch))
+            if keywords
+        ]
+        if not entries:
+            return 0
+        await database.tools.bulk_write(
+            [
+                UpdateOne({"_id": tool_id, **missing}, {"$set": {"keywords": keywords}})
+                for tool_id, _, keywords in entries
+            ],
+            ordered=False,
+        )
+        await keyword_store.upsert_tool_keywords(
+            (str(tool_id), tool_name, keywords) for tool_id, tool_name, keywords in entries
+        )
+        return len(entries)
+
+    updated = 0
+    batch = []
+    async for tool in database.tools.find(missing, projection):
+        batch.append(tool)
+        if len(batch) >= batch_size:
+            updated += await write(batch)
+            batch = []
+
+    if batch:
+        updated += await write(batch)
+
+    if updated:
+        logger.info(f"Backfilled keywords for {updated} tools")
+    return updated
+
+
+async def backfill_search_tokens(batch_size: int = 1000) -> int:
+    """
+    Set "search_tokens" on tools written before keyword search used it.
+
+    Returns:
+        Number of tools updated
+    """
+    from ..tools.tools_service import SEARCH_TOKEN_FIELDS, build_search_tokens
+
+    projection = {field: 1 for field in SEARCH_TOKEN_FIELDS + ["keywords"]}
+
+    updated = 0
+    batch = []
+    cursor = database.tools.find({"search_tokens": {"$exists": False}}, projection)
+    async for tool in cursor:
+        batch.append(
+            UpdateOne(
+                {"_id": tool["_id"], "search_tokens": {"$exists": False}},
+                {"$set": {"search_tokens": build_search_tokens(tool)}},
+            )
+        )
+        if len(batch) >= batch_size:
+            await database.tools.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+
+    if batch:
+        await database.tools.bulk_write(batch, ordered=False)
+        updated += len(batch)
+
+    if updated:
+        logger.info(f"Backfilled search tokens for {updated} tools")
+    return updated
+
+
+async def backfill_message_kinds() -> int:
+    """
+    Set "kind" on chat messages written before messages stored it.
+
+    Runs as two server-side updates, so no message is read into the app.
+
+    Returns:
+        Number of messages updated
+    """
+    from ..chat.database import (
+        MESSAGE_KIND_CHAT,
+        MESSAGE_KIND_TOOL_SUMMARY,
+        TOOL_SUMMARY_PREFIX,
+    )
+
+    summaries = await database.chat_messages.update_many(
+        {
+            "kind": {"$exists": False},
+            "role": "assistant",
+            "content": {"$regex": "^" + re.escape(TOOL_SUMMARY_PREFIX)},
+        },
+        {"$set": {"kind": MESSAGE_KIND_TOOL_SUMMARY}},
+    )
+    others = await database.chat_messages.update_many(
+        {"kind": {"$exists": False}}, {"$set": {"kind": MESSAGE_KIND_CHAT}}
+    )
+
+    updated = summaries.modified_count + others.modified_count
+    if updated:
+        logger.info(f"Backfilled kinds for {updated} chat messages")
+    return updated
+
+
 async def cleanup_database():
     """Close database connections."""
     client.close()
@@ -9,9 +9,9 @@ from ..services.favorites_service import (
     add_favorite,
     remove_favorite,
     get_user_favorites,
-    is_tool_favorited,
+    get_user_favorite_tools,
 )
-from ..tools.tools_service import get_tool_by_unique_id, get_tools
+from ..tools.tools_service import get_tools
 from . import router
 from ..logger import logger
 
@@ -75,21 +75,9 @@ async def list_favorite_tools(
     """
     Get a list of tools that the user has favorited, including full tool details.
     """
-    # Get favorite relations
-    favorites = await get_user_favorites(
+    # One aggregation joins the page of favorites to their tools
+    favorite_tools = await get_user_favorite_tools(
         user_id=current_user.id, skip=skip, limit=limit
     )
 
-    # Get tool details for each favorite
-    favorite_tools = []
-    for favorite in favorites:
-        tool = await get_tool_by_unique_id(favorite.tool_unique_id)
-        if tool:
-            # Convert to dict and add favorite information
-            tool_dict = tool.dict()
-            tool_dict["favorited_at"] = favorite.created_at
-            tool_dict["favorite_id"] = favorite.id
-            tool_dict["saved_by_user"] = True
-            favorite_tools.append(tool_dict)
-
     return favorite_tools
@@ -6,6 +6,7 @@ from fastapi import (
     WebSocketDisconnect,
     Body,
     Request,
+    Response,
     HTTPException,
     status,
     Query,
@@ -21,6 +22,7 @@ from .logger import logger
 from dotenv import load_dotenv
 import os
 from contextlib import asynccontextmanager
+import hashlib
 import json
 import asyncio
 from bson import ObjectId
@@ -110,6 +112,11 @@ async def lifespan(app: FastAPI):
             await setup_database()
             logger.info("Database setup completed")
 
+            # Load the in-memory tool facet counts
+            from .services.facets_service import facet_counter
+
+            await facet_counter.load()
+
             # Seed glossary terms
             logger.info("Seeding glossary terms...")
             await seed_glossary_terms()
@@ -145,11 +152,21 @@ async def lifespan(app: FastAPI):
                 raise
     else:
         logger.warning("TEST_MODE enabled: Skipping initialization")
+
+    # Share websocket broadcasts with the other workers
+    await manager.start()
     yield
 
     # Shutdown
+    await manager.stop()
     if not TEST_MODE:
         logger.info("Shutting down application...")
+
+        # Write any read-path tool backfills that are still queued
+        from .tools.backfill import tool_backfill_queue
+
+        await tool_backfill_queue.close()
+
         await cleanup_database()
         logger.info("Shutdown complete.")
 
@@ -440,6 +457,7 @@ async def handle_chat_message(websocket: WebSocket, data: dict):
     """Process a chat message received through WebSocket"""
     from .chat.llm_service import llm_service
     from .chat.database import get_chat_db
+    from .chat.context import context_builder
     from .chat.models import ChatModelType, MessageRole
 
     # Get needed parameters
@@ -487,16 +505,8 @@ async def handle_chat_message(websocket: WebSocket, data: dict):
         # Get system prompt from session
         system_prompt = session.get("system_prompt")
 
-        # Get previous messages for context
-        previous_messages = await chat_db.get_messages(chat_id, limit=20)
-
-        # Format messages for the LLM
-        formatted_messages = [
-            {"role": msg["role"], "content": msg["content"]}
-            for msg in previous_messages
-            if msg["role"]
-            != MessageRole.SYSTEM  # System messages are handled separately
-        ]
+        # Previous messages that fit in the model's context budget
+        formatted_messages = await context_builder.build(chat_db, session, model_type)
 
         # Stream response from LLM
         stream_response_task = asyncio.create_task(
@@ -511,7 +521,7 @@ async def handle_chat_message(websocket: WebSocket, data: dict):
         )
 
         # Update the session title if this is the first user message
-        if len(previous_messages) <= 1:  # 0 or just the system message
+        if not session.get("message_count"):  # Counted before this message
             # Generate a title based on the first message
             title = message[:50] + "..." if len(message) > 50 else message
             await chat_db.update_session(chat_id, {"title": title})
@@ -527,77 +537,100 @@ async def handle_chat_message(websocket: WebSocket, data: dict):
 async def stream_llm_response(
     formatted_messages, model_type, system_prompt, chat_id, user_id, chat_db
 ):
-    """Stream a response from the LLM through the WebSocket"""
+    """
+    Stream a response from the LLM through the WebSocket.
+
+    LLM chunks are coalesced, then sent as "streaming" chat_response frames
+    carrying only the new text (delta) and a sequence number (seq). The
+    "complete" frame carries the SHA-256 hex digest of the UTF-8 response
+    (checksum) so clients can verify what they assembled. Frames go out
+    through manager.broadcast_to_chat, which reaches the chat's connections
+    on every worker; connections opened with ?stream_format=full get the
+    whole response so far (content) in every frame instead, as before.
+    """
     from .chat.llm_service import llm_service
     from .chat.models import MessageRole
+    from .chat.streaming import (
+        STREAM_DELTA_MAX_CHARS,
+        STREAM_DELTA_MAX_DELAY_MS,
+        coalesce_chunks,
+    )
 
+    message_id = str(ObjectId())
     try:
-        # Get connections for this chat
-        chat_connections = manager.get_connections_by_chat(chat_id)
-        if not chat_connections:
+        # The requesting connection is on this worker
+        if not manager.get_connections_by_chat(chat_id):
             logger.warning(f"No connections for chat {chat_id}")
             return
 
         # Begin streaming the response
         streamed_chunks = []
-        response_data = {
+        checksum = hashlib.sha256()
+        seq = 0
+        formatted_data = None
+        frame_base = {
             "type": "chat_response",
             "chat_id": chat_id,
             "user_id": user_id,
-            "content": "",
-            "status": "streaming",
+            "message_id": message_id,
         }
 
-        formatted_data = None
-        message_id = str(ObjectId())
-
-        async for chunk in llm_service.get_streaming_llm_response(
-            messages=formatted_messages,
-            model_type=model_type,
-            system_prompt=system_prompt,
+        async for chunk in coalesce_chunks(
+            llm_service.get_streaming_llm_response(
+                messages=formatted_messages,
+                model_type=model_type,
+                system_prompt=system_prompt,
+            ),
+            max_chars=STREAM_DELTA_MAX_CHARS,
+            max_delay=STREAM_DELTA_MAX_DELAY_MS / 1000,
         ):
             # Check if this is a formatted_data message
             if isinstance(chunk, dict) and chunk.get("type") == "formatted_data":
                 formatted_data = chunk.get("data")
                 # Send the formatted data in a separate message
-                formatted_data_response = {
-                    "type": "formatted_data",
-                    "chat_id": chat_id,
-                    "user_id": user_id,
-                    "data": formatted_data,
-                }
-                for conn in chat_connections:
-                    await manager.send_personal_json(
-                        formatted_data_response, conn["websocket"]
-                    )
-            else:
-                # Add new content to the accumulated response
-                streamed_chunks.append(chunk)
-                response_data["content"] = "".join(streamed_chunks)
+                await manager.broadcast_to_chat(
+                    {
+                        "type": "formatted_data",
+                        "chat_id": chat_id,
+                        "user_id": user_id,
+                        "data": formatted_data,
+                    },
+                    chat_id,
+                )
+                continue
+
+            streamed_chunks.append(chunk)
+            checksum.update(chunk.encode("utf-8"))
+            seq += 1
+            await manager.broadcast_to_chat(
+                {**frame_base, "status": "streaming", "seq": seq, "delta": chunk},
+                chat_id,
+            )
 
-                # Send the updated response to all connections for this chat
-                for conn in chat_connections:
-                    await manager.send_personal_json(response_data, conn["websocket"])
+        content = "".join(streamed_chunks)
 
         # Mark the response as complete
-        response_data["status"] = "complete"
-        response_data["message_id"] = message_id
+        complete_frame = {
+            **frame_base,
+            "status": "complete",
+            "seq": seq,
+            "checksum": checksum.hexdigest(),
+        }
         if formatted_data:
-            response_data["formatted_data"] = formatted_data
+            complete_frame["formatted_data"] = formatted_data
 
         # Send final response to all connections
-        for conn in chat_connections:
-            await manager.send_personal_json(response_data, conn["websocket"])
+        await manager.broadcast_to_chat(complete_frame, chat_id)
 
         # Save assistant's response to database
         assistant_message = {
             "role": MessageRole.ASSISTANT,
-            "content": "".join(streamed_chunks),
+            "content": content,
             "chat_id": ObjectId(chat_id),
             "timestamp": datetime.datetime.utcnow(),
             "metadata": {
                 "model": model_type,
-                "tokens": llm_service.estimate_tokens("".join(streamed_chunks)),
+                "tokens": llm_service.estimate_tokens(content),
                 "formatted_data": formatted_data,
             },
             "_id": ObjectId(message_id),
@@ -610,10 +643,11 @@ async def stream_llm_response(
         logger.error(f"Error streaming LLM response: {str(e)}")
         error_data = {
             "type": "error",
+            "chat_id": chat_id,
+            "message_id": message_id,
             "message": f"Error generating response: {str(e)}",
         }
-        for conn in manager.get_connections_by_chat(chat_id):
-            await manager.send_personal_json(error_data, conn["websocket"])
+        await manager.broadcast_to_chat(error_data, chat_id)
 
 
 @app.get("/test-nlp-search")
@@ -649,6 +683,8 @@ async def health_check():
 
 @app.get("/tools")
 async def get_all_tools(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(500, ge=1, le=1000),
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -657,12 +693,22 @@ async def get_all_tools(
         None, description="Field to sort by (name, created_at, updated_at)"
     ),
     sort_order: str = Query("asc", description="Sort order (asc or desc)"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the next_cursor of a previous page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return besides id and unique_id",
+    ),
 ):
     """
     List all tools with pagination, filtering and sorting.
     This endpoint is publicly accessible without authentication.
+    Pass the returned next_cursor back as cursor to fetch the following page.
+    Pass fields (e.g. name,price) to get only those fields besides id and unique_id.
     """
-    from .tools.tools_service import get_tools
+    from .tools.http_cache import check_listing, tools_page_response
+    from .tools.tools_service import get_tools_page, parse_tool_fields
 
     # Build filters dictionary from query parameters
     filters = {}
@@ -685,19 +731,31 @@ async def get_all_tools(
             status_code=400, detail="Invalid sort_order. Must be 'asc' or 'desc'"
         )
 
+    tool_fields = parse_tool_fields(fields)
+
     # Get the tools with filtering and sorting
-    tools = await get_tools(
+    page = await get_tools_page(
         skip=skip,
         limit=limit,
         filters=filters if filters else None,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        estimate_total=True,
+        fields=tool_fields,
     )
 
-    # Get total count with the same filters
-    total = await get_tools(count_only=True, filters=filters if filters else None)
-
-    return {"tools": tools, "total": total, "skip": skip, "limit": limit}
+    result = {
+        "tools": page["tools"],
+        "total": page["total"],
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": page["next_cursor"],
+    }
+    not_modified_response = check_listing(request, response, result)
+    if not_modified_response:
+        return not_modified_response
+    return tools_page_response(result, response, sparse=tool_fields is not None)
 
 
 @app.post("/mock-api/nlp-search")
@@ -0,0 +1,292 @@
+"""
+Publish/subscribe bus for fanning messages out across worker processes
+
+InMemoryPubSub delivers within the current process. RedisPubSub talks the
+Redis protocol (RESP) over two plain asyncio connections, one for PUBLISH
+and one in subscribe mode, so any Redis-compatible server works and no
+client library is needed.
+"""
+import asyncio
+import os
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import unquote, urlparse
+
+from .logger import logger
+
+# Unset for a single worker; redis://[:password@]host[:port] to share
+# websocket broadcasts between workers and nodes
+WEBSOCKET_PUBSUB_URL = os.getenv("WEBSOCKET_PUBSUB_URL", "")
+# Prefix for the channels used by the websocket manager
+WEBSOCKET_PUBSUB_PREFIX = os.getenv("WEBSOCKET_PUBSUB_PREFIX", "taaft:ws:")
+
+MessageHandler = Callable[[str, str], None]
+
+
+class PubSub:
+    """
+    Interface of a publish/subscribe bus.
+
+    Handlers are called with (channel, message) for every message published
+    on a channel they are subscribed to, from any process on the bus. They
+    must not block; the websocket manager only enqueues in them.
+    """
+
+    async def start(self) -> None:
+        """Connect to the bus."""
+
+    async def stop(self) -> None:
+        """Disconnect from the bus."""
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """
+        Deliver messages published on channel to handler.
+
+        Returns once the subscription is active, so a message published
+        right afterwards (from any process) is delivered.
+        """
+        raise NotImplementedError
+
+    def unsubscribe(self, channel: str) -> None:
+        """Stop delivering messages published on channel."""
+        raise NotImplementedError
+
+    async def publish(self, channel: str, message: str) -> bool:
+        """
+        Publish a message on a channel.
+
+        Returns:
+            True if the message was handed to the bus, False if the bus is
+            unavailable (the caller may then deliver locally)
+        """
+        raise NotImplementedError
+
+
+class InMemoryPubSub(PubSub):
+    """Bus for a single process: publishing calls the local handler directly"""
+
+    def __init__(self):
+        self._handlers: Dict[str, MessageHandler] = {}
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers[channel] = handler
+
+    def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+
+    async def publish(self, channel: str, message: str) -> bool:
+        handler = self._handlers.get(channel)
+        if handler is not None:
+            handler(channel, message)
+        return True
+
+
+class RedisError(Exception):
+    """Error reply from the server"""
+
+
+def encode_command(*args: Union[str, bytes]) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg.encode("utf-8") if isinstance(arg, str) else arg
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """
+    Read one RESP reply.
+
+    Error replies are returned as RedisError instances rather than raised,
+    so a failed command does not tear down the connection.
+    """
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    prefix, rest = line[:1], line[1:-2]
+    if prefix == b"+":
+        return rest.decode("utf-8")
+    if prefix == b"-":
+        return RedisError(rest.decode("utf-8"))
+    if prefix == b":":
+        return int(rest)
+    if prefix == b"$":
+        length = int(rest)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(rest)
+        if length == -1:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply from server: {line!r}")
+
+
+class RedisPubSub(PubSub):
+    """
+    Bus over a Redis-protocol server.
+
+    Reconnects in the background after a failure and subscribes to every
+    channel again. publish returns False while disconnected.
+    """
+
+    def __init__(
+        self, url: str, reconnect_delay: float = 1.0, subscribe_timeout: float = 5.0
+    ):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.reconnect_delay = reconnect_delay
+        self.subscribe_timeout = subscribe_timeout
+        self._handlers: Dict[str, MessageHandler] = {}
+        # channel -> future resolved by the server's subscribe confirmation
+        self._confirmations: Dict[str, asyncio.Future] = {}
+        self._publisher: Optional[asyncio.StreamWriter] = None
+        self._subscriber: Optional[asyncio.StreamWriter] = None
+        self._runner: Optional[asyncio.Task] = None
+        self.connected = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _open(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(encode_command("AUTH", self.password))
+            reply = await read_reply(reader)
+            if isinstance(reply, RedisError):
+                writer.close()
+                raise reply
+        return reader, writer
+
+    async def _run(self) -> None:
+        """Keep both connections open, reconnecting after failures"""
+        while True:
+            writers: List[asyncio.StreamWriter] = []
+            try:
+                publish_reader, self._publisher = await self._open()
+                writers.append(self._publisher)
+                subscribe_reader, self._subscriber = await self._open()
+                writers.append(self._subscriber)
+                if self._handlers:
+                    self._subscriber.write(
+                        encode_command("SUBSCRIBE", *self._handlers)
+                    )
+                    await self._subscriber.drain()
+                self.connected.set()
+                logger.info(f"Connected to pub/sub at {self.host}:{self.port}")
+
+                readers = [
+                    asyncio.create_task(self._read_publish_replies(publish_reader)),
+                    asyncio.create_task(self._read_messages(subscribe_reader)),
+                ]
+                try:
+                    # Either connection failing means reconnecting both
+                    done, _ = await asyncio.wait(
+                        readers, return_when=asyncio.FIRST_EXCEPTION
+                    )
+                finally:
+                    for task in readers:
+                        task.cancel()
+                    await asyncio.gather(*readers, return_exceptions=True)
+                for task in done:
+                    task.result()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pub/sub connection to {self.host}:{self.port} failed: {e}")
+            finally:
+                self.connected.clear()
+                self._publisher = self._subscriber = None
+                for writer in writers:
+                    writer.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _read_publish_replies(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            reply = await read_reply(reader)
+            if isinstance(reply, RedisError):
+                logger.error(f"Pub/sub publish failed: {reply}")
+
+    async def _read_messages(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            reply = await read_reply(reader)
+            if isinstance(reply, RedisError):
+                logger.error(f"Pub/sub subscription failed: {reply}")
+                continue
+            if not isinstance(reply, list) or len(reply) != 3:
+                continue
+            kind, channel, message = reply
+            channel = channel.decode("utf-8")
+            if kind == b"subscribe":
+                confirmation = self._confirmations.get(channel)
+                if confirmation is not None and not confirmation.done():
+                    confirmation.set_result(None)
+                continue
+            if kind != b"message":
+                continue  # unsubscribe confirmations
+            handler = self._handlers.get(channel)
+            if handler is None:
+                continue
+            try:
+                handler(channel, message.decode("utf-8"))
+            except Exception as e:
+                logger.error(f"Pub/sub handler for {channel} failed: {e}")
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        is_new = channel not in self._handlers
+        self._handlers[channel] = handler
+        subscriber = self._subscriber
+        if not is_new or subscriber is None:
+            # Already subscribed, or subscribed with the rest on (re)connect
+            return
+
+        confirmation = asyncio.get_running_loop().create_future()
+        self._confirmations[channel] = confirmation
+        try:
+            subscriber.write(encode_command("SUBSCRIBE", channel))
+            await subscriber.drain()
+            await asyncio.wait_for(confirmation, self.subscribe_timeout)
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            # Resubscribed by the reconnect loop if the connection dropped
+            logger.warning(f"Pub/sub subscribe to {channel} not confirmed: {e!r}")
+        finally:
+            if self._confirmations.get(channel) is confirmation:
+                del self._confirmations[channel]
+
+    def unsubscribe(self, channel: str) -> None:
+        if self._handlers.pop(channel, None) and self._subscriber is not None:
+            self._subscriber.write(encode_command("UNSUBSCRIBE", channel))
+
+    async def publish(self, channel: str, message: str) -> bool:
+        publisher = self._publisher
+        if publisher is None:
+            return False
+        try:
+            publisher.write(encode_command("PUBLISH", channel, message))
+            await publisher.drain()
+        except ConnectionError:
+            return False
+        return True
+
+
+def create_pubsub(url: str = "") -> PubSub:
+    """Return the bus configured by url (in-memory when empty)"""
+    if not url:
+        return InMemoryPubSub()
+    if urlparse(url).scheme in ("redis", "tcp"):
+        return RedisPubSub(url)
+    raise ValueError(f"Unsupported pub/sub URL scheme: {url}")
@@ -0,0 +1,118 @@
+"""
+Small in-process caches shared by the service layer.
+
+These live in the memory of a single worker. Anything cached here must either
+be safe to serve slightly stale (bounded by a TTL) or be invalidated through
+``catalog_version`` by the code paths that change the underlying data.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from uuid import uuid4
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with an optional per-entry TTL"""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            max_size: Maximum number of entries kept; the least recently used
+                entry is evicted when it is exceeded. 0 disables the cache.
+            ttl: Default lifetime of an entry in seconds (None = no expiry)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if needed."""
+        if self.max_size <= 0:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class VersionCounter:
+    """
+    Counter bumped whenever the data behind a set of caches changes.
+
+    Caches include the current value in their keys, so a bump makes every
+    older entry unreachable and LRU eviction clears them out over time. The
+    token also carries a per-process nonce so values from a previous process
+    (e.g. in client-held ETags) never collide with the current one.
+    """
+
+    def __init__(self):
+        self.nonce = uuid4().hex[:8]
+        self.value = 0
+
+    def bump(self) -> int:
+        """Advance the version and return the new value."""
+        self.value += 1
+        return self.value
+
+    @property
+    def token(self) -> str:
+        """String form of the version that is unique across restarts."""
+        return f"{self.nonce}-{self.value}"
+
+
+# Bumped by every tool create/update/delete in this process
+catalog_version = VersionCounter()
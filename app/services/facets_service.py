@@ -0,0 +1,278 @@
+"""
+In-memory facet counts for the tool catalog.
+
+Counts are held per (category_id, price, is_featured) and loaded with a single
+aggregation at startup. The tool create/update/delete paths keep them current
+through ``facet_counter.apply``, so serving facets never touches MongoDB.
+Writes handled by other worker processes are only seen by this one when the
+counts are reloaded, which happens once they are FACET_COUNTS_MAX_AGE old.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Set, Tuple
+
+from ..database.database import tools
+from ..logger import logger
+
+# Seconds before the counts are reloaded from MongoDB (0 disables reloading)
+FACET_COUNTS_MAX_AGE = int(os.getenv("FACET_COUNTS_MAX_AGE", "300"))
+
+
+def tool_category_ids(tool: Dict[str, Any]) -> Set[str]:
+    """
+    Collect every category id a tool is counted under.
+
+    Only ``categories.id`` is used, like the category counts have always
+    been; the legacy ``category`` string field is not counted.
+    """
+    category_ids = set()
+
+    for category in tool.get("categories") or []:
+        if isinstance(category, dict) and category.get("id"):
+            category_ids.add(category["id"])
+
+    return category_ids
+
+
+def tool_facet_key(tool: Dict[str, Any]) -> Tuple[str, bool]:
+    """Return the (price, is_featured) pair a tool is counted under."""
+    return (tool.get("price") or "", tool.get("is_featured") is True)
+
+
+class FacetCounter:
+    """Category x pricing x featured counts for the tool catalog"""
+
+    def __init__(self, max_age: float = 300):
+        self.max_age = max_age
+        # (category_id, price, is_featured) -> number of tools
+        self.category_counts: Counter = Counter()
+        # (price, is_featured) -> number of tools, so tools in several
+        # categories are only counted once in the pricing facet
+        self.tool_counts: Counter = Counter()
+        # category_id -> number of tools, for per-category lookups
+        self.category_totals: Counter = Counter()
+        self.loaded = False
+        self.loaded_at = 0.0
+        self._load_lock = asyncio.Lock()
+
+    @property
+    def stale(self) -> bool:
+        """Whether the loaded counts are old enough to be reloaded."""
+        return (
+            self.loaded
+            and self.max_age > 0
+            and time.monotonic() - self.loaded_at > self.max_age
+        )
+
+    async def load(self) -> None:
+        """Rebuild all counts with one aggregation over the tools collection."""
+        pipeline = [
+            {
+                "$project": {
+                    "price": {"$ifNull": ["$price", ""]},
+                    "is_featured": {"$eq": ["$is_featured", True]},
+                    # $setUnion drops ids listed twice on one tool
+                    "category_ids": {
+                        "$setUnion": [
+                            {
+                                "$cond": [
+                                    {"$isArray": "$categories.id"},
+                                    "$categories.id",
+                                    [],
+                                ]
+                            }
+                        ]
+                    },
+                }
+            },
+            {
+                "$facet": {
+                    "tools": [
+                        {
+                            "$group": {
+                                "_id": {
+                                    "price": "$price",
+                                    "is_featured": "$is_featured",
+                                },
+                                "count": {"$sum": 1},
+                            }
+                        }
+                    ],
+                    "categories": [
+                        {"$unwind": "$category_ids"},
+                        {
+                            "$group": {
+                                "_id": {
+                                    "category": "$category_ids",
+                                    "price": "$price",
+                                    "is_featured": "$is_featured",
+                                },
+                                "count": {"$sum": 1},
+                            }
+                        },
+                    ],
+                }
+            },
+        ]
+
+        result = await tools.aggregate(pipeline).to_list(length=1)
+        buckets = result[0] if result else {"tools": [], "categories": []}
+
+        tool_counts = Counter()
+        for bucket in buckets["tools"]:
+            key = (bucket["_id"]["price"], bucket["_id"]["is_featured"])
+            tool_counts[key] = bucket["count"]
+
+        category_counts = Counter()
+        category_totals = Counter()
+        for bucket in buckets["categories"]:
+            key = (
+                bucket["_id"]["category"],
+                bucket["_id"]["price"],
+                bucket["_id"]["is_featured"],
+            )
+            category_counts[key] = bucket["count"]
+            category_totals[bucket["_id"]["category"]] += bucket["count"]
+
+        self.tool_counts = tool_counts
+        self.category_counts = category_counts
+        self.category_totals = category_totals
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+        logger.info(
+            f"Loaded facet counts for {sum(tool_counts.values())} tools "
+            f"across {len(self.category_ids())} categories"
+        )
+
+    async def ensure_loaded(self) -> None:
+        """Load the counts if startup did not (e.g. in TEST_MODE) or they are stale."""
+        if self.loaded and not self.stale:
+            return
+        async with self._load_lock:
+            if not self.loaded or self.stale:
+                await self.load()
+
+    async def refresh_if_stale(self) -> None:
+        """
+        Reload counts that are past max_age, keeping the old ones on failure.
+
+        Unlike ensure_loaded this never triggers the first load.
+        """
+        if not self.stale:
+            return
+        async with self._load_lock:
+            if not self.stale:
+                return
+            try:
+                await self.load()
+            except Exception as e:
+                # Retry after another max_age rather than on every request
+                self.loaded_at = time.monotonic()
+                logger.error(f"Error reloading facet counts: {str(e)}")
+
+    def apply(
+        self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Apply a tool mutation to the counts.
+
+        Args:
+            before: The tool document before the change (None on create)
+            after: The tool document after the change (None on delete)
+        """
+        if not self.loaded:
+            # The next load() will see the change anyway
+            return
+        if before:
+            self._add(before, -1)
+        if after:
+            self._add(after, 1)
+
+    def _add(self, tool: Dict[str, Any], delta: int) -> None:
+        price, is_featured = tool_facet_key(tool)
+        self._bump(self.tool_counts, (price, is_featured), delta)
+        for category_id in tool_category_ids(tool):
+            self._bump(self.category_counts, (category_id, price, is_featured), delta)
+            self._bump(self.category_totals, category_id, delta)
+
+    @staticmethod
+    def _bump(counter: Counter, key: Any, delta: int) -> None:
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+    def category_ids(self) -> Set[str]:
+        """Return every category id that has at least one tool."""
+        return set(self.category_totals)
+
+    def category_count(self, category_id: str) -> int:
+        """Return the number of tools in a category."""
+        return self.category_totals.get(category_id, 0)
+
+    def facets(
+        self,
+        category: Optional[str] = None,
+        price: Optional[str] = None,
+        is_featured: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        Compute facet counts for the given filters.
+
+        Each facet is counted with the other filters applied, so the counts
+        show how many tools each option would return next to the current
+        selection.
+
+        Returns:
+            Dictionary with total, categories, pricing and featured counts
+        """
+
+        def matches(key_price: str, key_featured: bool) -> Tuple[bool, bool]:
+            price_ok = price is None or key_price == price
+            featured_ok = is_featured is None or key_featured == is_featured
+            return price_ok, featured_ok
+
+        categories: Counter = Counter()
+        for (cat_id, key_price, key_featured), count in self.category_counts.items():
+            price_ok, featured_ok = matches(key_price, key_featured)
+            if price_ok and featured_ok:
+                categories[cat_id] += count
+
+        # Pricing and featured facets come from the category buckets when a
+        # category is selected, and from the per-tool buckets otherwise
+        if category is not None:
+            scoped = (
+                ((key_price, key_featured), count)
+                for (cat_id, key_price, key_featured), count in self.category_counts.items()
+                if cat_id == category
+            )
+        else:
+            scoped = self.tool_counts.items()
+
+        pricing: Counter = Counter()
+        featured: Counter = Counter()
+        total = 0
+        for (key_price, key_featured), count in scoped:
+            price_ok, featured_ok = matches(key_price, key_featured)
+            if featured_ok:
+                pricing[key_price] += count
+            if price_ok:
+                featured["true" if key_featured else "false"] += count
+            if price_ok and featured_ok:
+                total += count
+
+        return {
+            "total": total,
+            "categories": dict(categories.most_common()),
+            "pricing": dict(pricing.most_common()),
+            "featured": {
+                "true": featured.get("true", 0),
+                "false": featured.get("false", 0),
+            },
+        }
+
+
+# Create singleton instance
+facet_counter = FacetCounter(max_age=FACET_COUNTS_MAX_AGE)
@@ -1,13 +1,86 @@
 from fastapi import HTTPException
 from uuid import UUID
-from typing import List, Optional, Union, Dict, Any
+from typing import Iterable, List, Optional, Set, Union, Dict, Any
 from datetime import datetime
+import asyncio
+import os
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from ..database.database import favorites, tools, users
 from ..models.favorites import FavoriteCreate, FavoriteInDB, FavoriteResponse
+from ..tools.models import ToolResponse
+from ..tools.tools_service import (
+    EXPORT_FIELDS,
+    adjust_saved_numbers,
+    create_tool_response,
+    get_tool_by_unique_id,
+)
+from .cache import LRUCache
 from ..logger import logger
 
+# Favorited tool unique_ids per user, loaded with one query on first use and
+# kept in step by add_favorite/remove_favorite. The TTL bounds staleness from
+# favorites changed through other worker processes.
+USER_FAVORITES_CACHE_SIZE = int(os.getenv("USER_FAVORITES_CACHE_SIZE", "10000"))
+USER_FAVORITES_CACHE_TTL = int(os.getenv("USER_FAVORITES_CACHE_TTL", "300"))
+
+
+class UserFavoritesCache:
+    """LRU-bounded cache of each user's set of favorited tool unique_ids"""
+
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = None):
+        # user_id -> set of tool unique_ids
+        self._cache = LRUCache(max_size=max_size, ttl=ttl)
+
+    async def get(self, user_id: str) -> Set[str]:
+        """Return the unique_ids of the tools a user has favorited."""
+        tool_unique_ids = self._cache.get(str(user_id))
+        if tool_unique_ids is None:
+            tool_unique_ids = set(
+                await favorites.distinct("tool_unique_id", {"user_id": str(user_id)})
+            )
+            self._cache.set(str(user_id), tool_unique_ids)
+        return tool_unique_ids
+
+    def add(self, user_id: str, tool_unique_id: str) -> None:
+        """Record a new favorite if the user's set is cached."""
+        tool_unique_ids = self._cache.get(str(user_id))
+        if tool_unique_ids is not None:
+            tool_unique_ids.add(tool_unique_id)
+
+    def discard(self, user_id: str, tool_unique_id: str) -> None:
+        """Record a removed favorite if the user's set is cached."""
+        tool_unique_ids = self._cache.get(str(user_id))
+        if tool_unique_ids is not None:
+            tool_unique_ids.discard(tool_unique_id)
+
+    def clear(self) -> None:
+        """Forget every cached set."""
+        self._cache.clear()
+
+
+# Create singleton instance
+user_favorites = UserFavoritesCache(
+    max_size=USER_FAVORITES_CACHE_SIZE, ttl=USER_FAVORITES_CACHE_TTL
+)
+
+
+async def mark_saved_tools(user_id: str, tools_list: Iterable[ToolResponse]) -> None:
+    """
+    Set saved_by_user on tool responses for one user.
+
+    Uses the user's cached favorites set, so a whole listing costs at most
+    one favorites query.
+
+    Args:
+        user_id: ID of the user
+        tools_list: Tool responses to update in place (copies, never cached objects)
+    """
+    tool_unique_ids = await user_favorites.get(user_id)
+    for tool in tools_list:
+        tool.saved_by_user = tool.unique_id in tool_unique_ids
+
 
 async def add_favorite(
     user_id: str,
@@ -27,44 +100,42 @@ async def add_favorite(
     if not favorite_data.tool_unique_id or favorite_data.tool_unique_id.strip() == "":
         raise HTTPException(status_code=400, detail="Tool unique ID cannot be empty")
 
-    # Check if the tool exists
-    tool = await tools.find_one({"unique_id": favorite_data.tool_unique_id})
-    if not tool:
+    # Check if the tool exists (served from the tool cache when warm)
+    if not await get_tool_by_unique_id(favorite_data.tool_unique_id):
         raise HTTPException(status_code=404, detail="Tool not found")
 
-    # Check if the favorite already exists
-    existing_favorite = await favorites.find_one(
-        {"user_id": str(user_id), "tool_unique_id": favorite_data.tool_unique_id}
-    )
-
-    if existing_favorite:
+    # Insert only if absent. The unique (user_id, tool_unique_id) index makes
+    # this atomic, so concurrent adds of the same favorite cannot both win.
+    created_at = datetime.utcnow()
+    try:
+        result = await favorites.update_one(
+            {"user_id": str(user_id), "tool_unique_id": favorite_data.tool_unique_id},
+            {"$setOnInsert": {"created_at": created_at}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        result = None
+    if result is None or result.upserted_id is None:
         raise HTTPException(status_code=409, detail="Tool is already in favorites")
 
-    # Create new favorite
-    favorite = {
-        "user_id": str(user_id),
-        "tool_unique_id": favorite_data.tool_unique_id,
-        "created_at": datetime.utcnow(),
-    }
-
-    # Insert into database
-    result = await favorites.insert_one(favorite)
-
-    # Add the tool's unique_id to the user's saved_tools array
-    await users.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$addToSet": {"saved_tools": favorite_data.tool_unique_id}},
+    # Add the tool's unique_id to the user's saved_tools array and count the
+    # save on the tool; the two writes are independent, so run them together
+    await asyncio.gather(
+        users.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$addToSet": {"saved_tools": favorite_data.tool_unique_id}},
+        ),
+        adjust_saved_numbers(favorite_data.tool_unique_id, 1),
     )
 
-    # Get the inserted favorite
-    favorite["_id"] = result.inserted_id
+    user_favorites.add(user_id, favorite_data.tool_unique_id)
 
     # Convert to response model
     return FavoriteResponse(
-        id=str(result.inserted_id),
+        id=str(result.upserted_id),
         user_id=str(user_id),
         tool_unique_id=favorite_data.tool_unique_id,
-        created_at=favorite["created_at"],
+        created_at=created_at,
     )
 
 
@@ -98,9 +169,15 @@ async def remove_favorite(user_id: str, tool_unique_id: str) -> bool:
         )
         raise HTTPException(status_code=404, detail="Favorite not found")
 
-    # Remove the tool's unique_id from the user's saved_tools array
-    await users.update_one(
-        {"_id": ObjectId(user_id)}, {"$pull": {"saved_tools": tool_unique_id}}
+    user_favorites.discard(user_id, tool_unique_id)
+
+    # Remove the tool's unique_id from the user's saved_tools array and
+    # uncount the save, concurrently
+    await asyncio.gather(
+        users.update_one(
+            {"_id": ObjectId(user_id)}, {"$pull": {"saved_tools": tool_unique_id}}
+        ),
+        adjust_saved_numbers(tool_unique_id, -1),
     )
 
     logger.info(
@@ -149,19 +226,69 @@ async def get_user_favorites(
     return favorites_list
 
 
-async def is_tool_favorited(user_id: str, tool_unique_id: str) -> bool:
+def _build_favorite_tools_pipeline(
+    user_id: str, skip: int = 0, limit: int = 100
+) -> List[Dict[str, Any]]:
+    """
+    Build the aggregation joining one page of a user's favorites to their tools.
+
+    The page is cut before the $lookup, so only the tools on the page are
+    joined, each through the unique index on tools.unique_id. Favorites whose
+    tool no longer exists are dropped by the $unwind.
+    """
+    pipeline = [
+        {"$match": {"user_id": str(user_id)}},
+        {"$sort": {"created_at": -1}},
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    pipeline += [
+        {"$limit": limit},
+        {
+            "$lookup": {
+                "from": tools.name,
+                "localField": "tool_unique_id",
+                "foreignField": "unique_id",
+                "as": "tool",
+            }
+        },
+        {"$unwind": "$tool"},
+        {
+            "$project": {
+                "created_at": 1,
+                "tool._id": 1,
+                **{f"tool.{field}": 1 for field in EXPORT_FIELDS},
+            }
+        },
+    ]
+    return pipeline
+
+
+async def get_user_favorite_tools(
+    user_id: str, skip: int = 0, limit: int = 100
+) -> List[Dict[str, Any]]:
     """
-    Check if a tool is in the user's favorites.
+    Get one page of a user's favorite tools with their full details.
 
     Args:
         user_id: ID of the user
-        tool_unique_id: Unique ID of the tool
+        skip: Number of favorites to skip
+        limit: Maximum number of favorites to return
 
     Returns:
-        True if the tool is in favorites, False otherwise
+        List of tool dictionaries with favorited_at, favorite_id and
+        saved_by_user added, most recent favorite first
     """
-    favorite = await favorites.find_one(
-        {"user_id": str(user_id), "tool_unique_id": tool_unique_id}
-    )
+    cursor = favorites.aggregate(_build_favorite_tools_pipeline(user_id, skip, limit))
 
-    return favorite is not None
+    favorite_tools = []
+    async for favorite in cursor:
+        tool = await create_tool_response(favorite["tool"])
+        if tool:
+            tool_dict = tool.model_dump()
+            tool_dict["favorited_at"] = favorite["created_at"]
+            tool_dict["favorite_id"] = str(favorite["_id"])
+            tool_dict["saved_by_user"] = True
+            favorite_tools.append(tool_dict)
+
+    return favorite_tools
@@ -0,0 +1,287 @@
+"""
+Shared keyword extraction for tools and chat messages.
+
+By default a tool text's keywords are its most frequent words, as the
+extractor has always done. With KEYWORD_ENGINE_IDF enabled, they are ranked
+by TF-IDF instead: term frequency inside the text (optionally weighted per
+text, e.g. recent chat messages count more) multiplied by the inverse
+document frequency of the term across the tool catalog. The IDF table is
+computed at startup with ``fit_from_catalog``; until then every term has
+the same weight and ranking falls back to term frequency.
+
+TF-IDF ranks rarer, more telling terms first, but it is opt-in: it costs
+about half again as much per text (regex tokenizing and weighting), the IDF
+table has to be fitted over the whole catalog at startup, and it changes the
+stored keywords of every tool keyworded afterwards, which the keyword
+collection and search tokens are built from.
+
+Whole-catalog passes (the startup keyword backfill, the upsert benchmark)
+go through ``extract_many``, which reuses one fitted table for the batch.
+"""
+
+import heapq
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..logger import logger
+
+# Lowercase words of 3+ characters; inner hyphens/underscores are kept so
+# terms like "text-to-speech" survive as one keyword
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9_-]+[a-z0-9]")
+
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "the",
+        "and",
+        "or",
+        "but",
+        "if",
+        "then",
+        "else",
+        "when",
+        "at",
+        "from",
+        "by",
+        "for",
+        "with",
+        "about",
+        "against",
+        "between",
+        "into",
+        "through",
+        "during",
+        "before",
+        "after",
+        "above",
+        "below",
+        "to",
+        "of",
+        "in",
+        "on",
+        "off",
+        "over",
+        "under",
+        "again",
+        "further",
+        "once",
+        "here",
+        "there",
+        "where",
+        "why",
+        "how",
+        "all",
+        "any",
+        "both",
+        "each",
+        "few",
+        "more",
+        "most",
+        "other",
+        "some",
+        "such",
+        "no",
+        "nor",
+        "not",
+        "only",
+        "own",
+        "same",
+        "so",
+        "than",
+        "too",
+        "very",
+        "can",
+        "will",
+        "just",
+        "should",
+        "now",
+        "tool",
+        "tools",
+        "ai",
+        "intelligence",
+        "artificial",
+        "model",
+        "models",
+        "system",
+        "platform",
+        "app",
+        "application",
+        "software",
+        "service",
+        "solution",
+        "technology",
+    }
+)
+
+# Rank tool keywords by TF-IDF over the catalog instead of plain frequency
+KEYWORD_ENGINE_IDF = os.getenv("KEYWORD_ENGINE_IDF", "false").lower() == "true"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase candidate keywords, dropping stopwords."""
+    if not text:
+        return []
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+class KeywordEngine:
+    """Keyword extractor, optionally TF-IDF with a corpus-wide IDF table"""
+
+    def __init__(
+        self,
+        idf: Optional[Dict[str, float]] = None,
+        default_idf: float = 1.0,
+        use_idf: bool = False,
+    ):
+        self.use_idf = use_idf
+        # term -> inverse document frequency; unseen terms get default_idf
+        self.idf: Dict[str, float] = idf or {}
+        self.default_idf = default_idf
+        self.document_count = 0
+
+    def fit(self, documents: Iterable[str]) -> None:
+        """
+        Compute IDF weights over a corpus.
+
+        Uses the smoothed form log((1 + N) / (1 + df)) + 1. Terms that never
+        appear in the corpus get the maximum weight, as if seen in no document.
+        """
+        document_frequency: Counter = Counter()
+        document_count = 0
+        for document in documents:
+            document_count += 1
+            document_frequency.update(set(tokenize(document)))
+        self._set_idf(document_frequency, document_count)
+
+    def _set_idf(self, document_frequency: Counter, document_count: int) -> None:
+        self.idf = {
+            term: math.log((1 + document_count) / (1 + df)) + 1
+            for term, df in document_frequency.items()
+        }
+        self.default_idf = math.log(1 + document_count) + 1
+        self.document_count = document_count
+
+    def score(self, weighted_texts: Iterable[Tuple[str, float]]) -> Counter:
+        """
+        Score the terms of several texts.
+
+        Args:
+            weighted_texts: (text, weight) pairs; each occurrence of a term in
+                a text adds that text's weight to the term frequency
+
+        Returns:
+            Counter of term -> TF-IDF score
+        """
+        term_frequency: Counter = Counter()
+        for text, weight in weighted_texts:
+            for token in tokenize(text):
+                term_frequency[token] += weight
+
+        idf, default_idf = self.idf, self.default_idf
+        return Counter(
+            {term: tf * idf.get(term, default_idf) for term, tf in term_frequency.items()}
+        )
+
+    def extract_weighted(
+        self, weighted_texts: Sequence[Tuple[str, float]], limit: Optional[int] = 10
+    ) -> List[str]:
+        """
+        Return the top keywords of several weighted texts.
+
+        Ties keep the order in which the terms first appear.
+        """
+        return self._top(self.score(weighted_texts), limit)
+
+    def extract(self, text: Optional[str], limit: Optional[int] = 10) -> List[str]:
+        """Return the top keywords of a single text."""
+        return self.extract_many([text], limit)[0]
+
+    def extract_many(
+        self, texts: Iterable[Optional[str]], limit: Optional[int] = 10
+    ) -> List[List[str]]:
+        """
+        Return the top keywords of each text, in order.
+
+        The IDF table and helpers are looked up once for the whole batch.
+
+        Args:
+            texts: Texts to extract keywords from; empty ones give []
+            limit: Maximum keywords per text (None for all)
+
+        Returns:
+            One keyword list per text
+        """
+        results = []
+        if not self.use_idf:
+            # Whitespace-separated alphanumeric words, most frequent first
+            for text in texts:
+                if not text:
+                    results.append([])
+                    continue
+                counts = Counter(
+                    token
+                    for token in text.lower().split()
+                    if len(token) > 2 and token.isalnum() and token not in STOPWORDS
+                )
+                results.append([token for token, _ in counts.most_common(limit)])
+            return results
+
+        get_idf, default_idf = self.idf.get, self.default_idf
+        findall, top = TOKEN_PATTERN.findall, self._top
+        for text in texts:
+            if not text:
+                results.append([])
+                continue
+            # Count before dropping stopwords, so each one is only checked once
+            scores = {
+                term: tf * get_idf(term, default_idf)
+                for term, tf in Counter(findall(text.lower())).items()
+                if term not in STOPWORDS
+            }
+            results.append(top(scores, limit))
+        return results
+
+    @staticmethod
+    def _top(scores: Dict[str, float], limit: Optional[int]) -> List[str]:
+        # Dicts keep first-appearance order and both rankings are stable
+        if limit is None:
+            return sorted(scores, key=scores.__getitem__, reverse=True)
+        return heapq.nlargest(limit, scores, key=scores.__getitem__)
+
+    async def fit_from_catalog(self) -> None:
+        """
+        Compute IDF weights over the names and descriptions of all tools.
+
+        Does nothing unless TF-IDF ranking is enabled. Tools are streamed, so
+        only the term counts are held in memory, not the texts.
+        """
+        if not self.use_idf:
+            return
+
+        from ..database.database import tools
+
+        document_frequency: Counter = Counter()
+        document_count = 0
+        async for tool in tools.find({}, {"_id": 0, "name": 1, "description": 1}):
+            document_count += 1
+            document_frequency.update(
+                set(tokenize(f"{tool.get('name') or ''} {tool.get('description') or ''}"))
+            )
+
+        self._set_idf(document_frequency, document_count)
+        logger.info(
+            f"Computed keyword IDF weights for {len(self.idf)} terms "
+            f"over {self.document_count} tools"
+        )
+
+
+# Create singleton instance
+keyword_engine = KeywordEngine(use_idf=KEYWORD_ENGINE_IDF)
@@ -0,0 +1,134 @@
+"""
+Keyword store backed by the keywords collection.
+
+Each document holds one normalized keyword, the tools that carry it and its
+frequency (the number of those tools). All keywords of one or many tools are
+written with a single unordered bulk_write; the unique index on ``keyword``
+created in setup_database makes every upsert an index lookup.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from ..database.database import database
+from ..logger import logger
+
+_WHITESPACE = re.compile(r"\s+")
+
+# (tool_id, tool_name, keywords)
+ToolKeywords = Tuple[str, str, Iterable[str]]
+
+
+def normalize_keyword(keyword: Any) -> str:
+    """Lowercase a keyword and collapse its whitespace ("" if unusable)."""
+    if not isinstance(keyword, str):
+        return ""
+    return _WHITESPACE.sub(" ", keyword).strip().lower()
+
+
+class KeywordStore:
+    """Batch upserts for the keywords collection"""
+
+    def __init__(self, collection=None):
+        self.collection = collection or database.get_collection("keywords")
+
+    @staticmethod
+    def build_upserts(
+        entries: Iterable[ToolKeywords], now: Optional[datetime] = None
+    ) -> List[UpdateOne]:
+        """
+        Build one upsert per distinct keyword across all the given tools.
+
+        Each upsert replaces the entries of the given tools in the keyword's
+        ``tools`` array and recomputes ``frequency`` from it, so writing the
+        same tool twice (e.g. when re-keywording the catalog) does not
+        inflate the count.
+
+        Args:
+            entries: (tool_id, tool_name, keywords) for each tool
+            now: Timestamp to record (defaults to utcnow)
+
+        Returns:
+            List of UpdateOne operations for bulk_write
+        """
+        tools_by_keyword: Dict[str, Dict[str, Dict[str, str]]] = {}
+        for tool_id, tool_name, keywords in entries:
+            tool_entry = {"tool_id": str(tool_id), "tool_name": tool_name}
+            for keyword in keywords or []:
+                normalized = normalize_keyword(keyword)
+                if normalized:
+                    tools_by_keyword.setdefault(normalized, {})[
+                        tool_entry["tool_id"]
+                    ] = tool_entry
+
+        now = now or datetime.utcnow()
+        operations = []
+        for keyword, keyword_tools in tools_by_keyword.items():
+            tool_ids = list(keyword_tools)
+            operations.append(
+                UpdateOne(
+                    {"keyword": keyword},
+                    [
+                        {
+                            "$set": {
+                                "created_at": {"$ifNull": ["$created_at", now]},
+                                "updated_at": now,
+                                "tools": {
+                                    "$concatArrays": [
+                                        {
+                                            "$filter": {
+                                                "input": {"$ifNull": ["$tools", []]},
+                                                "cond": {
+                                                    "$not": [
+                                                        {
+                                                            "$in": [
+                                                                "$$this.tool_id",
+                                                                {"$literal": tool_ids},
+                                                            ]
+                                                        }
+                                                    ]
+                                                },
+                                            }
+                                        },
+                                        # Names starting with "$" would
+                                        # otherwise be read as field paths
+                                        {"$literal": list(keyword_tools.values())},
+                                    ]
+                                },
+                            }
+                        },
+                        {"$set": {"frequency": {"$size": "$tools"}}},
+                    ],
+                    upsert=True,
+                )
+            )
+        return operations
+
+    async def upsert_tool_keywords(self, entries: Iterable[ToolKeywords]) -> int:
+        """
+        Upsert the keywords of one or many tools in a single bulk write.
+
+        Args:
+            entries: (tool_id, tool_name, keywords) for each tool
+
+        Returns:
+            Number of keyword documents written
+        """
+        operations = self.build_upserts(entries)
+        if not operations:
+            return 0
+
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Error upserting {len(operations)} keywords: {str(e)}")
+            raise
+
+        return len(operations)
+
+
+# Create singleton instance
+keyword_store = KeywordStore()
@@ -2,12 +2,55 @@ from fastapi import HTTPException
 from uuid import UUID
 from typing import List, Optional, Union, Dict, Any
 from datetime import datetime
+import json
 import os
-from bson import ObjectId
 
 from ..database.database import shares, tools
 from ..models.shares import ShareCreate, ShareInDB, ShareResponse
-from ..logger import logger
+from .cache import LRUCache, VersionCounter
+
+# Rendered public share pages keyed by share_id, stored as
+# (JSON bytes, tool_unique_id, tool version). Unknown share ids are cached
+# for a shorter time as _SHARE_NOT_FOUND. Entries are dropped when their
+# share is deleted and ignored once their tool is written (see
+# invalidate_tool_shares); the TTL bounds staleness from other workers.
+SHARE_CACHE_SIZE = int(os.getenv("SHARE_CACHE_SIZE", "5000"))
+SHARE_CACHE_TTL = int(os.getenv("SHARE_CACHE_TTL", "300"))
+SHARE_CACHE_NEGATIVE_TTL = int(os.getenv("SHARE_CACHE_NEGATIVE_TTL", "30"))
+share_cache = LRUCache(max_size=SHARE_CACHE_SIZE, ttl=SHARE_CACHE_TTL)
+_SHARE_NOT_FOUND = object()
+
+# tool_unique_id -> number of writes to the tool in this process. Not an
+# LRU, so a write is never forgotten while pages rendered before it are
+# still cached; it holds one int per tool written since startup.
+_tool_versions: Dict[str, int] = {}
+# Bumped by every tool write, to spot writes racing a page render
+_tool_writes = VersionCounter()
+
+# Fields of tool documents that are only used for querying
+_INTERNAL_TOOL_FIELDS = {"search_tokens": 0, "has_description": 0}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def invalidate_tool_shares(tool_unique_id: Optional[str]) -> None:
+    """
+    Invalidate the cached share pages of a tool.
+
+    Bumps the tool's version, so pages rendered before the write are no
+    longer served.
+
+    Args:
+        tool_unique_id: unique_id of the tool that was written
+    """
+    if not tool_unique_id:
+        return
+    _tool_versions[tool_unique_id] = _tool_versions.get(tool_unique_id, 0) + 1
+    _tool_writes.bump()
 
 
 async def create_share(user_id: str, share_data: ShareCreate) -> ShareResponse:
@@ -41,6 +84,7 @@ async def create_share(user_id: str, share_data: ShareCreate) -> ShareResponse:
 
     # Insert into database
     result = await shares.insert_one(share)
+    share_cache.delete(share_id)
 
     # Get the inserted share
     share["_id"] = result.inserted_id
@@ -64,22 +108,36 @@ async def get_share_by_id(share_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a share by its unique ID.
 
+    The share and its tool come back from one aggregation.
+
     Args:
         share_id: The unique share ID
 
     Returns:
         Share details or None if not found
     """
-    share = await shares.find_one({"share_id": share_id})
-    if not share:
+    pipeline = [
+        {"$match": {"share_id": share_id}},
+        {"$limit": 1},
+        {
+            "$lookup": {
+                "from": tools.name,
+                "localField": "tool_unique_id",
+                "foreignField": "unique_id",
+                "as": "tool",
+            }
+        },
+        {"$unwind": "$tool"},
+        {"$project": {f"tool.{field}": 0 for field in _INTERNAL_TOOL_FIELDS}},
+    ]
+    result = await shares.aggregate(pipeline).to_list(length=1)
+    if not result:
         return None
 
-    # Get the tool details
-    tool = await tools.find_one({"unique_id": share["tool_unique_id"]})
-    if not tool:
-        return None
+    share = result[0]
+    tool = share.pop("tool")
+    tool["_id"] = str(tool["_id"])
 
-    # Convert ObjectId to string to avoid serialization issues
     serialized_share = {
         "share_id": share["share_id"],
         "user_id": share["user_id"],
@@ -88,25 +146,54 @@ async def get_share_by_id(share_id: str) -> Optional[Dict[str, Any]]:
         "_id": str(share["_id"]),
     }
 
-    # Convert ObjectId to string in tool document
-    serialized_tool = dict(tool)
-    if "_id" in serialized_tool:
-        serialized_tool["_id"] = str(serialized_tool["_id"])
+    return {"share": serialized_share, "tool": tool}
 
-    # Handle any other potential ObjectId fields in the tool object recursively
-    def convert_objectid_to_str(obj):
-        if isinstance(obj, dict):
-            return {k: convert_objectid_to_str(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_objectid_to_str(item) for item in obj]
-        elif isinstance(obj, ObjectId):
-            return str(obj)
-        else:
-            return obj
 
-    serialized_tool = convert_objectid_to_str(serialized_tool)
+async def get_share_payload(share_id: str) -> Optional[bytes]:
+    """
+    Get the rendered public page of a share.
+
+    Warm shares are served from share_cache without touching MongoDB.
+
+    Args:
+        share_id: The unique share ID
+
+    Returns:
+        JSON body of the share page or None if not found
+    """
+    cached = share_cache.get(share_id)
+    if cached is _SHARE_NOT_FOUND:
+        return None
+    if cached is not None:
+        payload, tool_unique_id, version = cached
+        if _tool_versions.get(tool_unique_id, 0) == version:
+            return payload
+
+    writes = _tool_writes.value
+    share_data = await get_share_by_id(share_id)
+    if not share_data:
+        share_cache.set(share_id, _SHARE_NOT_FOUND, ttl=SHARE_CACHE_NEGATIVE_TTL)
+        return None
 
-    return {"share": serialized_share, "tool": serialized_tool}
+    share = share_data["share"]
+    payload = json.dumps(
+        {
+            "tool": share_data["tool"],
+            "share": {
+                "id": share["share_id"],
+                "created_at": share["created_at"],
+                "shared_by": share["user_id"],
+            },
+        },
+        default=_json_default,
+    ).encode()
+
+    if _tool_writes.value == writes:
+        # Otherwise the tool may have changed after it was read; don't cache
+        tool_unique_id = share["tool_unique_id"]
+        version = _tool_versions.get(tool_unique_id, 0)
+        share_cache.set(share_id, (payload, tool_unique_id, version))
+    return payload
 
 
 async def get_user_shares(
@@ -131,30 +218,44 @@ async def get_user_shares(
     if count_only:
         return await shares.count_documents(filter_query)
 
-    # Get the shares
-    cursor = shares.find(filter_query).sort("created_at", -1).skip(skip).limit(limit)
+    # Join the page of shares to their tools in one aggregation; shares
+    # whose tool no longer exists are dropped
+    pipeline = [{"$match": filter_query}, {"$sort": {"created_at": -1}}]
+    if skip:
+        pipeline.append({"$skip": skip})
+    pipeline += [
+        {"$limit": limit},
+        {
+            "$lookup": {
+                "from": tools.name,
+                "localField": "tool_unique_id",
+                "foreignField": "unique_id",
+                "as": "tool",
+            }
+        },
+        {"$match": {"tool": {"$ne": []}}},
+        {"$project": {"tool": 0}},
+    ]
+
+    # Generate share links
+    base_url = os.getenv("FRONTEND_URL", "https://taaft.ai")
 
-    # Convert to list of dictionaries
     shares_list = []
-    async for share in cursor:
-        # Generate share link
-        base_url = os.getenv("FRONTEND_URL", "https://taaft.ai")
-        tool = await tools.find_one({"unique_id": share["tool_unique_id"]})
-        if tool:
-            share_link = (
-                f"{base_url}/tool/{tool['unique_id']}?share={share['share_id']}"
-            )
-
-            shares_list.append(
-                ShareResponse(
-                    id=str(share["_id"]),
-                    user_id=str(share["user_id"]),
-                    tool_unique_id=share["tool_unique_id"],
-                    share_id=share["share_id"],
-                    created_at=share["created_at"],
-                    share_link=share_link,
-                )
+    async for share in shares.aggregate(pipeline):
+        share_link = (
+            f"{base_url}/tool/{share['tool_unique_id']}?share={share['share_id']}"
+        )
+
+        shares_list.append(
+            ShareResponse(
+                id=str(share["_id"]),
+                user_id=str(share["user_id"]),
+                tool_unique_id=share["tool_unique_id"],
+                share_id=share["share_id"],
+                created_at=share["created_at"],
+                share_link=share_link,
             )
+        )
 
     return shares_list
 
@@ -182,6 +283,7 @@ async def delete_share(user_id: str, share_id: str) -> bool:
 
     # Delete the share
     result = await shares.delete_one({"share_id": share_id})
+    share_cache.delete(share_id)
 
     # Return success based on if something was deleted
     return result.deleted_count > 0
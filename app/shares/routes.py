@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
@@ -8,11 +8,11 @@ from ..models.shares import (
     ShareCreate,
     ShareResponse,
     ShareWithToolResponse,
-    ShareInfoResponse,
 )
 from ..services.shares_service import (
     create_share,
     get_share_by_id,
+    get_share_payload,
     get_user_shares,
     delete_share,
 )
@@ -50,22 +50,12 @@ async def get_share(share_id: str, request: Request):
     Get tool details by share ID.
     This endpoint is public and does not require authentication.
     """
-    share_data = await get_share_by_id(share_id)
-    if not share_data:
+    # Rendered pages are cached, so warm shares cost no database queries
+    payload = await get_share_payload(share_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Share not found")
 
-    # Return the tool data with share information
-    tool = share_data["tool"]
-    share = share_data["share"]
-
-    return ShareWithToolResponse(
-        tool=tool,
-        share=ShareInfoResponse(
-            id=share["share_id"],
-            created_at=share["created_at"],
-            shared_by=share["user_id"],
-        ),
-    )
+    return Response(content=payload, media_type="application/json")
 
 
 @router.get("/my-shares", response_model=List[ShareResponse])
@@ -0,0 +1,165 @@
+"""
+Write-behind queue for backfills discovered while reading tools.
+
+create_tool_response fills in fields that older tool documents lack (the
+derived ``id`` and extracted ``keywords``). Instead of writing them back
+inline on every read, it enqueues them here. The queue deduplicates by tool,
+remembers which tools were already backfilled, and flushes everything in
+batches with unordered bulk writes from a single background task.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+
+from ..database.database import tools
+from ..logger import logger
+from ..services.keyword_store import keyword_store
+
+TOOL_BACKFILL_FLUSH_INTERVAL = float(os.getenv("TOOL_BACKFILL_FLUSH_INTERVAL", "2"))
+TOOL_BACKFILL_BATCH_SIZE = int(os.getenv("TOOL_BACKFILL_BATCH_SIZE", "500"))
+
+# Values meaning "this field still needs a backfill"; null also matches a
+# missing field
+_UNSET_VALUES = {"id": [None, ""], "keywords": [None, []]}
+
+
+class ToolBackfillQueue:
+    """Deduplicating write-behind queue for read-path tool backfills"""
+
+    def __init__(
+        self,
+        flush_interval: float = TOOL_BACKFILL_FLUSH_INTERVAL,
+        batch_size: int = TOOL_BACKFILL_BATCH_SIZE,
+    ):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # tool _id -> fields to set
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        # tool _id -> (tool name, keywords) for the keywords collection
+        self._pending_keywords: Dict[Any, Tuple[str, List[str]]] = {}
+        # (tool _id, field) pairs already queued or written by this process
+        self._done: Set[Tuple[Any, str]] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self.stats = {"enqueued": 0, "flushes": 0, "writes": 0, "errors": 0}
+
+    def enqueue(
+        self,
+        tool_oid: Any,
+        fields: Dict[str, Any],
+        tool_name: Optional[str] = None,
+    ) -> None:
+        """
+        Queue fields to be written back to a tool document.
+
+        Args:
+            tool_oid: The tool's MongoDB _id
+            fields: Field values to set; only "id" and "keywords" are supported
+            tool_name: Tool name, recorded in the keywords collection when
+                keywords are backfilled
+        """
+        new_fields = {
+            field: value
+            for field, value in fields.items()
+            if (tool_oid, field) not in self._done
+        }
+        if not new_fields:
+            return
+
+        self._done.update((tool_oid, field) for field in new_fields)
+        self._pending.setdefault(tool_oid, {}).update(new_fields)
+        if "keywords" in new_fields and new_fields["keywords"]:
+            self._pending_keywords[tool_oid] = (
+                tool_name or "Unknown",
+                new_fields["keywords"],
+            )
+        self.stats["enqueued"] += len(new_fields)
+
+        self._ensure_running()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        """Start the background flusher on first use."""
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. a sync caller); the next flush() picks it up
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write every queued backfill with unordered bulk writes."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            pending_keywords, self._pending_keywords = self._pending_keywords, {}
+
+            tool_ops = [
+                UpdateOne(
+                    {"_id": tool_oid, field: {"$in": _UNSET_VALUES[field]}},
+                    {"$set": {field: value}},
+                )
+                for tool_oid, fields in pending.items()
+                for field, value in fields.items()
+            ]
+            keyword_ops = keyword_store.build_upserts(
+                (str(tool_oid), tool_name, keywords)
+                for tool_oid, (tool_name, keywords) in pending_keywords.items()
+            )
+
+            self.stats["flushes"] += 1
+            for collection, ops in (
+                (tools, tool_ops),
+                (keyword_store.collection, keyword_ops),
+            ):
+                if not ops:
+                    continue
+                try:
+                    await collection.bulk_write(ops, ordered=False)
+                    self.stats["writes"] += len(ops)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(
+                        f"Tool backfill flush to {collection.name} failed: {str(e)}"
+                    )
+
+            logger.debug(
+                f"Flushed backfills for {len(pending)} tools "
+                f"({len(tool_ops)} tool writes, {len(keyword_ops)} keyword writes)"
+            )
+
+    async def close(self) -> None:
+        """Stop the background flusher and write whatever is still queued."""
+        if self._task is not None:
+            # Taking the flush lock first means the task is never cancelled
+            # halfway through writing a batch it already dequeued
+            async with self._flush_lock:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+                self._task = None
+        await self.flush()
+
+
+# Create singleton instance
+tool_backfill_queue = ToolBackfillQueue()
@@ -0,0 +1,155 @@
+"""
+ETag and Cache-Control helpers for the tool endpoints.
+
+Detail ETags are derived from the tool itself (id, updated_at and the
+fields that change without touching updated_at). Listing ETags are derived
+from the serialized tools on the page, plus the total and cursor, so they
+only change when the page does and every worker computes the same one.
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from .models import PaginatedToolsResponse, SparseToolsResponse, ToolResponse
+
+PUBLIC_TOOLS_MAX_AGE = int(os.getenv("PUBLIC_TOOLS_MAX_AGE", "60"))
+
+# Shared caches (CDNs) may keep public responses for max-age seconds and
+# serve them while revalidating; authenticated responses are only cached by
+# the browser and always revalidated with the ETag.
+PUBLIC_CACHE_CONTROL = (
+    f"public, max-age={PUBLIC_TOOLS_MAX_AGE}, "
+    f"stale-while-revalidate={PUBLIC_TOOLS_MAX_AGE * 5}"
+)
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _etag(*parts: object) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def tool_etag(tool: ToolResponse, *extra: object) -> str:
+    """Strong ETag for a single tool response."""
+    return _etag(
+        "tool",
+        tool.id,
+        tool.updated_at.isoformat() if tool.updated_at else "",
+        tool.saved_numbers,
+        tool.is_featured,
+        *extra,
+    )
+
+
+def listing_etag(request: Request, page: Dict[str, Any], *extra: object) -> str:
+    """
+    Strong ETag for a page of tools built by the tools service.
+
+    Hashes each tool as serialized, so any rendered field counts, including
+    the ones a sparse (fields=) page selects and saved_by_user on a
+    per-user listing. The query string is included because it selects the
+    fields that are rendered.
+    """
+    tools = [tool.model_dump_json() for tool in page["tools"]]
+    return _etag(
+        "list",
+        sorted(request.query_params.multi_items()),
+        page.get("total"),
+        page.get("next_cursor"),
+        tools,
+        *extra,
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag (weak comparison, as RFC 9110 asks)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {
+        candidate.strip().removeprefix("W/") for candidate in header.split(",")
+    }
+    return etag in candidates
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    """Attach validators to a response (injected or returned)."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Build an empty 304 response carrying the same validators."""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, cache_control)
+    return response
+
+
+def check_listing(
+    request: Request,
+    response: Response,
+    page: Dict[str, Any],
+    public: bool = True,
+    extra: Tuple[object, ...] = (),
+) -> Optional[Response]:
+    """
+    Answer a conditional listing request once the page has been fetched.
+
+    Returns a 304 response when the client's copy is current, which saves
+    rendering and sending the page. Otherwise sets the ETag and
+    Cache-Control headers on the injected response and returns None so the
+    endpoint renders the page.
+    """
+    etag = listing_etag(request, page, *extra)
+    cache_control = PUBLIC_CACHE_CONTROL if public else PRIVATE_CACHE_CONTROL
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    set_cache_headers(response, etag, cache_control)
+    return None
+
+
+def model_response(
+    model: BaseModel, response: Response, exclude_unset: bool = True
+) -> Response:
+    """
+    Render a model as JSON in one pass, bypassing response_model validation.
+
+    By default fields that were never set are left out. Endpoints returning a
+    Response directly lose the headers set on the injected response, so the
+    validators are copied over.
+    """
+    rendered = Response(
+        content=model.model_dump_json(exclude_unset=exclude_unset),
+        media_type="application/json",
+    )
+    for header in ("ETag", "Cache-Control"):
+        if header in response.headers:
+            rendered.headers[header] = response.headers[header]
+    return rendered
+
+
+def tools_page_response(
+    page: Dict[str, Any], response: Response, sparse: bool = False
+) -> Response:
+    """
+    Render a page of tools built by the tools service.
+
+    The tools are trusted ToolResponse (or ToolSummary) objects, so the page
+    model is constructed without validation and serialized straight to JSON.
+
+    Args:
+        page: tools, total, skip, limit and optionally next_cursor
+        response: The injected response carrying the cache validators
+        sparse: Whether the page holds ToolSummary objects (fields=)
+    """
+    if sparse:
+        return model_response(SparseToolsResponse(**page), response)
+    return model_response(
+        PaginatedToolsResponse.model_construct(**page), response, exclude_unset=False
+    )
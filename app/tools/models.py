@@ -111,6 +111,41 @@ class ToolResponse(ToolBase):
     )
 
 
+class ToolSummary(BaseModel):
+    """
+    Sparse tool response for listings requested with fields=.
+
+    Only id, unique_id and the requested fields are set; responses are
+    serialized with exclude_unset so the other fields are left out.
+    """
+
+    id: UUID
+    unique_id: str
+    price: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    link: Optional[str] = None
+    rating: Optional[str] = None
+    saved_numbers: Optional[int] = None
+    category: Optional[str] = None
+    features: Optional[List[str]] = None
+    is_featured: Optional[bool] = None
+    keywords: Optional[List[str]] = None
+    categories: Optional[List[Dict[str, Any]]] = None
+    created_at: Optional[datetime.datetime] = None
+    updated_at: Optional[datetime.datetime] = None
+
+
+class SparseToolsResponse(BaseModel):
+    """Response model for a paginated list of sparse tools."""
+
+    tools: List[ToolSummary]
+    total: Optional[int] = None
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+
+
 class PaginatedToolsResponse(BaseModel):
     """Response model for paginated list of tools."""
 
@@ -118,8 +153,36 @@ class PaginatedToolsResponse(BaseModel):
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True,
+        json_encoders={ObjectId: lambda oid: str(oid), UUID: lambda uuid: str(uuid)},
+    )
+
+
+class ToolBatchRequest(BaseModel):
+    """Request model for looking up several tools at once."""
+
+    unique_ids: List[str]
+
+
+class ToolBatchResponse(BaseModel):
+    """Response model for a batch tool lookup."""
+
+    tools: List[ToolResponse]
+    missing: List[str]
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
         json_encoders={ObjectId: lambda oid: str(oid), UUID: lambda uuid: str(uuid)},
     )
+
+
+class ToolFacetsResponse(BaseModel):
+    """Response model for tool facet counts."""
+
+    total: int
+    categories: Dict[str, int]
+    pricing: Dict[str, int]
+    featured: Dict[str, int]
@@ -2,17 +2,24 @@
 Public routes for tools, accessible without authentication
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import Optional, List
 
+from .http_cache import check_listing, tools_page_response
 from .models import PaginatedToolsResponse
-from .tools_service import get_tools, keyword_search_tools, search_tools
+from .tools_service import (
+    get_featured_tools_page,
+    get_tools_page,
+    parse_tool_fields,
+)
 
 public_router = APIRouter(prefix="/public/tools", tags=["public_tools"])
 
 
 @public_router.get("/", response_model=PaginatedToolsResponse)
 async def list_public_tools(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(500, ge=1, le=1000),
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -21,10 +28,19 @@ async def list_public_tools(
         None, description="Field to sort by (name, created_at, updated_at)"
     ),
     sort_order: str = Query("asc", description="Sort order (asc or desc)"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the next_cursor of a previous page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return besides id and unique_id",
+    ),
 ):
     """
     List all tools with pagination, filtering and sorting.
     This endpoint is publicly accessible without authentication.
+    Pass the returned next_cursor back as cursor to fetch the following page.
+    Pass fields (e.g. name,price) to get only those fields besides id and unique_id.
     """
     # Build filters dictionary from query parameters
     filters = {}
@@ -47,23 +63,76 @@ async def list_public_tools(
             status_code=400, detail="Invalid sort_order. Must be 'asc' or 'desc'"
         )
 
+    tool_fields = parse_tool_fields(fields)
+
     # Get the tools with filtering and sorting
-    tools = await get_tools(
+    page = await get_tools_page(
         skip=skip,
         limit=limit,
         filters=filters if filters else None,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        estimate_total=True,
+        fields=tool_fields,
     )
 
-    # Get total count with the same filters
-    total = await get_tools(count_only=True, filters=filters if filters else None)
+    result = {
+        "tools": page["tools"],
+        "total": page["total"],
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": page["next_cursor"],
+    }
+    not_modified_response = check_listing(request, response, result)
+    if not_modified_response:
+        return not_modified_response
+    return tools_page_response(result, response, sparse=tool_fields is not None)
+
+
+async def _list_featured_tools(
+    skip: int,
+    limit: int,
+    search: Optional[str],
+    category: Optional[str],
+    price_type: Optional[str],
+    sort_by: Optional[str],
+    sort_order: str,
+) -> dict:
+    """Validate the listing parameters and fetch one page of featured tools."""
+    # Validate sort_by field if provided
+    valid_sort_fields = ["name", "created_at", "updated_at", "price"]
+    if sort_by and sort_by not in valid_sort_fields:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort_by field. Must be one of: {', '.join(valid_sort_fields)}",
+        )
 
-    return {"tools": tools, "total": total, "skip": skip, "limit": limit}
+    # Validate sort_order
+    if sort_order.lower() not in ["asc", "desc"]:
+        raise HTTPException(
+            status_code=400, detail="Invalid sort_order. Must be 'asc' or 'desc'"
+        )
+
+    # Featured, category and price filters are applied in the query itself,
+    # so only the requested page is loaded
+    page = await get_featured_tools_page(
+        skip=skip,
+        limit=limit,
+        search=search,
+        category=category,
+        price=price_type,
+        sort_by=sort_by,
+        sort_order=sort_order,
+    )
+
+    return {"tools": page["tools"], "total": page["total"], "skip": skip, "limit": limit}
 
 
 @public_router.get("/featured", response_model=PaginatedToolsResponse)
 async def get_featured_tools(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None, description="Search term for filtering tools"),
@@ -83,70 +152,19 @@ async def get_featured_tools(
     - **sort_by**: Field to sort by
     - **sort_order**: Sort order (asc or desc)
     """
-    # Apply filter for featured tools only
-    filters = {"is_featured": True}
-
-    # Add additional filters if provided
-    if category:
-        filters["category"] = category
-    if price_type:
-        filters["price"] = price_type
-
-    # Validate sort_by field if provided
-    valid_sort_fields = ["name", "created_at", "updated_at", "price"]
-    if sort_by and sort_by not in valid_sort_fields:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid sort_by field. Must be one of: {', '.join(valid_sort_fields)}",
-        )
-
-    # Validate sort_order
-    if sort_order.lower() not in ["asc", "desc"]:
-        raise HTTPException(
-            status_code=400, detail="Invalid sort_order. Must be 'asc' or 'desc'"
-        )
-
-    # If search term is provided, use search_tools
-    if search and search.strip():
-        # Use search_tools, then filter for featured tools in memory
-        search_results = await search_tools(query=search, skip=0, limit=1000)
-
-        # Filter to only include featured tools
-        filtered_tools = [tool for tool in search_results if tool.is_featured]
-
-        # Apply other filters
-        if category:
-            filtered_tools = [
-                tool for tool in filtered_tools if tool.category == category
-            ]
-        if price_type:
-            filtered_tools = [
-                tool for tool in filtered_tools if tool.price == price_type
-            ]
-
-        # Apply pagination
-        total = len(filtered_tools)
-        tools = filtered_tools[skip : skip + limit]
-    else:
-        # No search term, use regular get_tools with filters
-        tools = await get_tools(
-            skip=skip,
-            limit=limit,
-            filters=filters,
-            sort_by=sort_by,
-            sort_order=sort_order,
-        )
-        total = await get_tools(count_only=True, filters=filters)
-
-    # Ensure tools is always a list, even if None is returned
-    if tools is None:
-        tools = []
-
-    return {"tools": tools, "total": total, "skip": skip, "limit": limit}
+    page = await _list_featured_tools(
+        skip, limit, search, category, price_type, sort_by, sort_order
+    )
+    not_modified_response = check_listing(request, response, page)
+    if not_modified_response:
+        return not_modified_response
+    return tools_page_response(page, response)
 
 
 @public_router.get("/sponsored", response_model=PaginatedToolsResponse)
 async def get_sponsored_tools(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None, description="Search term for filtering tools"),
@@ -167,63 +185,10 @@ async def get_sponsored_tools(
     - **sort_by**: Field to sort by
     - **sort_order**: Sort order (asc or desc)
     """
-    # Apply filter for featured tools only (reusing the same field)
-    filters = {"is_featured": True}
-
-    # Add additional filters if provided
-    if category:
-        filters["category"] = category
-    if price_type:
-        filters["price"] = price_type
-
-    # Validate sort_by field if provided
-    valid_sort_fields = ["name", "created_at", "updated_at", "price"]
-    if sort_by and sort_by not in valid_sort_fields:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid sort_by field. Must be one of: {', '.join(valid_sort_fields)}",
-        )
-
-    # Validate sort_order
-    if sort_order.lower() not in ["asc", "desc"]:
-        raise HTTPException(
-            status_code=400, detail="Invalid sort_order. Must be 'asc' or 'desc'"
-        )
-
-    # If search term is provided, use search_tools
-    if search and search.strip():
-        # Use search_tools, then filter for featured tools in memory
-        search_results = await search_tools(query=search, skip=0, limit=1000)
-
-        # Filter to only include featured tools
-        filtered_tools = [tool for tool in search_results if tool.is_featured]
-
-        # Apply other filters
-        if category:
-            filtered_tools = [
-                tool for tool in filtered_tools if tool.category == category
-            ]
-        if price_type:
-            filtered_tools = [
-                tool for tool in filtered_tools if tool.price == price_type
-            ]
-
-        # Apply pagination
-        total = len(filtered_tools)
-        tools = filtered_tools[skip : skip + limit]
-    else:
-        # No search term, use regular get_tools with filters
-        tools = await get_tools(
-            skip=skip,
-            limit=limit,
-            filters=filters,
-            sort_by=sort_by,
-            sort_order=sort_order,
-        )
-        total = await get_tools(count_only=True, filters=filters)
-
-    # Ensure tools is always a list, even if None is returned
-    if tools is None:
-        tools = []
-
-    return {"tools": tools, "total": total, "skip": skip, "limit": limit}
+    page = await _list_featured_tools(
+        skip, limit, search, category, price_type, sort_by, sort_order
+    )
+    not_modified_response = check_listing(request, response, page)
+    if not_modified_response:
+        return not_modified_response
+    return tools_page_response(page, response)
@@ -1,22 +1,55 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
+import json
+import zlib
 
 from ..auth.dependencies import get_current_active_user, get_admin_user
-from .models import ToolCreate, ToolUpdate, ToolResponse, PaginatedToolsResponse
+from .models import (
+    ToolCreate,
+    ToolUpdate,
+    ToolResponse,
+    PaginatedToolsResponse,
+    ToolBatchRequest,
+    ToolBatchResponse,
+    ToolFacetsResponse,
+)
 from ..models.user import UserResponse
+from ..services.facets_service import facet_counter
+# Module import: favorites_service imports the tools package, which loads
+# this module, so its names are looked up at call time
+from ..services import favorites_service
 from .tools_service import (
-    get_tools,
+    get_tools_page,
+    parse_tool_fields,
+    export_tools,
     get_tool_by_id,
     get_tool_by_unique_id,
+    get_tools_by_unique_ids,
     create_tool,
     update_tool,
     delete_tool,
-    search_tools,
+    search_tools_page,
     toggle_tool_featured_status,
     toggle_tool_featured_status_by_unique_id,
-    keyword_search_tools,
-    get_tool_with_favorite_status,
+    keyword_search_tools_page,
+    peek_cached_tool,
+    tool_cache,
+    tool_count_cache,
+    TOOL_BATCH_MAX_IDS,
+)
+from .backfill import tool_backfill_queue
+from .http_cache import (
+    PRIVATE_CACHE_CONTROL,
+    check_listing,
+    etag_matches,
+    model_response,
+    not_modified,
+    set_cache_headers,
+    tool_etag,
+    tools_page_response,
 )
 from ..logger import logger
 
@@ -25,6 +58,7 @@ router = APIRouter(prefix="/tools", tags=["tools"])
 
 @router.get("/", response_model=PaginatedToolsResponse)
 async def list_tools(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(500, ge=1, le=1000),
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -34,10 +68,19 @@ async def list_tools(
         None, description="Field to sort by (name, created_at, updated_at)"
     ),
     sort_order: str = Query("asc", description="Sort order (asc or desc)"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the next_cursor of a previous page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return besides id and unique_id",
+    ),
     current_user: UserResponse = Depends(get_current_active_user),
 ):
     """
     List all tools with pagination, filtering and sorting.
+    Pass the returned next_cursor back as cursor to fetch the following page.
+    Pass fields (e.g. name,price) to get only those fields besides id and unique_id.
     """
     # Build filters dictionary from query parameters
     filters = {}
@@ -66,24 +109,36 @@ async def list_tools(
             status_code=400, detail="Invalid sort_order. Must be 'asc' or 'desc'"
         )
 
+    tool_fields = parse_tool_fields(fields)
+
     # Get the tools with filtering and sorting
-    tools = await get_tools(
+    page = await get_tools_page(
         skip=skip,
         limit=limit,
         filters=filters if filters else None,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        estimate_total=True,
+        fields=tool_fields,
     )
+    if tool_fields is None:
+        await favorites_service.mark_saved_tools(current_user.id, page["tools"])
 
-    # Get total count with the same filters
-    total = await get_tools(count_only=True, filters=filters if filters else None)
-
-    return {"tools": tools, "total": total, "skip": skip, "limit": limit}
+    result = {
+        "tools": page["tools"],
+        "total": page["total"],
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": page["next_cursor"],
+    }
+    return tools_page_response(result, response, sparse=tool_fields is not None)
 
 
 @router.get("/search", response_model=PaginatedToolsResponse)
 async def search_tools_endpoint(
     q: str,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: UserResponse = Depends(get_current_active_user),
@@ -91,48 +146,190 @@ async def search_tools_endpoint(
     """
     Search for tools by name or description.
     """
-    tools = await search_tools(query=q, skip=skip, limit=limit)
-    total = await search_tools(query=q, count_only=True)
-    return {"tools": tools, "total": total, "skip": skip, "limit": limit}
+    page = await search_tools_page(query=q, skip=skip, limit=limit)
+    await favorites_service.mark_saved_tools(current_user.id, page["tools"])
+    return tools_page_response(
+        {"tools": page["tools"], "total": page["total"], "skip": skip, "limit": limit},
+        response,
+    )
+
+
+@router.get("/facets", response_model=ToolFacetsResponse)
+async def get_tool_facets(
+    category: Optional[str] = Query(None, description="Filter by category"),
+    is_featured: Optional[bool] = Query(None, description="Filter featured tools"),
+    price_type: Optional[str] = Query(None, description="Filter by price type"),
+):
+    """
+    Get category, pricing and featured counts for the tool catalog.
+
+    Counts are served from memory. Each facet is computed with the other
+    filters applied, so the numbers show how many tools each option would
+    return next to the current selection. Categories are counted by
+    ``categories.id``, as in the category counts; listings filtered by
+    category also match the legacy ``category`` string, so they can return
+    more tools than counted here.
+    """
+    await facet_counter.ensure_loaded()
+    return facet_counter.facets(
+        category=category, price=price_type, is_featured=is_featured
+    )
+
+
+@router.get("/cache/stats")
+async def get_tool_cache_stats(
+    current_user: UserResponse = Depends(get_admin_user),
+):
+    """
+    Get size and hit ratio of the in-process tool caches (admin only).
+
+    Counters are per worker process and reset on restart.
+    """
+    return {
+        "tool_detail": tool_cache.stats(),
+        "tool_counts": tool_count_cache.stats(),
+        "backfill_queue": tool_backfill_queue.stats,
+    }
+
+
+async def _encode_ndjson(
+    records: AsyncIterator[dict], compress: bool, chunk_size: int = 64 * 1024
+) -> AsyncIterator[bytes]:
+    """Serialize records as NDJSON in ~chunk_size pieces, gzipped if asked."""
+    compressor = zlib.compressobj(wbits=31) if compress else None  # gzip framing
+    buffer = bytearray()
+
+    async for record in records:
+        buffer += json.dumps(record, default=str).encode() + b"\n"
+        if len(buffer) >= chunk_size:
+            data = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+            buffer.clear()
+            if data:
+                yield data
+
+    data = bytes(buffer)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+@router.get("/export")
+async def export_tool_catalog(
+    updated_since: Optional[datetime] = Query(
+        None, description="Only export tools updated at or after this time"
+    ),
+    gzip: bool = Query(False, description="Gzip-compress the stream"),
+    current_user: UserResponse = Depends(get_current_active_user),
+):
+    """
+    Stream the whole tool catalog as newline-delimited JSON.
+
+    Tools are read from a database cursor and written as they arrive, so the
+    endpoint uses the same memory for any catalog size. For incremental
+    pulls, pass the newest updated_at from the previous export as
+    updated_since.
+    """
+    headers = {"Cache-Control": "no-cache"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        _encode_ndjson(export_tools(updated_since=updated_since), compress=gzip),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
+
+
+async def _conditional_tool_response(
+    request: Request, response: Response, user_id: str, field: str, value: str, load
+):
+    """
+    Serve a tool with an ETag, answering 304 when the client's copy is current.
+
+    The ETag covers the user's saved_by_user flag, and a warm detail cache
+    plus a warm favorites set let a matching If-None-Match skip MongoDB
+    entirely.
+    """
+    saved_ids = await favorites_service.user_favorites.get(user_id)
+
+    cached = peek_cached_tool(field, value)
+    if cached is not None:
+        etag = tool_etag(cached, cached.unique_id in saved_ids)
+        if etag_matches(request, etag):
+            return not_modified(etag, PRIVATE_CACHE_CONTROL)
+
+    tool = await load(value)
+    if not tool:
+        raise HTTPException(status_code=404, detail="Tool not found")
+
+    # Loaders return copies, so the flag can be set in place
+    tool.saved_by_user = tool.unique_id in saved_ids
+    etag = tool_etag(tool, tool.saved_by_user)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_CACHE_CONTROL)
+    set_cache_headers(response, etag, PRIVATE_CACHE_CONTROL)
+    return tool
 
 
 @router.get("/{tool_id}", response_model=ToolResponse)
 async def get_tool(
     tool_id: UUID,
+    request: Request,
+    response: Response,
     current_user: UserResponse = Depends(get_current_active_user),
 ):
     """
     Get a specific tool by its UUID.
     """
-    tool = await get_tool_by_id(tool_id)
-    if not tool:
-        raise HTTPException(status_code=404, detail="Tool not found")
-    return tool
+    return await _conditional_tool_response(
+        request,
+        response,
+        current_user.id,
+        "id",
+        str(tool_id),
+        lambda value: get_tool_by_id(tool_id),
+    )
 
 
 @router.get("/unique/{unique_id}", response_model=ToolResponse)
 async def get_tool_by_unique_identifier(
     unique_id: str,
+    request: Request,
+    response: Response,
     current_user: UserResponse = Depends(get_current_active_user),
 ):
     """
     Get a specific tool by its unique_id.
     """
-    tool = await get_tool_by_unique_id(unique_id)
-    if not tool:
-        raise HTTPException(status_code=404, detail="Tool not found")
-    return tool
+    return await _conditional_tool_response(
+        request,
+        response,
+        current_user.id,
+        "unique_id",
+        unique_id,
+        get_tool_by_unique_id,
+    )
 
 
 @router.get("/category/{category_slug}", response_model=PaginatedToolsResponse)
 async def get_tools_by_category(
     category_slug: str,
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     sort_by: Optional[str] = Query(
         None, description="Field to sort by (name, created_at, updated_at)"
     ),
     sort_order: str = Query("asc", description="Sort order (asc or desc)"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the next_cursor of a previous page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return besides id and unique_id",
+    ),
     current_user: UserResponse = Depends(get_current_active_user),
 ):
     """
@@ -145,6 +342,8 @@ async def get_tools_by_category(
         limit: Maximum number of items to return
         sort_by: Field to sort by
         sort_order: Sort order ('asc' or 'desc')
+        cursor: Opaque cursor from a previous page, used instead of skip
+        fields: Comma-separated fields to return besides id and unique_id
 
     Returns:
         Paginated list of tools belonging to the specified category
@@ -179,29 +378,40 @@ async def get_tools_by_category(
             status_code=400, detail="Invalid sort_order. Must be 'asc' or 'desc'"
         )
 
-    # Check if any tools exist for this category
-    total = await get_tools(count_only=True, filters=filters)
-
-    if total == 0:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No tools found for category '{category_slug}'",
-        )
+    tool_fields = parse_tool_fields(fields)
 
     # Get tools filtered by category
-    tools = await get_tools(
+    page = await get_tools_page(
         skip=skip,
         limit=limit,
         filters=filters,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        fields=tool_fields,
     )
 
-    # Ensure tools is always a list, even if None is returned
-    if tools is None:
-        tools = []
-
-    return {"tools": tools, "total": total, "skip": skip, "limit": limit}
+    # Check if any tools exist for this category
+    if page["total"] == 0:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No tools found for category '{category_slug}'",
+        )
+    if tool_fields is None:
+        await favorites_service.mark_saved_tools(current_user.id, page["tools"])
+
+    result = {
+        "tools": page["tools"],
+        "total": page["total"],
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": page["next_cursor"],
+    }
+    # saved_by_user is part of the ETag, so saving a tool changes it
+    not_modified_response = check_listing(request, response, result, public=False)
+    if not_modified_response:
+        return not_modified_response
+    return tools_page_response(result, response, sparse=tool_fields is not None)
 
 
 # @router.get("/featured", response_model=PaginatedToolsResponse)
@@ -393,6 +603,7 @@ async def set_tool_featured_status_by_unique_id(
 @router.post("/keyword-search", response_model=PaginatedToolsResponse)
 async def keyword_search_endpoint(
     keywords: List[str],
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: UserResponse = Depends(get_current_active_user),
@@ -419,12 +630,42 @@ async def keyword_search_endpoint(
         )
 
     # Perform the search
-    tools = await keyword_search_tools(
+    page = await keyword_search_tools_page(
         keywords=cleaned_keywords, skip=skip, limit=limit
     )
-    total = await keyword_search_tools(keywords=cleaned_keywords, count_only=True)
+    await favorites_service.mark_saved_tools(current_user.id, page["tools"])
+
+    return tools_page_response(
+        {"tools": page["tools"], "total": page["total"], "skip": skip, "limit": limit},
+        response,
+    )
 
-    return {"tools": tools, "total": total, "skip": skip, "limit": limit}
+
+@router.post("/batch", response_model=ToolBatchResponse)
+async def get_tools_batch(
+    batch: ToolBatchRequest,
+    response: Response,
+    current_user: UserResponse = Depends(get_current_active_user),
+):
+    """
+    Get several tools by unique_id in one request.
+
+    Tools come back in the requested order; unique_ids that match no tool
+    are listed under missing.
+    """
+    if not batch.unique_ids:
+        raise HTTPException(status_code=400, detail="unique_ids list is required")
+    if len(batch.unique_ids) > TOOL_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {TOOL_BATCH_MAX_IDS} unique_ids can be requested at once",
+        )
+
+    result = await get_tools_by_unique_ids(batch.unique_ids)
+    await favorites_service.mark_saved_tools(current_user.id, result["tools"])
+    return model_response(
+        ToolBatchResponse.model_construct(**result), response, exclude_unset=False
+    )
 
 
 @router.get("/unique/{unique_id}/with-favorite", response_model=ToolResponse)
@@ -435,7 +676,8 @@ async def get_tool_with_favorite_by_unique_id(
     """
     Get a specific tool by its unique_id and include whether it is in the user's favorites.
     """
-    tool = await get_tool_with_favorite_status(unique_id, current_user.id)
+    tool = await get_tool_by_unique_id(unique_id)
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
+    await favorites_service.mark_saved_tools(current_user.id, [tool])
     return tool
@@ -2,20 +2,88 @@ from fastapi import HTTPException
 from uuid import UUID, uuid4, uuid5, NAMESPACE_OID
 from datetime import datetime
 import asyncio
-from typing import List, Optional, Union, Dict, Any
-from bson import ObjectId
-
-from ..database.database import tools, database, favorites
-from .models import ToolCreate, ToolUpdate, ToolInDB, ToolResponse
+import base64
+import os
+import binascii
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from bson import ObjectId, json_util
+from pymongo import ReturnDocument
+
+from ..database.database import tools, database
+from .models import ToolCreate, ToolUpdate, ToolInDB, ToolResponse, ToolSummary
 from ..algolia.indexer import algolia_indexer
 from ..categories.service import categories_service
-from collections import Counter
+from ..services.facets_service import facet_counter
+from ..services.cache import LRUCache, catalog_version
+from ..services.keyword_engine import keyword_engine
+from ..services.keyword_store import keyword_store
+from ..services.shares_service import invalidate_tool_shares
+from .backfill import tool_backfill_queue
 
 from ..logger import logger
 
 # Keywords collection
 keywords_collection = database.get_collection("keywords")
 
+# Fields tool listings can be sorted by. Each one is backed by compound indexes
+# on (has_description, field, _id) created in setup_database.
+SORTABLE_FIELDS = ["name", "created_at", "updated_at", "price"]
+
+# Exact match counts keyed by (catalog version, normalized filter). Tool
+# writes bump the catalog version; the TTL bounds staleness from writes made
+# by other worker processes.
+TOOL_COUNT_CACHE_SIZE = int(os.getenv("TOOL_COUNT_CACHE_SIZE", "1024"))
+TOOL_COUNT_CACHE_TTL = int(os.getenv("TOOL_COUNT_CACHE_TTL", "300"))
+tool_count_cache = LRUCache(max_size=TOOL_COUNT_CACHE_SIZE, ttl=TOOL_COUNT_CACHE_TTL)
+
+# Tool detail responses keyed by ("id", id) and ("unique_id", unique_id).
+# Unknown identifiers are cached for a shorter time as _TOOL_NOT_FOUND.
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "5000"))
+TOOL_CACHE_TTL = int(os.getenv("TOOL_CACHE_TTL", "300"))
+TOOL_CACHE_NEGATIVE_TTL = int(os.getenv("TOOL_CACHE_NEGATIVE_TTL", "30"))
+tool_cache = LRUCache(max_size=TOOL_CACHE_SIZE, ttl=TOOL_CACHE_TTL)
+_TOOL_NOT_FOUND = object()
+
+# Maximum number of unique_ids accepted by one batch lookup
+TOOL_BATCH_MAX_IDS = int(os.getenv("TOOL_BATCH_MAX_IDS", "100"))
+
+# Complete featured listings per sort order, keyed by catalog version. Only
+# used while the featured set has at most FEATURED_CACHE_MAX_TOOLS tools.
+FEATURED_CACHE_MAX_TOOLS = int(os.getenv("FEATURED_CACHE_MAX_TOOLS", "2000"))
+featured_tools_cache = LRUCache(max_size=16, ttl=TOOL_CACHE_TTL)
+
+# Fields included in the catalog export, matching ToolResponse
+EXPORT_FIELDS = [
+    "id",
+    "unique_id",
+    "name",
+    "description",
+    "link",
+    "price",
+    "rating",
+    "saved_numbers",
+    "category",
+    "categories",
+    "features",
+    "keywords",
+    "is_featured",
+    "created_at",
+    "updated_at",
+]
+TOOL_EXPORT_BATCH_SIZE = int(os.getenv("TOOL_EXPORT_BATCH_SIZE", "500"))
+
+# Fields a listing can be narrowed to with fields=. id and unique_id are
+# always returned; saved_by_user is per user and never stored.
+SPARSE_TOOL_FIELDS = [
+    field for field in EXPORT_FIELDS if field not in ("id", "unique_id")
+]
+
+# Words stored in the multikey-indexed search_tokens field and matched by the
+# keyword search. Single characters are left out to keep the index small.
+SEARCH_TOKEN_PATTERN = re.compile(r"[a-z0-9]{2,}")
+SEARCH_TOKEN_FIELDS = ["name", "description", "category"]
+
 
 def objectid_to_uuid(objectid_str: str) -> UUID:
     """
@@ -39,8 +107,9 @@ def objectid_to_uuid(objectid_str: str) -> UUID:
 
 def extract_keywords_from_text(text: str) -> List[str]:
     """
-    Extract meaningful keywords from text using basic techniques.
-    Simplified implementation that doesn't use NLTK.
+    Extract meaningful keywords from text.
+    The most frequent words are kept, or the top TF-IDF terms against the
+    tool catalog when KEYWORD_ENGINE_IDF is enabled (see keyword_engine).
 
     Args:
         text: The text to extract keywords from
@@ -48,120 +117,7 @@ def extract_keywords_from_text(text: str) -> List[str]:
     Returns:
         List of keywords extracted from the text
     """
-    if not text:
-        return []
-
-    try:
-        # Basic stopwords list
-        common_stopwords = {
-            "a",
-            "an",
-            "the",
-            "and",
-            "or",
-            "but",
-            "if",
-            "then",
-            "else",
-            "when",
-            "at",
-            "from",
-            "by",
-            "for",
-            "with",
-            "about",
-            "against",
-            "between",
-            "into",
-            "through",
-            "during",
-            "before",
-            "after",
-            "above",
-            "below",
-            "to",
-            "of",
-            "in",
-            "on",
-            "off",
-            "over",
-            "under",
-            "again",
-            "further",
-            "then",
-            "once",
-            "here",
-            "there",
-            "where",
-            "why",
-            "how",
-            "all",
-            "any",
-            "both",
-            "each",
-            "few",
-            "more",
-            "most",
-            "other",
-            "some",
-            "such",
-            "no",
-            "nor",
-            "not",
-            "only",
-            "own",
-            "same",
-            "so",
-            "than",
-            "too",
-            "very",
-            "can",
-            "will",
-            "just",
-            "should",
-            "now",
-            "tool",
-            "tools",
-            "ai",
-            "intelligence",
-            "artificial",
-            "model",
-            "models",
-            "system",
-            "platform",
-            "app",
-            "application",
-            "software",
-            "service",
-            "solution",
-            "technology",
-        }
-
-        # Simple tokenization by splitting on whitespace
-        tokens = text.lower().split()
-
-        # Filter out stopwords, short words, and non-alphanumeric tokens
-        filtered_tokens = [
-            token
-            for token in tokens
-            if token not in common_stopwords and len(token) > 2 and token.isalnum()
-        ]
-
-        # Count term frequency
-        token_counts = Counter(filtered_tokens)
-
-        # Get the most common terms (limit to 10)
-        keywords = [token for token, count in token_counts.most_common(10)]
-
-        return keywords
-    except Exception as e:
-        logger.error(f"Keyword extraction failed: {str(e)}")
-        # Ultra-basic fallback
-        if not text:
-            return []
-        words = text.lower().split()
-        basic_keywords = list(set([w for w in words if len(w) > 3]))[:10]
-        return basic_keywords
+    return keyword_engine.extract(text, limit=10)
 
 
 def extract_keywords(tool: Dict[str, Any]) -> List[str]:
@@ -174,48 +130,58 @@ def extract_keywords(tool: Dict[str, Any]) -> List[str]:
     Returns:
         List of keywords extracted from the tool
     """
-    all_keywords = set()
-
-    # Use existing keywords if available
-    if "keywords" in tool and tool["keywords"]:
-        all_keywords.update(tool["keywords"])
-        return list(all_keywords)
-
-    # Extract keywords from name
-    if "name" in tool and tool["name"]:
-        name_keywords = extract_keywords_from_text(tool["name"])
-        all_keywords.update(name_keywords)
-
-    # Extract keywords from description
-    if "description" in tool and tool["description"]:
-        desc_keywords = extract_keywords_from_text(tool["description"])
-        all_keywords.update(desc_keywords)
-
-    # Include category as a keyword
-    if "category" in tool and tool["category"]:
-        if isinstance(tool["category"], str):
-            category_words = extract_keywords_from_text(tool["category"])
-            all_keywords.update(category_words)
-
-    # Include features as keywords
-    if "features" in tool and tool["features"]:
-        for feature in tool["features"]:
-            if isinstance(feature, str):
-                feature_keywords = extract_keywords_from_text(feature)
-                all_keywords.update(feature_keywords)
-
-    # Include tags as keywords
-    if "tags" in tool and tool["tags"]:
-        for tag in tool["tags"]:
+    return extract_keywords_batch([tool])[0]
+
+
+def extract_keywords_batch(tool_list: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Extract keywords from several tool documents in one keyword engine pass.
+
+    Tools that already have keywords keep them. For the others, the name,
+    description, category and features are keyworded together, then tags
+    and the pricing type are added.
+
+    Args:
+        tool_list: Tool documents from MongoDB
+
+    Returns:
+        One list of keywords per tool, in order
+    """
+    # Texts to keyword, and which tool each one belongs to
+    texts = []
+    owners = []
+    for index, tool in enumerate(tool_list):
+        if tool.get("keywords"):
+            continue
+        fields = [tool.get("name"), tool.get("description")]
+        if isinstance(tool.get("category"), str):
+            fields.append(tool["category"])
+        fields.extend(
+            feature for feature in tool.get("features") or [] if isinstance(feature, str)
+        )
+        for text in fields:
+            if text:
+                texts.append(text)
+                owners.append(index)
+
+    keyword_sets = [set(tool.get("keywords") or []) for tool in tool_list]
+    for index, keywords in zip(owners, keyword_engine.extract_many(texts, limit=10)):
+        keyword_sets[index].update(keywords)
+
+    for tool, all_keywords in zip(tool_list, keyword_sets):
+        if tool.get("keywords"):
+            continue
+
+        # Include tags as keywords
+        for tag in tool.get("tags") or []:
             if isinstance(tag, str):
                 all_keywords.add(tag.lower())
 
-    # For pricing_type specifically, include it as a keyword
-    if "pricing_type" in tool and tool["pricing_type"]:
-        pricing_type = tool["pricing_type"].lower()
-        all_keywords.add(pricing_type)
+        # For pricing_type specifically, include it as a keyword
+        if tool.get("pricing_type"):
+            all_keywords.add(tool["pricing_type"].lower())
 
-    return list(all_keywords)
+    return [list(all_keywords) for all_keywords in keyword_sets]
 
 
 async def update_tool_keywords(tool_id: str, tool_name: str, keywords: List[str]):
@@ -227,20 +193,89 @@ async def update_tool_keywords(tool_id: str, tool_name: str, keywords: List[str]
         tool_name: The tool name
         keywords: List of keywords
     """
-    # Store each keyword in keywords collection
-    for keyword in keywords:
-        await keywords_collection.update_one(
-            {"keyword": keyword},
-            {
-                "$set": {"updated_at": datetime.utcnow()},
-                "$setOnInsert": {"created_at": datetime.utcnow()},
-                "$inc": {"frequency": 1},
-                "$addToSet": {
-                    "tools": {"tool_id": str(tool_id), "tool_name": tool_name}
-                },
-            },
-            upsert=True,
-        )
+    # All keywords go out in one bulk write
+    await keyword_store.upsert_tool_keywords([(tool_id, tool_name, keywords)])
+
+
+def _record_tool_mutation(
+    before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+) -> None:
+    """
+    Keep in-memory catalog state in step with a tool write.
+
+    Args:
+        before: The tool document before the write (None on create)
+        after: The tool document after the write (None on delete)
+    """
+    facet_counter.apply(before, after)
+    # Invalidates every cached count
+    catalog_version.bump()
+    # Drop cached detail responses (and negative entries) for both versions
+    for tool in (before, after):
+        if tool:
+            _invalidate_cached_tool(tool)
+            # Share pages embed the tool
+            invalidate_tool_shares(tool.get("unique_id"))
+
+
+def _tool_cache_keys(tool: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Return the detail cache keys a tool document can be looked up by."""
+    keys = []
+    if tool.get("id"):
+        keys.append(("id", str(tool["id"])))
+    elif tool.get("_id"):
+        keys.append(("id", str(objectid_to_uuid(tool["_id"]))))
+    if tool.get("unique_id"):
+        keys.append(("unique_id", tool["unique_id"]))
+    return keys
+
+
+def _invalidate_cached_tool(tool: Dict[str, Any]) -> None:
+    for key in _tool_cache_keys(tool):
+        tool_cache.delete(key)
+
+
+def peek_cached_tool(field: str, value: str) -> Optional[ToolResponse]:
+    """
+    Return the cached response for a tool without touching MongoDB.
+
+    Args:
+        field: "id" or "unique_id"
+        value: The identifier value
+
+    Returns:
+        The cached ToolResponse (not a copy; do not modify it) or None
+    """
+    cached = tool_cache.get((field, value))
+    return cached if isinstance(cached, ToolResponse) else None
+
+
+async def _get_cached_tool(
+    key: Tuple[str, str], query: Dict[str, Any]
+) -> Optional[ToolResponse]:
+    """
+    Read-through lookup for a single tool.
+
+    Hits return a copy so callers can set per-user fields (saved_by_user)
+    without changing the cached response.
+    """
+    cached = tool_cache.get(key)
+    if cached is _TOOL_NOT_FOUND:
+        return None
+    if cached is not None:
+        return cached.model_copy()
+
+    tool = await tools.find_one(query)
+    if not tool:
+        tool_cache.set(key, _TOOL_NOT_FOUND, ttl=TOOL_CACHE_NEGATIVE_TTL)
+        return None
+
+    tool_response = await create_tool_response(tool)
+    if tool_response:
+        for cache_key in _tool_cache_keys(tool):
+            tool_cache.set(cache_key, tool_response)
+        return tool_response.model_copy()
+    return None
 
 
 async def create_tool_response(tool: Dict[str, Any]) -> Optional[ToolResponse]:
@@ -260,19 +295,13 @@ async def create_tool_response(tool: Dict[str, Any]) -> Optional[ToolResponse]:
                 # Convert ObjectId to a UUID
                 derived_uuid = objectid_to_uuid(objectid)
                 tool_id = str(derived_uuid)
-                # Optionally log that we're deriving a UUID from _id
-                logger.info(
+                logger.debug(
                     f"Derived UUID {tool_id} from ObjectId {objectid} for tool '{tool.get('name')}'"
                 )
 
-                # Update the tool with the derived UUID to avoid future conversion
-                try:
-                    await tools.update_one({"_id": objectid}, {"$set": {"id": tool_id}})
-                    logger.info(
-                        f"Updated tool {tool.get('name')} with derived UUID {tool_id}"
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to update tool with derived UUID: {e}")
+                # Store the derived UUID to avoid future conversion. The write
+                # is batched in the background so reads stay write-free.
+                tool_backfill_queue.enqueue(objectid, {"id": tool_id})
             else:
                 # If both 'id' is empty/missing and '_id' is missing, generate a new UUID
                 tool_id = str(uuid4())
@@ -281,61 +310,452 @@ async def create_tool_response(tool: Dict[str, Any]) -> Optional[ToolResponse]:
                     f"Tool has empty or missing 'id' and no '_id' field. Generated new ID: {tool_id}. Tool: {tool.get('name')}"
                 )
 
-        # Extract keywords if not already present and update in the background
+        # Extract keywords if not already present and store them in the background
         if not tool.get("keywords"):
             # Extract keywords
             keywords = extract_keywords(tool)
 
-            # Update in background to avoid blocking the response
-            if "_id" in tool:
-                # Update the tool with keywords
-                async def update_tool_task():
-                    await tools.update_one(
-                        {"_id": tool["_id"]},
-                        {
-                            "$set": {
-                                "keywords": keywords,
-                                "updated_at": datetime.utcnow(),
-                            }
-                        },
-                    )
-
-                asyncio.create_task(update_tool_task())
-
-                # Update keywords collection in background
-                async def update_keywords_task():
-                    await update_tool_keywords(
-                        str(tool["_id"]), tool.get("name", "Unknown"), keywords
-                    )
-
-                asyncio.create_task(update_keywords_task())
+            if "_id" in tool and keywords:
+                tool_backfill_queue.enqueue(
+                    tool["_id"],
+                    {"keywords": keywords},
+                    tool_name=tool.get("name", "Unknown"),
+                )
 
             # Add the keywords to the response
             tool["keywords"] = keywords
 
-        return ToolResponse(
-            id=tool_id,  # Use the determined ID (valid UUID string)
-            price=tool.get("price") or "",
-            name=tool.get("name") or "",
-            description=tool.get("description") or "",
-            link=tool.get("link") or "",
-            unique_id=tool.get("unique_id") or "",
-            rating=tool.get("rating"),
-            saved_numbers=tool.get("saved_numbers"),
-            created_at=tool.get("created_at") or datetime.utcnow(),
-            updated_at=tool.get("updated_at") or datetime.utcnow(),
-            category=tool.get("category"),
-            features=tool.get("features"),
-            is_featured=tool.get("is_featured", False),
-            saved_by_user=False,  # Default value, will be set per-user when implemented
-            keywords=tool.get("keywords", []),  # Include keywords in the response
-            categories=tool.get("categories"),
+        # Missing timestamps fall back to when the document was created, so
+        # the response (and the listing ETag hashed from it) is stable
+        objectid = tool.get("_id")
+        created_at = tool.get("created_at") or (
+            objectid.generation_time.replace(tzinfo=None)
+            if isinstance(objectid, ObjectId)
+            else datetime.utcnow()
         )
+
+        values = {
+            "id": tool_id,  # Use the determined ID (valid UUID string)
+            "price": tool.get("price") or "",
+            "name": tool.get("name") or "",
+            "description": tool.get("description") or "",
+            "link": tool.get("link") or "",
+            "unique_id": tool.get("unique_id") or "",
+            "rating": tool.get("rating"),
+            "saved_numbers": tool.get("saved_numbers"),
+            "created_at": created_at,
+            "updated_at": tool.get("updated_at") or created_at,
+            "category": tool.get("category"),
+            "features": tool.get("features"),
+            "is_featured": tool.get("is_featured", False),
+            "saved_by_user": False,  # Default value, set per user by the favorites lookups
+            "keywords": tool.get("keywords", []),  # Include keywords in the response
+            "categories": tool.get("categories"),
+        }
+
+        # Validating a dict runs entirely in pydantic-core; it measured faster
+        # than model_construct, which fills the model in Python
+        return ToolResponse.model_validate(values)
     except Exception as e:
         logger.error(f"Error creating tool response: {str(e)}")
         return None
 
 
+def has_description_flag(description: Optional[str]) -> int:
+    """
+    Return the stored ``has_description`` flag for a description.
+
+    Listings sort on this flag first so tools with a description come before
+    tools without one.
+    """
+    return 1 if description else 0
+
+
+def tokenize_search_text(text: Any) -> List[str]:
+    """Split text into lowercase search tokens."""
+    if not isinstance(text, str):
+        return []
+    return SEARCH_TOKEN_PATTERN.findall(text.lower())
+
+
+def build_search_tokens(tool: Dict[str, Any]) -> List[str]:
+    """
+    Return the stored ``search_tokens`` of a tool document.
+
+    Keyword search matches these instead of running regexes over name,
+    description and category, so it can use the multikey index created in
+    setup_database.
+
+    Args:
+        tool: Tool document (or a merged document for an update)
+
+    Returns:
+        Sorted, de-duplicated list of tokens
+    """
+    tokens = set()
+    for field in SEARCH_TOKEN_FIELDS:
+        tokens.update(tokenize_search_text(tool.get(field)))
+    for keyword in tool.get("keywords") or []:
+        tokens.update(tokenize_search_text(keyword))
+    return sorted(tokens)
+
+
+def _build_tools_query(filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the MongoDB query for a tool listing from its filters.
+
+    Args:
+        filters: Dictionary of field-value pairs for filtering
+
+    Returns:
+        The MongoDB query document
+    """
+    query = {}
+
+    if not filters:
+        return query
+
+    for field, value in filters.items():
+        # Handle special filter cases
+        if field == "category":
+            # Look for category in both the "category" field and the "categories" array
+            query["$or"] = [
+                {"category": value},  # Direct match on category field
+                {"categories.id": value},  # Match on categories.id in array
+            ]
+        elif field == "is_featured":
+            # Correctly convert string values from query parameters to boolean
+            if isinstance(value, str):
+                if value.lower() == "true":
+                    query["is_featured"] = True
+                elif value.lower() == "false":
+                    # When looking for non-featured tools, need to handle tools
+                    # where the field doesn't exist (count as non-featured)
+                    query["$or"] = [
+                        {"is_featured": False},
+                        {"is_featured": {"$exists": False}},
+                    ]
+                else:
+                    # If it's not a valid boolean string, use the value as-is
+                    query["is_featured"] = value
+            else:
+                # For boolean values
+                if value is False:
+                    # Include both explicit False and missing field
+                    query["$or"] = [
+                        {"is_featured": False},
+                        {"is_featured": {"$exists": False}},
+                    ]
+                else:
+                    query["is_featured"] = bool(value)
+
+            # Log the value for debugging
+            logger.info(
+                f"Applying is_featured filter with value: {value} (type: {type(value)}), query: {query}"
+            )
+        elif field == "price":
+            query["price"] = value
+        elif field == "features":
+            if isinstance(value, list):
+                query["features"] = {"$all": value}
+            else:
+                query["features"] = value
+        else:
+            # Default to exact match for other fields
+            query[field] = value
+
+    return query
+
+
+def _build_sort_spec(
+    sort_by: Optional[str] = None, sort_order: Optional[str] = "asc"
+) -> List[Tuple[str, int]]:
+    """
+    Build the sort specification for a tool listing.
+
+    Tools with a description always come first. Within that, tools are ordered
+    by the requested field with _id as a tie-breaker, which gives every tool a
+    unique position and makes keyset pagination possible. Without a sort field
+    the listing follows insertion order.
+    """
+    if not sort_by:
+        return [("has_description", -1), ("_id", 1)]
+
+    direction = -1 if (sort_order or "asc").lower() == "desc" else 1
+    return [("has_description", -1), (sort_by, direction), ("_id", direction)]
+
+
+def encode_cursor(tool: Dict[str, Any], sort_spec: List[Tuple[str, int]]) -> str:
+    """
+    Encode the position of a tool in a listing as an opaque cursor.
+
+    Args:
+        tool: The last tool document of a page
+        sort_spec: The sort specification of the listing
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = {
+        "s": [[field, direction] for field, direction in sort_spec],
+        "v": [tool.get(field) for field, _ in sort_spec],
+    }
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_spec: List[Tuple[str, int]]) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: If the cursor is malformed or belongs to a listing with
+            a different sort order
+    """
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+        cursor_spec = [(field, direction) for field, direction in payload["s"]]
+        values = payload["v"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if cursor_spec != sort_spec or len(values) != len(sort_spec):
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor does not match the requested sort order",
+        )
+
+    return values
+
+
+def _after_value(field: str, direction: int, value: Any) -> Optional[Dict[str, Any]]:
+    """
+    Match documents whose field comes strictly after value in sort order.
+
+    MongoDB sorts null and missing values before everything else, so they need
+    explicit handling: nothing sorts before null ascending, and null sorts
+    after every value descending. Returns None when no value can follow.
+    """
+    if value is None:
+        if direction == 1:
+            return {field: {"$ne": None}}
+        return None
+
+    if direction == 1:
+        return {field: {"$gt": value}}
+    return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+
+def _build_keyset_filter(
+    sort_spec: List[Tuple[str, int]], values: List[Any]
+) -> Dict[str, Any]:
+    """
+    Build the filter selecting every document after a cursor position.
+
+    For a sort on (a, b, c) this is: a after va, or a == va and b after vb,
+    or a == va and b == vb and c after vc.
+    """
+    branches = []
+    for i, (field, direction) in enumerate(sort_spec):
+        after = _after_value(field, direction, values[i])
+        if after is None:
+            continue
+
+        conditions = [{sort_spec[j][0]: values[j]} for j in range(i)]
+        conditions.append(after)
+        branches.append(conditions[0] if len(conditions) == 1 else {"$and": conditions})
+
+    if not branches:
+        # Nothing can follow this position
+        return {"_id": {"$exists": False}}
+
+    return {"$or": branches}
+
+
+def _build_tools_pipeline(
+    query: Dict[str, Any],
+    sort_spec: List[Tuple[str, int]],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Build the aggregation pipeline for one page of a tool listing.
+
+    The whole result set is sorted before it is paginated. With a cursor the
+    page starts right after the cursor position and skip is ignored, so deep
+    pages cost the same as the first one.
+    """
+    match = query
+    if cursor:
+        keyset_filter = _build_keyset_filter(sort_spec, decode_cursor(cursor, sort_spec))
+        match = {"$and": [query, keyset_filter]} if query else keyset_filter
+
+    return [{"$match": match}] + _build_page_stages(
+        sort_spec, skip, limit, cursor, projection
+    )
+
+
+def _build_page_stages(
+    sort_spec: List[Tuple[str, int]],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> List[Dict[str, Any]]:
+    """Build the sort/skip/limit stages for one page of an already-matched set."""
+    stages = [{"$sort": dict(sort_spec)}]
+    if skip and not cursor:
+        stages.append({"$skip": skip})
+    stages.append({"$limit": limit})
+    if projection:
+        stages.append({"$project": projection})
+    return stages
+
+
+def parse_tool_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated fields= parameter.
+
+    Args:
+        fields: Value of the fields query parameter
+
+    Returns:
+        The requested fields in order, or None for full tool responses
+
+    Raises:
+        HTTPException: If a field is not one of SPARSE_TOOL_FIELDS
+    """
+    if fields is None or not fields.strip():
+        return None
+
+    requested = []
+    for field in fields.split(","):
+        field = field.strip()
+        if not field or field in ("id", "unique_id") or field in requested:
+            continue
+        if field not in SPARSE_TOOL_FIELDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid field '{field}'. Must be one of: {', '.join(SPARSE_TOOL_FIELDS)}",
+            )
+        requested.append(field)
+    return requested
+
+
+def _build_sparse_projection(
+    fields: List[str], sort_spec: List[Tuple[str, int]]
+) -> Dict[str, int]:
+    """Project the requested fields plus what ids and cursors are built from."""
+    projection = {"id": 1, "unique_id": 1}
+    projection.update({field: 1 for field in fields})
+    # encode_cursor reads the sort fields of the last document
+    projection.update({field: 1 for field, _ in sort_spec})
+    return projection
+
+
+def _build_tool_summaries(
+    documents: List[Dict[str, Any]], fields: List[str]
+) -> List[ToolSummary]:
+    """Convert projected documents to summaries holding only the requested fields."""
+    summaries = []
+    for tool in documents:
+        data = {field: tool[field] for field in fields if field in tool}
+        data["id"] = tool.get("id") or objectid_to_uuid(tool["_id"])
+        data["unique_id"] = tool.get("unique_id") or str(tool["_id"])
+        try:
+            summaries.append(ToolSummary.model_validate(data))
+        except Exception as e:
+            logger.error(f"Error creating tool summary: {str(e)}")
+    return summaries
+
+
+def _build_faceted_pipeline(
+    query: Dict[str, Any], page_stages: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Build a pipeline returning one page and the total match count together.
+
+    The filter is evaluated once; the ``tools`` branch pages through the
+    matches and the ``total`` branch counts them.
+    """
+    return [
+        {"$match": query},
+        {"$facet": {"tools": page_stages, "total": [{"$count": "count"}]}},
+    ]
+
+
+def _count_cache_key(query: Dict[str, Any]) -> Tuple[int, str]:
+    """Key a match count by catalog version and the normalized filter."""
+    return (catalog_version.value, json_util.dumps(query, sort_keys=True))
+
+
+async def _count_tools(query: Dict[str, Any]) -> int:
+    """Count the tools matching a filter, serving repeated filters from cache."""
+    key = _count_cache_key(query)
+    total = tool_count_cache.get(key)
+    if total is None:
+        total = await tools.count_documents(query)
+        tool_count_cache.set(key, total)
+    return total
+
+
+async def _fetch_page_and_total(
+    query: Dict[str, Any],
+    page_stages: List[Dict[str, Any]],
+    keyset_filter: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Fetch one page of matching tools and the total match count.
+
+    When the count for this filter is cached only the page is queried, so the
+    sort and limit can be served straight from an index. Otherwise page and
+    count come back together from one $facet aggregation and the count is
+    cached for the next request.
+
+    Args:
+        query: Filter selecting the whole result set
+        page_stages: Sort/skip/limit stages selecting the page
+        keyset_filter: Extra filter applied to the page only (cursor position)
+
+    Returns:
+        Tuple of (raw tool documents, total match count)
+    """
+    key = _count_cache_key(query)
+    total = tool_count_cache.get(key)
+
+    if total is not None:
+        match = query
+        if keyset_filter:
+            match = {"$and": [query, keyset_filter]} if query else keyset_filter
+        pipeline = [{"$match": match}] + page_stages
+        logger.debug(f"MongoDB aggregation pipeline: {pipeline}")
+        documents = await tools.aggregate(pipeline).to_list(length=None)
+        return documents, total
+
+    if keyset_filter:
+        page_stages = [{"$match": keyset_filter}] + page_stages
+    pipeline = _build_faceted_pipeline(query, page_stages)
+    logger.debug(f"MongoDB aggregation pipeline: {pipeline}")
+
+    result = await tools.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+    if not result:
+        return [], 0
+    total = result[0]["total"][0]["count"] if result[0]["total"] else 0
+    tool_count_cache.set(key, total)
+    return result[0]["tools"], total
+
+
+async def _build_tool_responses(documents: List[Dict[str, Any]]) -> List[ToolResponse]:
+    """Convert raw tool documents to responses, dropping invalid ones."""
+    tools_list = []
+    for tool in documents:
+        tool_response = await create_tool_response(tool)
+        if tool_response:
+            tools_list.append(tool_response)
+    return tools_list
+
+
 async def get_tools(
     skip: int = 0,
     limit: int = 100,
@@ -343,6 +763,7 @@ async def get_tools(
     filters: Optional[Dict[str, Any]] = None,
     sort_by: Optional[str] = None,
     sort_order: Optional[str] = "asc",
+    cursor: Optional[str] = None,
 ) -> Union[List[ToolResponse], int]:
     """
     Retrieve a list of tools with pagination, filtering and sorting.
@@ -354,174 +775,342 @@ async def get_tools(
         filters: Dictionary of field-value pairs for filtering
         sort_by: Field to sort by
         sort_order: Sort order ('asc' or 'desc')
+        cursor: Opaque cursor from get_tools_page; replaces skip
 
     Returns:
         Either a list of tools or the total count
     """
-    # Build the query
-    query = {}
+    if count_only:
+        return await _count_tools(_build_tools_query(filters))
+
+    page = await get_tools_page(
+        skip=skip,
+        limit=limit,
+        filters=filters,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        cursor=cursor,
+    )
+    return page["tools"]
 
-    # Apply filters if provided
-    if filters:
-        for field, value in filters.items():
-            # Handle special filter cases
-            if field == "category":
-                # Look for category in both the "category" field and the "categories" array
-                query["$or"] = [
-                    {"category": value},  # Direct match on category field
-                    {"categories.id": value},  # Match on categories.id in array
-                ]
-            elif field == "is_featured":
-                # Correctly convert string values from query parameters to boolean
-                if isinstance(value, str):
-                    if value.lower() == "true":
-                        query["is_featured"] = True
-                    elif value.lower() == "false":
-                        # When looking for non-featured tools, need to handle tools
-                        # where the field doesn't exist (count as non-featured)
-                        query["$or"] = [
-                            {"is_featured": False},
-                            {"is_featured": {"$exists": False}},
-                        ]
-                    else:
-                        # If it's not a valid boolean string, use the value as-is
-                        query["is_featured"] = value
-                else:
-                    # For boolean values
-                    if value is False:
-                        # Include both explicit False and missing field
-                        query["$or"] = [
-                            {"is_featured": False},
-                            {"is_featured": {"$exists": False}},
-                        ]
-                    else:
-                        query["is_featured"] = bool(value)
 
-                # Log the value for debugging
-                logger.info(
-                    f"Applying is_featured filter with value: {value} (type: {type(value)}), query: {query}"
-                )
-            elif field == "price":
-                query["price"] = value
-            elif field == "features":
-                if isinstance(value, list):
-                    query["features"] = {"$all": value}
-                else:
-                    query["features"] = value
-            else:
-                # Default to exact match for other fields
-                query[field] = value
+async def get_tools_page(
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[Dict[str, Any]] = None,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    estimate_total: bool = False,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Retrieve one page of tools together with the total and the next cursor.
 
-    # Count documents if requested
-    if count_only:
-        return await tools.count_documents(query)
-
-    # Create the cursor with efficient sorting in MongoDB
-    # Use aggregation pipeline for more complex sorting logic
-    pipeline = [{"$match": query}, {"$skip": skip}, {"$limit": limit}]
-
-    # Add sorting stages to the pipeline
-    if sort_by:
-        # First sort by the requested field
-        sort_direction = -1 if sort_order.lower() == "desc" else 1
-        pipeline.append({"$sort": {sort_by: sort_direction}})
-
-    # Add a stage to create a new field indicating if description is empty
-    pipeline.append(
-        {
-            "$addFields": {
-                "has_description": {
-                    "$cond": [
-                        {
-                            "$or": [
-                                {"$eq": ["$description", ""]},
-                                {"$eq": ["$description", None]},
-                            ]
-                        },
-                        0,  # description is empty or null
-                        1,  # description has content
-                    ]
-                }
-            }
-        }
-    )
+    The page and the total come back from a single aggregation. For unfiltered
+    listings, estimate_total swaps the exact count for the collection metadata
+    count, which is run concurrently with the page query and is O(1). With
+    fields, MongoDB only returns those fields and the page holds ToolSummary
+    objects instead of full ToolResponse objects.
 
-    # Sort by the has_description field (prioritize tools with descriptions)
-    # Always sort in descending order (1 = has description comes first)
-    pipeline.append({"$sort": {"has_description": -1}})
+    Args:
+        skip: Number of items to skip for pagination (ignored with a cursor)
+        limit: Maximum number of items to return
+        filters: Dictionary of field-value pairs for filtering
+        sort_by: Field to sort by
+        sort_order: Sort order ('asc' or 'desc')
+        cursor: Opaque cursor returned as next_cursor by a previous call
+        include_total: Whether to count the matching tools at all
+        estimate_total: Use the estimated collection count when unfiltered
+        fields: Fields to return besides id and unique_id (see parse_tool_fields)
 
-    # Log the pipeline for debugging
-    logger.debug(f"MongoDB aggregation pipeline: {pipeline}")
+    Returns:
+        Dictionary with the list of tools, total (None when not requested)
+        and next_cursor (None on the last page)
+    """
+    query = _build_tools_query(filters)
+    sort_spec = _build_sort_spec(sort_by, sort_order)
+    projection = None
+    if fields is not None:
+        projection = _build_sparse_projection(fields, sort_spec)
+
+    # Fetch one extra document to know whether another page follows
+    total = None
+    if not include_total or (estimate_total and not query):
+        pipeline = _build_tools_pipeline(
+            query,
+            sort_spec,
+            skip=skip,
+            limit=limit + 1,
+            cursor=cursor,
+            projection=projection,
+        )
+        logger.debug(f"MongoDB aggregation pipeline: {pipeline}")
+        page_query = tools.aggregate(pipeline).to_list(length=limit + 1)
+        if include_total:
+            documents, total = await asyncio.gather(
+                page_query, tools.estimated_document_count()
+            )
+        else:
+            documents = await page_query
+    else:
+        keyset_filter = None
+        if cursor:
+            keyset_filter = _build_keyset_filter(
+                sort_spec, decode_cursor(cursor, sort_spec)
+            )
+        documents, total = await _fetch_page_and_total(
+            query,
+            _build_page_stages(sort_spec, skip, limit + 1, cursor, projection),
+            keyset_filter=keyset_filter,
+        )
 
-    # Execute the aggregation pipeline
-    cursor = tools.aggregate(pipeline)
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], sort_spec)
 
-    # Process results
-    tools_list = []
-    async for tool in cursor:
-        tool_response = await create_tool_response(tool)
-        if tool_response:
-            tools_list.append(tool_response)
+    if fields is not None:
+        tools_list = _build_tool_summaries(documents, fields)
+    else:
+        tools_list = await _build_tool_responses(documents)
 
-    return tools_list
+    return {
+        "tools": tools_list,
+        "total": total,
+        "next_cursor": next_cursor,
+    }
 
 
-async def get_tool_by_id(tool_id: UUID) -> Optional[ToolResponse]:
+async def get_featured_tools_page(
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    price: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+) -> Dict[str, Any]:
     """
-    Retrieve a tool by its UUID.
+    Retrieve one page of featured tools and their total.
+
+    A search term is combined with the featured, category and price filters
+    in one MongoDB text query, ordered by text relevance, so only the
+    requested page is fetched. Without any filter the whole featured set is
+    served from a cache that tool writes invalidate through the catalog
+    version.
 
-    First tries to find a document where id=tool_id.
-    If that fails, checks if the tool_id might be a UUID derived from an ObjectId,
-    and attempts to find the document by its _id.
+    Args:
+        skip: Number of items to skip for pagination
+        limit: Maximum number of items to return
+        search: Optional search term matched against name and description
+        category: Optional category filter
+        price: Optional price filter
+        sort_by: Field to sort by (ignored with a search term)
+        sort_order: Sort order ('asc' or 'desc')
+
+    Returns:
+        Dictionary with the list of tools and the total
     """
-    # First try: Query by string representation of UUID in 'id' field
-    tool = await tools.find_one({"id": str(tool_id)})
+    filters: Dict[str, Any] = {"is_featured": True}
+    if category:
+        filters["category"] = category
+    if price:
+        filters["price"] = price
+
+    if search and search.strip():
+        query = _build_tools_query(filters)
+        query["$text"] = {"$search": search}
+        page_stages = [{"$sort": {"score": {"$meta": "textScore"}, "_id": 1}}]
+        if skip:
+            page_stages.append({"$skip": skip})
+        page_stages.append({"$limit": limit})
+        documents, total = await _fetch_page_and_total(query, page_stages)
+        return {"tools": await _build_tool_responses(documents), "total": total}
+
+    if category or price:
+        return await get_tools_page(
+            skip=skip,
+            limit=limit,
+            filters=filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
 
-    if tool:
-        return await create_tool_response(tool)
+    key = (catalog_version.value, sort_by, (sort_order or "asc").lower())
+    featured = featured_tools_cache.get(key)
+    if featured is None:
+        page = await get_tools_page(
+            limit=FEATURED_CACHE_MAX_TOOLS,
+            filters=filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            include_total=False,
+        )
+        if page["next_cursor"] is not None:
+            # Too many featured tools to hold in memory; page in MongoDB
+            return await get_tools_page(
+                skip=skip,
+                limit=limit,
+                filters=filters,
+                sort_by=sort_by,
+                sort_order=sort_order,
+            )
+        featured = page["tools"]
+        featured_tools_cache.set(key, featured)
 
-    # Try an approach that doesn't require loading all tools
-    # Get all tools without an 'id' field to check if they match after conversion
-    tools_without_id = await tools.find({"id": {"$exists": False}}).to_list(length=None)
+    return {
+        "tools": [tool.model_copy() for tool in featured[skip : skip + limit]],
+        "total": len(featured),
+    }
 
-    for db_tool in tools_without_id:
-        if "_id" in db_tool:
-            objectid = db_tool.get("_id")
-            derived_uuid = objectid_to_uuid(objectid)
 
-            # If the derived UUID matches the requested one, we found our tool
-            if str(derived_uuid) == str(tool_id):
-                logger.info(
-                    f"Found tool via derived UUID conversion: {db_tool.get('name')}"
-                )
+async def export_tools(
+    updated_since: Optional[datetime] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterate over the whole catalog as plain JSON-ready dictionaries.
 
-                # Update the tool with the derived UUID to avoid future conversion
-                try:
-                    await tools.update_one(
-                        {"_id": objectid}, {"$set": {"id": str(derived_uuid)}}
-                    )
-                    logger.info(
-                        f"Updated tool {db_tool.get('name')} with derived UUID {derived_uuid}"
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to update tool with derived UUID: {e}")
+    Documents are read straight from a MongoDB cursor in batches of
+    TOOL_EXPORT_BATCH_SIZE, so memory use does not grow with the catalog.
 
-                return await create_tool_response(db_tool)
+    Args:
+        updated_since: Only export tools updated at or after this time
+
+    Yields:
+        One dictionary per tool with the EXPORT_FIELDS that are set
+    """
+    query: Dict[str, Any] = {}
+    sort_spec = [("_id", 1)]
+    if updated_since:
+        # Inclusive, so clients can pass the newest updated_at they have seen
+        query["updated_at"] = {"$gte": updated_since}
+        sort_spec = [("updated_at", 1), ("_id", 1)]
+
+    projection = {field: 1 for field in EXPORT_FIELDS}
+    cursor = (
+        tools.find(query, projection).sort(sort_spec).batch_size(TOOL_EXPORT_BATCH_SIZE)
+    )
+
+    async for tool in cursor:
+        record = {}
+        for field in EXPORT_FIELDS:
+            value = tool.get(field)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            if value is not None:
+                record[field] = value
+        if not record.get("id"):
+            record["id"] = str(objectid_to_uuid(tool["_id"]))
+        yield record
 
-    # If we get here, the tool wasn't found by either method
-    return None
+
+async def get_tool_by_id(tool_id: UUID) -> Optional[ToolResponse]:
+    """
+    Retrieve a tool by its UUID.
+
+    Every tool has an indexed "id": new tools get one on creation and older
+    tools were backfilled with the UUID derived from their ObjectId (see
+    setup_database), so this is a single index lookup.
+    """
+    return await _get_cached_tool(("id", str(tool_id)), {"id": str(tool_id)})
 
 
 async def get_tool_by_unique_id(unique_id: str) -> Optional[ToolResponse]:
     """
     Retrieve a tool by its unique_id.
     """
-    tool = await tools.find_one({"unique_id": unique_id})
+    return await _get_cached_tool(("unique_id", unique_id), {"unique_id": unique_id})
+
+
+async def adjust_saved_numbers(unique_id: str, delta: int) -> bool:
+    """
+    Atomically add delta to a tool's saved_numbers, never going below zero.
 
+    Missing or null counters count as zero. Only the tool's detail cache and
+    share pages are invalidated: listings are keyed by catalog_version, and a
+    popularity counter does not justify recounting every cached total on
+    each favorite toggle, so they pick the new value up on their TTL.
+
+    Args:
+        unique_id: Unique ID of the tool
+        delta: Amount to add (negative to subtract)
+
+    Returns:
+        True if the tool exists, False otherwise
+    """
+    tool = await tools.find_one_and_update(
+        {"unique_id": unique_id},
+        [
+            {
+                "$set": {
+                    "saved_numbers": {
+                        "$max": [
+                            0,
+                            {"$add": [{"$ifNull": ["$saved_numbers", 0]}, delta]},
+                        ]
+                    }
+                }
+            }
+        ],
+        projection={"_id": 0, "id": 1, "unique_id": 1},
+    )
     if not tool:
-        return None
+        return False
+
+    _invalidate_cached_tool(tool)
+    invalidate_tool_shares(unique_id)
+    return True
+
+
+async def get_tools_by_unique_ids(unique_ids: List[str]) -> Dict[str, Any]:
+    """
+    Look up many tools by unique_id in one round trip.
+
+    Warm entries come from the tool detail cache; everything else is fetched
+    with a single $in query and cached, misses included.
+
+    Args:
+        unique_ids: Identifiers to resolve (duplicates are ignored)
+
+    Returns:
+        Dictionary with the found tools in requested order and the list of
+        unique_ids that matched no tool
+    """
+    requested = list(dict.fromkeys(unique_ids))
+    found: Dict[str, ToolResponse] = {}
+    missing = set()
+    to_fetch = []
+
+    for unique_id in requested:
+        cached = tool_cache.get(("unique_id", unique_id))
+        if cached is _TOOL_NOT_FOUND:
+            missing.add(unique_id)
+        elif cached is not None:
+            found[unique_id] = cached
+        else:
+            to_fetch.append(unique_id)
+
+    if to_fetch:
+        async for tool in tools.find({"unique_id": {"$in": to_fetch}}):
+            tool_response = await create_tool_response(tool)
+            if tool_response:
+                for cache_key in _tool_cache_keys(tool):
+                    tool_cache.set(cache_key, tool_response)
+                found[tool["unique_id"]] = tool_response
+
+        for unique_id in to_fetch:
+            if unique_id not in found:
+                tool_cache.set(
+                    ("unique_id", unique_id), _TOOL_NOT_FOUND, ttl=TOOL_CACHE_NEGATIVE_TTL
+                )
+                missing.add(unique_id)
 
-    return await create_tool_response(tool)
+    return {
+        "tools": [found[uid].model_copy() for uid in requested if uid in found],
+        "missing": [uid for uid in requested if uid in missing],
+    }
 
 
 async def create_tool(tool_data: ToolCreate) -> ToolResponse:
@@ -598,6 +1187,12 @@ async def create_tool(tool_data: ToolCreate) -> ToolResponse:
         keywords = extract_keywords(tool_dict)
         tool_dict["keywords"] = keywords
 
+        # Stored so listings can sort on it with an index
+        tool_dict["has_description"] = has_description_flag(
+            tool_dict.get("description")
+        )
+        tool_dict["search_tokens"] = build_search_tokens(tool_dict)
+
         # Insert into MongoDB
         result = await tools.insert_one(tool_dict)
 
@@ -611,6 +1206,7 @@ async def create_tool(tool_data: ToolCreate) -> ToolResponse:
 
         # Return the created tool
         created_tool = await tools.find_one({"_id": result.inserted_id})
+        _record_tool_mutation(None, created_tool)
 
         # Index in Algolia
         await algolia_indexer.index_tool(created_tool)
@@ -644,6 +1240,11 @@ async def update_tool(tool_id: UUID, tool_update: ToolUpdate) -> Optional[ToolRe
     if update_data:
         update_data["updated_at"] = datetime.utcnow()
 
+        if "description" in update_data:
+            update_data["has_description"] = has_description_flag(
+                update_data["description"]
+            )
+
         # Process categories if update includes category-related fields
         categories_list = existing_tool.get("categories", [])
         has_category_changes = False
@@ -741,11 +1342,17 @@ async def update_tool(tool_id: UUID, tool_update: ToolUpdate) -> Optional[ToolRe
 
             asyncio.create_task(update_keywords_task())
 
+        if any(field in update_data for field in SEARCH_TOKEN_FIELDS + ["keywords"]):
+            update_data["search_tokens"] = build_search_tokens(
+                {**existing_tool, **update_data}
+            )
+
         # Update the tool
         await tools.update_one({"id": str(tool_id)}, {"$set": update_data})
 
     # Return the updated tool
     updated_tool = await tools.find_one({"id": str(tool_id)})
+    _record_tool_mutation(existing_tool, updated_tool)
 
     # Update in Algolia
     await algolia_indexer.index_tool(updated_tool)
@@ -769,6 +1376,9 @@ async def delete_tool(tool_id: UUID) -> bool:
     # Delete from MongoDB
     result = await tools.delete_one({"id": str(tool_id)})
 
+    if result.deleted_count > 0:
+        _record_tool_mutation(existing_tool, None)
+
     return result.deleted_count > 0
 
 
@@ -780,6 +1390,29 @@ async def search_tools(
     Uses Algolia search when available, falls back to MongoDB text search.
     If count_only is True, returns only the total count of matching tools.
     """
+    if count_only:
+        page = await search_tools_page(query, skip=0, limit=1)
+        return page["total"]
+
+    page = await search_tools_page(query, skip=skip, limit=limit)
+    return page["tools"]
+
+
+async def search_tools_page(
+    query: str, skip: int = 0, limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Search for tools by name or description and count the matches.
+    Uses Algolia search when available, falls back to MongoDB text search.
+
+    Args:
+        query: Search text
+        skip: Number of items to skip for pagination
+        limit: Maximum number of items to return
+
+    Returns:
+        Dictionary with the list of matching tools and the total match count
+    """
     from ..algolia.config import algolia_config
     from ..algolia.search import algolia_search
 
@@ -790,14 +1423,9 @@ async def search_tools(
             search_result = await algolia_search.direct_search_tools(
                 query=query,
                 page=(skip // limit) if limit > 0 else 0,  # Convert skip/limit to page
-                per_page=(
-                    limit if not count_only else 1
-                ),  # Only need one result if just counting
+                per_page=limit,
             )
 
-            if count_only:
-                return search_result.total
-
             # Convert Algolia results to ToolResponse objects
             tools_list = []
             for tool in search_result.tools:
@@ -828,7 +1456,7 @@ async def search_tools(
                 tool_response = await create_tool_response(tool_dict)
                 if tool_response:
                     tools_list.append(tool_response)
-            return tools_list
+            return {"tools": tools_list, "total": search_result.total}
         except Exception as e:
             # Log the error and fall back to MongoDB
             logger.error(
@@ -836,18 +1464,13 @@ async def search_tools(
             )
 
     # Fall back to MongoDB text search
-    if count_only:
-        return await tools.count_documents({"$text": {"$search": query}})
-
-    cursor = tools.find({"$text": {"$search": query}}).skip(skip).limit(limit)
-
-    tools_list = []
-    async for tool in cursor:
-        tool_response = await create_tool_response(tool)
-        if tool_response:
-            tools_list.append(tool_response)
+    page_stages = [{"$skip": skip}] if skip else []
+    page_stages.append({"$limit": limit})
+    documents, total = await _fetch_page_and_total(
+        {"$text": {"$search": query}}, page_stages
+    )
 
-    return tools_list
+    return {"tools": await _build_tool_responses(documents), "total": total}
 
 
 async def get_keywords(
@@ -909,13 +1532,15 @@ async def toggle_tool_featured_status(
     """
     logger.info(f"Setting tool {tool_id} featured status to {is_featured}")
 
-    # Update the tool in the database
-    result = await tools.update_one(
+    # Update the tool in the database, keeping the previous version for the
+    # in-memory facet counts
+    previous_tool = await tools.find_one_and_update(
         {"id": str(tool_id)},
         {"$set": {"is_featured": is_featured, "updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.BEFORE,
     )
 
-    if result.matched_count == 0:
+    if previous_tool is None:
         logger.warning(f"Tool {tool_id} not found for featured status update")
         return None
 
@@ -925,6 +1550,8 @@ async def toggle_tool_featured_status(
         logger.error(f"Tool {tool_id} was updated but could not be retrieved")
         return None
 
+    _record_tool_mutation(previous_tool, updated_tool)
+
     # Update the tool in Algolia
     try:
         if algolia_indexer.is_configured():
@@ -961,13 +1588,15 @@ async def toggle_tool_featured_status_by_unique_id(
         f"Setting tool with unique_id={unique_id} featured status to {is_featured}"
     )
 
-    # Update the tool in the database
-    result = await tools.update_one(
+    # Update the tool in the database, keeping the previous version for the
+    # in-memory facet counts
+    previous_tool = await tools.find_one_and_update(
         {"unique_id": unique_id},
         {"$set": {"is_featured": is_featured, "updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.BEFORE,
     )
 
-    if result.matched_count == 0:
+    if previous_tool is None:
         logger.warning(
             f"Tool with unique_id={unique_id} not found for featured status update"
         )
@@ -981,6 +1610,8 @@ async def toggle_tool_featured_status_by_unique_id(
         )
         return None
 
+    _record_tool_mutation(previous_tool, updated_tool)
+
     # Update the tool in Algolia
     try:
         from ..algolia.config import algolia_config
@@ -1004,6 +1635,101 @@ async def toggle_tool_featured_status_by_unique_id(
     return await create_tool_response(updated_tool)
 
 
+def keyword_search_terms(keywords: List[str]) -> List[str]:
+    """Tokenize search keywords the same way tools' search_tokens are built."""
+    terms = []
+    for keyword in keywords:
+        for token in tokenize_search_text(keyword):
+            if token not in terms:
+                terms.append(token)
+    return terms
+
+
+def _build_keyword_query(
+    keywords: List[str], filters: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build the MongoDB query used by the keyword search.
+
+    Each term becomes an anchored, escaped prefix regex on search_tokens, so
+    "writ" still finds "writer" and every term is a range scan on the
+    multikey index instead of a collection scan.
+    """
+    terms = keyword_search_terms(keywords)
+    query = {
+        "search_tokens": {
+            "$in": [re.compile("^" + re.escape(term)) for term in terms]
+        }
+    }
+
+    # Apply additional filters if provided
+    if filters and isinstance(filters, dict):
+        for key, value in filters.items():
+            query[key] = value
+
+    return query
+
+
+def _build_keyword_page_stages(
+    keywords: List[str], skip: int, limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Rank keyword matches and select one page.
+
+    Every term scores 1 when a token starts with it, 1 more when a token is
+    exactly the term, and 2 more when the tool name contains a word starting
+    with it. Ties fall back to the usual listing order.
+    """
+    score_parts = []
+    for term in keyword_search_terms(keywords):
+        score_parts.extend(
+            [
+                {
+                    "$cond": [
+                        {
+                            "$anyElementTrue": [
+                                {
+                                    "$map": {
+                                        "input": "$search_tokens",
+                                        "in": {
+                                            "$eq": [{"$indexOfCP": ["$$this", term]}, 0]
+                                        },
+                                    }
+                                }
+                            ]
+                        },
+                        1,
+                        0,
+                    ]
+                },
+                {"$cond": [{"$in": [term, "$search_tokens"]}, 1, 0]},
+                {
+                    "$cond": [
+                        {
+                            "$regexMatch": {
+                                "input": {"$ifNull": ["$name", ""]},
+                                "regex": "(^|[^a-z0-9])" + re.escape(term),
+                                "options": "i",
+                            }
+                        },
+                        2,
+                        0,
+                    ]
+                },
+            ]
+        )
+
+    stages = [
+        {"$addFields": {"_keyword_score": {"$add": score_parts or [0]}}},
+        {"$sort": {"_keyword_score": -1, "has_description": -1, "_id": 1}},
+    ]
+    if skip:
+        stages.append({"$skip": skip})
+    stages.append({"$limit": limit})
+    stages.append({"$project": {"_keyword_score": 0}})
+    return stages
+
+
 async def keyword_search_tools(
     keywords: List[str],
     skip: int = 0,
@@ -1012,7 +1738,7 @@ async def keyword_search_tools(
     filters: Optional[Dict[str, Any]] = None,
 ) -> Union[List[ToolResponse], int]:
     """
-    Search for tools by exact keywords match.
+    Search for tools by keywords, most relevant first.
     This function performs a direct MongoDB query without using LLM or Algolia.
 
     Args:
@@ -1025,65 +1751,39 @@ async def keyword_search_tools(
     Returns:
         Either a list of matching tools or the count of matching tools
     """
-    # Create a query to find tools where any of the provided keywords match
-    # Look in name, description, keywords array, and category fields
-    query = {
-        "$or": [
-            {"name": {"$regex": "|".join(keywords), "$options": "i"}},
-            {"description": {"$regex": "|".join(keywords), "$options": "i"}},
-            {"keywords": {"$in": keywords}},
-            {"category": {"$regex": "|".join(keywords), "$options": "i"}},
-        ]
-    }
-
-    # Apply additional filters if provided
-    if filters and isinstance(filters, dict):
-        for key, value in filters.items():
-            query[key] = value
-
     # If only count is needed, return the count
     if count_only:
-        return await tools.count_documents(query)
+        return await _count_tools(_build_keyword_query(keywords, filters))
 
     # Find matching tools with pagination
-    cursor = tools.find(query).skip(skip).limit(limit)
+    pipeline = [{"$match": _build_keyword_query(keywords, filters)}]
+    pipeline += _build_keyword_page_stages(keywords, skip, limit)
+    documents = await tools.aggregate(pipeline).to_list(length=limit)
 
-    # Process results
-    tools_list = []
-    async for tool in cursor:
-        tool_response = await create_tool_response(tool)
-        if tool_response:
-            tools_list.append(tool_response)
-
-    return tools_list
+    return await _build_tool_responses(documents)
 
 
-async def get_tool_with_favorite_status(
-    tool_unique_id: str, user_id: str
-) -> Optional[ToolResponse]:
+async def keyword_search_tools_page(
+    keywords: List[str],
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """
-    Get a tool by ID and include whether it's favorited by the user.
+    Search for tools by keywords, most relevant first, and count the matches.
 
     Args:
-        tool_id: ID of the tool
-        user_id: ID of the user
+        keywords: List of search keywords
+        skip: Number of items to skip for pagination
+        limit: Maximum number of items to return
+        filters: Additional filters to apply to the search query
 
     Returns:
-        Tool with favorite status if found, None otherwise
+        Dictionary with the list of matching tools and the total match count
     """
-    tool = await get_tool_by_unique_id(tool_unique_id)
-
-    if not tool:
-        return None
-
-    # Check if tool is in user's favorites
-    favorite = await favorites.find_one(
-        {"user_id": str(user_id), "tool_unique_id": str(tool_unique_id)}
+    documents, total = await _fetch_page_and_total(
+        _build_keyword_query(keywords, filters),
+        _build_keyword_page_stages(keywords, skip, limit),
     )
 
-    # Convert to dict to modify
-    tool_dict = tool.dict()
-    tool_dict["saved_by_user"] = favorite is not None
-
-    # Convert back to response model
-    return ToolResponse(**tool_dict)
+    return {"tools": await _build_tool_responses(documents), "total": total}
@@ -1,83 +1,278 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
+import asyncio
 import json
+import os
+from .chat.streaming import STREAM_FORMAT_DELTA, STREAM_FORMAT_FULL, FullFrameAdapter
 from .logger import logger
+from .pubsub import (
+    WEBSOCKET_PUBSUB_PREFIX,
+    WEBSOCKET_PUBSUB_URL,
+    InMemoryPubSub,
+    PubSub,
+    create_pubsub,
+)
+
+# Frames waiting to be written to one connection. A client that falls this
+# far behind is disconnected rather than slowing everyone else down.
+WEBSOCKET_SEND_QUEUE_SIZE = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "256"))
+# Seconds one send may take before the client is considered stuck
+WEBSOCKET_SEND_TIMEOUT = float(os.getenv("WEBSOCKET_SEND_TIMEOUT", "10"))
+
+# Close code sent to dropped slow clients ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
 
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[Dict[str, Any]] = []
+    """
+    Tracks WebSocket connections and fans messages out to them.
+
+    Connections are indexed by websocket, user and chat, so lookups do not
+    scan every connection. Each connection has a bounded send queue drained
+    by its own writer task: sending only enqueues, so a slow client never
+    blocks the sender or the other clients, and a client whose queue fills
+    up (or whose send times out) is dropped.
+
+    Broadcasts to a chat, a user or everyone are published on the pub/sub
+    bus, and every worker delivers them to its own connections, so clients
+    of one chat or user may be spread over processes and nodes. Each worker
+    subscribes only to the chats and users it has connections for.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 256,
+        send_timeout: float = 10.0,
+        pubsub: Optional[PubSub] = None,
+        channel_prefix: str = "taaft:ws:",
+    ):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self._connections: Dict[WebSocket, Dict[str, Any]] = {}
+        self._by_user: Dict[str, Set[WebSocket]] = {}
+        self._by_chat: Dict[str, Set[WebSocket]] = {}
+        self.dropped = 0
+
+        self.pubsub = pubsub if pubsub is not None else InMemoryPubSub()
+        self.channel_prefix = channel_prefix
+        self._channels = {
+            "user": (self._by_user, f"{channel_prefix}user:"),
+            "chat": (self._by_chat, f"{channel_prefix}chat:"),
+        }
+        self._all_channel = f"{channel_prefix}all"
+        # Rebuilds full frames for ?stream_format=full clients from deltas
+        self._full_frames = FullFrameAdapter()
+        # Closes of dropped sockets still in flight
+        self._closing: Set[asyncio.Task] = set()
+
+    async def start(self):
+        """Connect to the pub/sub bus"""
+        await self.pubsub.subscribe(self._all_channel, self._deliver)
+        await self.pubsub.start()
+
+    async def stop(self):
+        """Disconnect from the pub/sub bus"""
+        await self.pubsub.stop()
+
+    @property
+    def active_connections(self) -> List[Dict[str, Any]]:
+        return list(self._connections.values())
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(
-            {"websocket": websocket, "user_id": None, "chat_id": None}
-        )
+        # Clients written before delta frames connect with ?stream_format=full
+        stream_format = websocket.query_params.get("stream_format")
+        connection = {
+            "websocket": websocket,
+            "user_id": None,
+            "chat_id": None,
+            "stream_format": (
+                STREAM_FORMAT_FULL
+                if stream_format == STREAM_FORMAT_FULL
+                else STREAM_FORMAT_DELTA
+            ),
+            "queue": asyncio.Queue(maxsize=self.queue_size),
+            "closed": False,
+        }
+        connection["writer"] = asyncio.create_task(self._writer(connection))
+        self._connections[websocket] = connection
         logger.info(
-            f"New WebSocket connection, total connections: {len(self.active_connections)}"
+            f"New WebSocket connection, total connections: {len(self._connections)}"
         )
 
     def disconnect(self, websocket: WebSocket):
-        for i, connection in enumerate(self.active_connections):
-            if connection["websocket"] == websocket:
-                self.active_connections.pop(i)
-                break
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+        self._unindex("user", connection["user_id"], websocket)
+        self._unindex("chat", connection["chat_id"], websocket)
+        connection["closed"] = True
+        writer = connection.get("writer")
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
         logger.info(
-            f"WebSocket disconnected, remaining connections: {len(self.active_connections)}"
+            f"WebSocket disconnected, remaining connections: {len(self._connections)}"
         )
 
+    async def _index(self, kind: str, key: str, websocket: WebSocket):
+        """Add a connection to the user or chat index, subscribing on first use"""
+        index, channel = self._channels[kind]
+        websockets = index.get(key)
+        if websockets is not None:
+            websockets.add(websocket)
+            return
+        index[key] = {websocket}
+        await self.pubsub.subscribe(channel + key, self._deliver)
+
+    def _unindex(self, kind: str, key: Optional[str], websocket: WebSocket):
+        """Remove a connection from an index, unsubscribing once none are left"""
+        if key is None:
+            return
+        index, channel = self._channels[kind]
+        websockets = index.get(key)
+        if websockets is not None:
+            websockets.discard(websocket)
+            if not websockets:
+                del index[key]
+                self.pubsub.unsubscribe(channel + key)
+
     def get_connection_by_websocket(
         self, websocket: WebSocket
     ) -> Optional[Dict[str, Any]]:
-        for connection in self.active_connections:
-            if connection["websocket"] == websocket:
-                return connection
-        return None
+        return self._connections.get(websocket)
 
     def get_connections_by_user(self, user_id: str) -> List[Dict[str, Any]]:
-        return [conn for conn in self.active_connections if conn["user_id"] == user_id]
+        return [
+            self._connections[websocket]
+            for websocket in self._by_user.get(user_id, ())
+        ]
 
     def get_connections_by_chat(self, chat_id: str) -> List[Dict[str, Any]]:
-        return [conn for conn in self.active_connections if conn["chat_id"] == chat_id]
+        return [
+            self._connections[websocket]
+            for websocket in self._by_chat.get(chat_id, ())
+        ]
 
     async def associate_user(self, websocket: WebSocket, user_id: str):
         conn = self.get_connection_by_websocket(websocket)
         if conn:
+            self._unindex("user", conn["user_id"], websocket)
             conn["user_id"] = user_id
+            await self._index("user", user_id, websocket)
             logger.info(f"User {user_id} associated with WebSocket connection")
 
     async def associate_chat(self, websocket: WebSocket, chat_id: str):
         conn = self.get_connection_by_websocket(websocket)
         if conn:
+            self._unindex("chat", conn["chat_id"], websocket)
             conn["chat_id"] = chat_id
+            await self._index("chat", chat_id, websocket)
             logger.info(f"Chat {chat_id} associated with WebSocket connection")
 
+    def _enqueue(self, connection: Dict[str, Any], message: str) -> None:
+        """Queue a message for a connection, dropping the client if it is full"""
+        try:
+            connection["queue"].put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning(
+                f"Dropping slow WebSocket client (user {connection['user_id']}, "
+                f"chat {connection['chat_id']}): send queue full"
+            )
+            self._drop(connection)
+
+    def _drop(self, connection: Dict[str, Any]) -> None:
+        """Disconnect a client that cannot keep up and close its socket"""
+        websocket = connection["websocket"]
+        if websocket not in self._connections:
+            return
+        self.dropped += 1
+        self.disconnect(websocket)
+        task = asyncio.create_task(self._close(websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), self.send_timeout
+            )
+        except Exception:
+            pass  # The client is gone either way
+
+    async def _writer(self, connection: Dict[str, Any]) -> None:
+        """Write queued messages to one connection, in order"""
+        queue = connection["queue"]
+        websocket = connection["websocket"]
+        try:
+            # wait_for can swallow a cancel that races a finished send, so
+            # the flag set by disconnect is checked after every send as well
+            while not connection["closed"]:
+                message = await queue.get()
+                await asyncio.wait_for(
+                    websocket.send_text(message), timeout=self.send_timeout
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Dropping WebSocket client after failed send: {str(e)}")
+            self._drop(connection)
+
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        connection = self._connections.get(websocket)
+        if connection is None:
+            # Disconnected or dropped as a slow consumer
+            return
+        self._enqueue(connection, message)
 
     async def send_personal_json(self, data: Dict[str, Any], websocket: WebSocket):
-        await websocket.send_text(json.dumps(data))
+        await self.send_personal_message(json.dumps(data), websocket)
+
+    async def _publish(self, channel: str, message: str):
+        """Publish a message on the bus, delivering locally if it is down"""
+        if not await self.pubsub.publish(channel, message):
+            logger.warning(f"Pub/sub unavailable, delivering {channel} locally only")
+            self._deliver(channel, message)
+
+    def _deliver(self, channel: str, message: str) -> None:
+        """Queue a message from the bus for this worker's connections"""
+        if channel == self._all_channel:
+            connections = self.active_connections
+        else:
+            kind, _, key = channel[len(self.channel_prefix) :].partition(":")
+            index = self._channels[kind][0] if kind in self._channels else {}
+            connections = [self._connections[ws] for ws in index.get(key, ())]
+
+        full = [c for c in connections if c["stream_format"] == STREAM_FORMAT_FULL]
+        full_message = message
+        if full or self._full_frames.pending:
+            # Track every streamed response while any is in flight, so the
+            # complete frame still clears it once the full clients are gone
+            try:
+                frame = json.loads(message)
+            except ValueError:
+                frame = None
+            if isinstance(frame, dict):
+                adapted = self._full_frames.adapt(frame)
+                if adapted is not frame:
+                    full_message = json.dumps(adapted)
+
+        for connection in connections:
+            if connection["stream_format"] == STREAM_FORMAT_FULL:
+                self._enqueue(connection, full_message)
+            else:
+                self._enqueue(connection, message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.get("websocket").send_text(message)
+        await self._publish(self._all_channel, message)
 
     async def broadcast_json(self, data: Dict[str, Any]):
-        json_data = json.dumps(data)
-        for connection in self.active_connections:
-            await connection.get("websocket").send_text(json_data)
+        await self.broadcast(json.dumps(data))
 
     async def broadcast_to_user(self, data: Dict[str, Any], user_id: str):
-        json_data = json.dumps(data)
-        connections = self.get_connections_by_user(user_id)
-        for connection in connections:
-            await connection.get("websocket").send_text(json_data)
+        await self._publish(self._channels["user"][1] + user_id, json.dumps(data))
 
     async def broadcast_to_chat(self, data: Dict[str, Any], chat_id: str):
-        json_data = json.dumps(data)
-        connections = self.get_connections_by_chat(chat_id)
-        for connection in connections:
-            await connection.get("websocket").send_text(json_data)
+        await self._publish(self._channels["chat"][1] + chat_id, json.dumps(data))
 
     async def send_streaming_chunk(
         self, content: str, chat_id: str, user_id: Optional[str] = None
@@ -106,4 +301,9 @@ class ConnectionManager:
             await self.broadcast_to_chat(data, chat_id)
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(
+    queue_size=WEBSOCKET_SEND_QUEUE_SIZE,
+    send_timeout=WEBSOCKET_SEND_TIMEOUT,
+    pubsub=create_pubsub(WEBSOCKET_PUBSUB_URL),
+    channel_prefix=WEBSOCKET_PUBSUB_PREFIX,
+)
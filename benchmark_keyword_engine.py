@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyword extraction throughput.
+
+Builds a synthetic catalog of tool descriptions and times the default
+split-and-count extractor against the opt-in TF-IDF ranking
+(KEYWORD_ENGINE_IDF), including fitting its IDF table.
+
+Usage:
+    python benchmark_keyword_engine.py [--tools 20000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.keyword_engine import KeywordEngine
+
+VOCABULARY = (
+    "writing marketing content blog seo copy email images design video editing "
+    "audio podcast transcription speech translation chatbot customer support "
+    "analytics dashboard spreadsheet code review testing deployment sales crm "
+    "recruiting resume presentation slides research summarization notes meeting "
+    "scheduling calendar social media captions avatars music voice productivity"
+).split()
+FILLER = "the a for with and your to of in on helps you teams tool ai platform".split()
+
+
+def make_catalog(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    catalog = []
+    for _ in range(size):
+        words = rng.choices(VOCABULARY, k=25) + rng.choices(FILLER, k=15)
+        rng.shuffle(words)
+        catalog.append(" ".join(words).capitalize() + ".")
+    return catalog
+
+
+def timed(label, size, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>28}: {elapsed:7.3f}s  {size / elapsed:10.0f} texts/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tools", type=int, default=20000, help="Catalog size")
+    args = parser.parse_args()
+
+    catalog = make_catalog(args.tools)
+    default_engine = KeywordEngine()
+    idf_engine = KeywordEngine(use_idf=True)
+
+    print(f"Catalog: {len(catalog)} synthetic tool descriptions")
+    timed(
+        "term frequency (default)",
+        len(catalog),
+        lambda: default_engine.extract_many(catalog),
+    )
+    timed("fit IDF", len(catalog), lambda: idf_engine.fit(catalog))
+    timed(
+        "TF-IDF (opt-in)",
+        len(catalog),
+        lambda: idf_engine.extract_many(catalog),
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyword search on a large tool collection.
+
+Compares the previous unanchored regex $or query with the search_tokens
+query backed by a multikey index. Inserts synthetic tools into a scratch
+collection in the configured MongoDB (MONGODB_URL), which is dropped
+afterwards, so the real tools collection is never touched.
+
+Usage:
+    python benchmark_keyword_search.py [--tools 100000] [--queries 200]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pymongo import InsertOne
+
+from app.database.database import database
+from app.tools.tools_service import (
+    _build_keyword_page_stages,
+    _build_keyword_query,
+    build_search_tokens,
+)
+
+VOCABULARY = (
+    "writing marketing content blog seo copy email images design video editing "
+    "audio podcast transcription speech translation chatbot customer support "
+    "analytics dashboard spreadsheet code review testing deployment sales crm "
+    "recruiting resume presentation slides research summarization notes meeting "
+    "scheduling calendar social media captions avatars music voice productivity"
+).split()
+CATEGORIES = ["writing", "marketing", "video", "audio", "productivity", "developer"]
+
+
+def make_tool(rng: random.Random, index: int) -> dict:
+    tool = {
+        "name": f"{rng.choice(VOCABULARY).title()} {rng.choice(VOCABULARY).title()} {index}",
+        "description": " ".join(rng.choices(VOCABULARY, k=30)),
+        "category": rng.choice(CATEGORIES),
+        "keywords": rng.sample(VOCABULARY, 5),
+        "has_description": 1,
+    }
+    tool["search_tokens"] = build_search_tokens(tool)
+    return tool
+
+
+def legacy_query(keywords):
+    """The previous keyword search query."""
+    return {
+        "$or": [
+            {"name": {"$regex": "|".join(keywords), "$options": "i"}},
+            {"description": {"$regex": "|".join(keywords), "$options": "i"}},
+            {"keywords": {"$in": keywords}},
+            {"category": {"$regex": "|".join(keywords), "$options": "i"}},
+        ]
+    }
+
+
+async def legacy_search(collection, keywords, limit):
+    query = legacy_query(keywords)
+    await collection.find(query).limit(limit).to_list(length=limit)
+    return await collection.count_documents(query)
+
+
+async def token_search(collection, keywords, limit):
+    query = _build_keyword_query(keywords)
+    pipeline = [{"$match": query}] + _build_keyword_page_stages(keywords, 0, limit)
+    await collection.aggregate(pipeline).to_list(length=limit)
+    return await collection.count_documents(query)
+
+
+async def run(tool_count: int, query_count: int, limit: int):
+    rng = random.Random(7)
+    collection = database.get_collection("tools_benchmark_keyword_search")
+    await collection.drop()
+
+    batch = []
+    for index in range(tool_count):
+        batch.append(InsertOne(make_tool(rng, index)))
+        if len(batch) >= 5000:
+            await collection.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+    await collection.create_index("search_tokens")
+    print(f"Collection: {tool_count} synthetic tools")
+
+    # Rare words (tool numbers) and common prefixes, one or two terms each
+    queries = []
+    for _ in range(query_count):
+        terms = [rng.choice(VOCABULARY)[: rng.randint(3, 8)]]
+        if rng.random() < 0.5:
+            terms.append(str(rng.randrange(tool_count)))
+        queries.append(terms)
+
+    try:
+        for name, search in (("legacy regex", legacy_search), ("search tokens", token_search)):
+            start = time.perf_counter()
+            matches = 0
+            for keywords in queries:
+                matches += await search(collection, keywords, limit)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>14}: {elapsed:8.2f}s  "
+                f"{elapsed / len(queries) * 1000:8.1f} ms/query  ({matches} matches)"
+            )
+    finally:
+        await collection.drop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tools", type=int, default=100000, help="Collection size")
+    parser.add_argument("--queries", type=int, default=200, help="Searches to time")
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    args = parser.parse_args()
+    asyncio.run(run(args.tools, args.queries, args.limit))
+
+
+if __name__ == "__main__":
+    main()
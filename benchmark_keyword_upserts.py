@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark re-keywording the whole tool catalog.
+
+Compares the old per-keyword update_one loop with the bulk keyword store.
+Reads tools from the configured MongoDB (MONGODB_URL) and writes into
+scratch collections that are dropped afterwards, so the real keywords
+collection is never touched.
+
+Usage:
+    python benchmark_keyword_upserts.py [--batch-size 500] [--limit 0]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.database.database import database
+from app.services.keyword_store import KeywordStore
+from app.tools.tools_service import extract_keywords_batch
+
+
+async def load_catalog(limit: int):
+    """Load (tool_id, tool_name, keywords) for every tool."""
+    cursor = database.tools.find(
+        {},
+        {"name": 1, "description": 1, "category": 1, "features": 1, "keywords": 1},
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+
+    tool_list = await cursor.to_list(length=None)
+    # One keyword engine pass over the whole catalog
+    return [
+        (str(tool["_id"]), tool.get("name", "Unknown"), keywords)
+        for tool, keywords in zip(tool_list, extract_keywords_batch(tool_list))
+    ]
+
+
+async def per_keyword_loop(collection, entries):
+    """The previous update_tool_keywords: one round trip per keyword."""
+    for tool_id, tool_name, keywords in entries:
+        for keyword in keywords:
+            await collection.update_one(
+                {"keyword": keyword},
+                {
+                    "$set": {"updated_at": datetime.utcnow()},
+                    "$setOnInsert": {"created_at": datetime.utcnow()},
+                    "$inc": {"frequency": 1},
+                    "$addToSet": {
+                        "tools": {"tool_id": str(tool_id), "tool_name": tool_name}
+                    },
+                },
+                upsert=True,
+            )
+
+
+async def bulk_store(collection, entries, batch_size: int):
+    """The keyword store: one unordered bulk write per batch of tools."""
+    store = KeywordStore(collection)
+    for start in range(0, len(entries), batch_size):
+        await store.upsert_tool_keywords(entries[start : start + batch_size])
+
+
+async def run(batch_size: int, limit: int):
+    entries = await load_catalog(limit)
+    keyword_count = sum(len(keywords) for _, _, keywords in entries)
+    print(f"Catalog: {len(entries)} tools, {keyword_count} tool keywords")
+
+    results = {}
+    for name in ("per_keyword_loop", "bulk_store"):
+        collection = database.get_collection(f"keywords_benchmark_{name}")
+        await collection.drop()
+        await collection.create_index("keyword", unique=True)
+
+        start = time.perf_counter()
+        if name == "per_keyword_loop":
+            await per_keyword_loop(collection, entries)
+        else:
+            await bulk_store(collection, entries, batch_size)
+        results[name] = time.perf_counter() - start
+
+        documents = await collection.count_documents({})
+        print(f"{name:>18}: {results[name]:8.2f}s  ({documents} keyword documents)")
+        await collection.drop()
+
+    if results["bulk_store"] > 0:
+        print(f"Speedup: {results['per_keyword_loop'] / results['bulk_store']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=500, help="Tools per bulk write")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N tools")
+    args = parser.parse_args()
+    asyncio.run(run(args.batch_size, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark building and serializing a page of tool listings.
+
+Times the previous path (validate every document into ToolResponse, let
+FastAPI validate the response_model again, dump it to Python and encode
+with json.dumps) against the current one (validate each document once
+from a dict, serialize the page once with model_dump_json). Documents are
+synthetic, so no database is needed.
+
+Usage:
+    python benchmark_tool_serialization.py [--tools 500] [--rounds 50]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.tools.http_cache import tools_page_response
+from app.tools.models import PaginatedToolsResponse, ToolResponse
+from app.tools.tools_service import create_tool_response
+
+# What FastAPI does with a returned dict: validate, then serialize to Python
+RESPONSE_ADAPTER = TypeAdapter(PaginatedToolsResponse)
+
+
+def make_documents(count: int):
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid4()),
+            "unique_id": f"tool-{index}",
+            "name": f"Tool {index}",
+            "description": "Drafts blog posts and marketing copy in seconds. " * 4,
+            "link": f"https://example.com/tools/{index}",
+            "price": "freemium",
+            "rating": "4.5",
+            "saved_numbers": index,
+            "category": "writing",
+            "features": ["Templates", "Tone control", "SEO hints", "Team sharing"],
+            "keywords": ["writing", "blog", "copy", "marketing", "seo", "content"],
+            "categories": [{"id": "writing", "name": "Writing", "slug": "writing"}],
+            "is_featured": index % 10 == 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(count)
+    ]
+
+
+def validated_response(document):
+    """The previous create_tool_response: always validate."""
+    return ToolResponse(
+        id=document["id"],
+        price=document["price"],
+        name=document["name"],
+        description=document["description"],
+        link=document["link"],
+        unique_id=document["unique_id"],
+        rating=document["rating"],
+        saved_numbers=document["saved_numbers"],
+        created_at=document["created_at"],
+        updated_at=document["updated_at"],
+        category=document["category"],
+        features=document["features"],
+        is_featured=document["is_featured"],
+        saved_by_user=False,
+        keywords=document["keywords"],
+        categories=document["categories"],
+    )
+
+
+def before(documents):
+    asyncio.run(asyncio.sleep(0))  # Same event loop cost as after()
+    page = {
+        "tools": [validated_response(document) for document in documents],
+        "total": len(documents),
+        "skip": 0,
+        "limit": len(documents),
+    }
+    content = RESPONSE_ADAPTER.dump_python(
+        RESPONSE_ADAPTER.validate_python(page), mode="json"
+    )
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def build_responses(documents):
+    return [await create_tool_response(document) for document in documents]
+
+
+def after(documents):
+    tools = asyncio.run(build_responses(documents))
+    page = {"tools": tools, "total": len(documents), "skip": 0, "limit": len(documents)}
+    return tools_page_response(page, Response()).body
+
+
+def timed(label, rounds, func):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = func()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{label:>8}: {elapsed * 1000:8.2f} ms/page  ({len(body)} bytes)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tools", type=int, default=500, help="Tools per page")
+    parser.add_argument("--rounds", type=int, default=50, help="Pages to time")
+    args = parser.parse_args()
+
+    documents = make_documents(args.tools)
+    if json.loads(before(documents)) != json.loads(after(documents)):
+        sys.exit("Fast path output differs from the validated output")
+
+    slow = timed("before", args.rounds, lambda: before(documents))
+    fast = timed("after", args.rounds, lambda: after(documents))
+    print(f"Speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark WebSocket connection lookups and chat fan-out.
+
+Compares the previous ConnectionManager (one flat list, serial awaited
+sends) with the current indexed one (per-connection send queues drained by
+writer tasks). Uses in-memory fake websockets, so no server is needed.
+
+Measures, with --connections spread over chats of --chat-size:
+- connection lookups by websocket, user and chat
+- how long broadcasting a stream of frames to one chat blocks the sender
+  when one client in that chat is slow
+
+Usage:
+    python benchmark_websocket_fanout.py [--connections 10000] [--chat-size 50]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.websocket import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.query_params = {}
+        self.sent = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+class LegacyConnectionManager:
+    """The previous ConnectionManager: a flat list and serial sends."""
+
+    def __init__(self):
+        self.active_connections: List[Dict[str, Any]] = []
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        self.active_connections.append(
+            {"websocket": websocket, "user_id": None, "chat_id": None}
+        )
+
+    def disconnect(self, websocket):
+        for i, connection in enumerate(self.active_connections):
+            if connection["websocket"] == websocket:
+                self.active_connections.pop(i)
+                break
+
+    def get_connection_by_websocket(self, websocket) -> Optional[Dict[str, Any]]:
+        for connection in self.active_connections:
+            if connection["websocket"] == websocket:
+                return connection
+        return None
+
+    def get_connections_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+        return [conn for conn in self.active_connections if conn["user_id"] == user_id]
+
+    def get_connections_by_chat(self, chat_id: str) -> List[Dict[str, Any]]:
+        return [conn for conn in self.active_connections if conn["chat_id"] == chat_id]
+
+    async def associate_user(self, websocket, user_id: str):
+        conn = self.get_connection_by_websocket(websocket)
+        if conn:
+            conn["user_id"] = user_id
+
+    async def associate_chat(self, websocket, chat_id: str):
+        conn = self.get_connection_by_websocket(websocket)
+        if conn:
+            conn["chat_id"] = chat_id
+
+    async def broadcast_to_chat(self, data: Dict[str, Any], chat_id: str):
+        json_data = json.dumps(data)
+        for connection in self.get_connections_by_chat(chat_id):
+            await connection.get("websocket").send_text(json_data)
+
+
+async def populate(manager, connections: int, chat_size: int, slow_delay: float):
+    websockets = []
+    for index in range(connections):
+        # The first client of chat-0 is slow
+        websocket = FakeWebSocket(delay=slow_delay if index == 0 else 0.0)
+        await manager.connect(websocket)
+        await manager.associate_user(websocket, f"user-{index}")
+        await manager.associate_chat(websocket, f"chat-{index // chat_size}")
+        websockets.append(websocket)
+    return websockets
+
+
+async def run_one(name, manager, args):
+    start = time.perf_counter()
+    websockets = await populate(
+        manager, args.connections, args.chat_size, args.slow_delay
+    )
+    setup = time.perf_counter() - start
+
+    lookups = 1000
+    chats = args.connections // args.chat_size
+    start = time.perf_counter()
+    for index in range(lookups):
+        manager.get_connection_by_websocket(websockets[-1 - index])
+        manager.get_connections_by_user(f"user-{args.connections - 1 - index}")
+        manager.get_connections_by_chat(f"chat-{chats - 1 - index % chats}")
+    lookup = (time.perf_counter() - start) / lookups
+
+    start = time.perf_counter()
+    for seq in range(args.frames):
+        await manager.broadcast_to_chat({"seq": seq, "delta": "x" * 64}, "chat-0")
+    blocked = time.perf_counter() - start
+
+    print(
+        f"{name:>8}: setup {setup:6.2f}s  "
+        f"lookups {lookup * 1e6:9.1f} us/round  "
+        f"sender blocked {blocked * 1000:9.1f} ms for {args.frames} frames"
+    )
+
+    for websocket in websockets:
+        manager.disconnect(websocket)
+    await asyncio.sleep(0)
+
+
+async def run(args):
+    print(
+        f"{args.connections} connections, chats of {args.chat_size}, "
+        f"one client sleeping {args.slow_delay * 1000:.0f} ms per send"
+    )
+    await run_one("before", LegacyConnectionManager(), args)
+    await run_one(
+        "after",
+        ConnectionManager(queue_size=args.frames * 2, send_timeout=10),
+        args,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--chat-size", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=20, help="Frames broadcast")
+    parser.add_argument(
+        "--slow-delay", type=float, default=0.05, help="Seconds per send, slow client"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Shared test helpers
+
+Tests import these directly (``from helpers import AsyncCursor, make_tool``);
+pytest puts the tests directory on sys.path when it imports a test module.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+from bson import ObjectId
+
+
+class AsyncCursor:
+    """Stand-in for a Motor cursor over a fixed list of documents"""
+
+    def __init__(self, documents):
+        self.documents = list(documents)
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+def make_tool(unique_id, **fields):
+    """Return a tool document with every field ToolResponse needs"""
+    tool = {
+        "_id": ObjectId(),
+        "id": str(uuid4()),
+        "unique_id": unique_id,
+        "name": unique_id.title(),
+        "description": "A tool",
+        "price": "free",
+        "link": "https://example.com",
+        "keywords": ["tool"],
+        "created_at": datetime(2024, 1, 1),
+        "updated_at": datetime(2024, 1, 1),
+    }
+    tool.update(fields)
+    return tool
@@ -0,0 +1,55 @@
+import os
+import sys
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.cache import LRUCache, VersionCounter
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest entry
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUCache(max_size=10, ttl=5)
+    with patch("app.services.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 0)
+    with patch("app.services.cache.time.monotonic", return_value=104.0):
+        assert cache.get("a") == 0
+    with patch("app.services.cache.time.monotonic", return_value=105.0):
+        assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
+
+
+def test_stats_track_hits_and_misses():
+    cache = LRUCache(max_size=10)
+    cache.set("a", None)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_zero_size_disables_cache():
+    cache = LRUCache(max_size=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_version_token_changes_on_bump():
+    version = VersionCounter()
+    token = version.token
+    version.bump()
+    assert version.token != token
+    assert VersionCounter().token != VersionCounter().token
@@ -0,0 +1,194 @@
+import asyncio
+import datetime
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.chat.context import (
+    SUMMARY_PREFIX,
+    ChatContextBuilder,
+    context_budget,
+    count_tokens,
+)
+from app.chat.database import MockDB
+from app.chat.llm_service import llm_service
+from app.chat.models import ChatModelType
+
+
+async def make_session(db, contents):
+    session = await db.create_session({"title": "Test"})
+    start = datetime.datetime(2024, 1, 1)
+    for index, content in enumerate(contents):
+        await db.add_message(
+            {
+                "chat_id": session["_id"],
+                "role": "user" if index % 2 == 0 else "assistant",
+                "content": content,
+                "timestamp": start + datetime.timedelta(minutes=index),
+            }
+        )
+    return session
+
+
+def test_budgets_and_token_counts():
+    assert count_tokens("x" * 40) == 11
+    assert count_tokens(None) == 1
+    assert context_budget(ChatModelType.LLAMA) < context_budget(ChatModelType.GPT_4)
+    assert context_budget("unknown-model") == context_budget(ChatModelType.GPT_4)
+
+
+@pytest.mark.asyncio
+async def test_messages_store_token_counts_at_write_time():
+    db = MockDB()
+    session = await make_session(db, ["x" * 400])
+
+    [message] = await db.get_recent_messages(session["_id"])
+
+    assert message["tokens"] == 101
+
+
+@pytest.mark.asyncio
+async def test_history_is_cut_at_the_budget_newest_first():
+    db = MockDB()
+    session = await make_session(db, ["a" * 400, "b" * 40, "c" * 40, "d" * 40])
+    builder = ChatContextBuilder()
+
+    with patch.dict("app.chat.context.MODEL_CONTEXT_BUDGETS", {"gpt-4o-mini": 40}):
+        messages = await builder.build(db, session, ChatModelType.GPT_4)
+
+    assert [message["content"][0] for message in messages] == ["b", "c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_newest_message_is_kept_even_over_budget():
+    db = MockDB()
+    session = await make_session(db, ["short", "x" * 4000])
+    builder = ChatContextBuilder()
+
+    with patch.dict("app.chat.context.MODEL_CONTEXT_BUDGETS", {"gpt-4o-mini": 10}):
+        messages = await builder.build(db, session, ChatModelType.GPT_4)
+
+    assert [message["content"] for message in messages] == ["x" * 4000]
+
+
+@pytest.mark.asyncio
+async def test_rolling_summary_replaces_dropped_turns():
+    db = MockDB()
+    session = await make_session(db, ["a" * 400, "b" * 40, "c" * 40])
+    builder = ChatContextBuilder(summaries=True)
+    summarize = AsyncMock(return_value="User runs a bakery.")
+
+    with patch.dict(
+        "app.chat.context.MODEL_CONTEXT_BUDGETS", {"gpt-4o-mini": 40}
+    ), patch("app.chat.llm_service.llm_service.summarize_conversation", summarize):
+        first = await builder.build(db, session, ChatModelType.GPT_4)
+        await asyncio.sleep(0)
+
+        # The dropped turn was summarized in the background and cached
+        summarize.assert_awaited_once()
+        assert summarize.call_args[0][0][0]["content"] == "a" * 400
+        session = await db.get_session(session["_id"])
+        assert session["context_summary"]["text"] == "User runs a bakery."
+
+        second = await builder.build(db, session, ChatModelType.GPT_4)
+        await asyncio.sleep(0)
+
+    assert [message["content"][0] for message in first] == ["b", "c"]
+    assert second[0]["content"] == SUMMARY_PREFIX + "User runs a bakery."
+    assert [message["content"][0] for message in second[1:]] == ["b", "c"]
+    # Turns the cached summary already covers are not summarized again
+    summarize.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_summary_is_only_inserted_when_older_turns_are_missing():
+    db = MockDB()
+    session = await make_session(db, ["a" * 40, "b" * 40, "c" * 40])
+    session["context_summary"] = {
+        "text": "Old turns.",
+        "tokens": 30,
+        "through": datetime.datetime(2024, 1, 1),
+    }
+    summary_message = {"role": "system", "content": SUMMARY_PREFIX + "Old turns."}
+
+    with patch.dict("app.chat.context.MODEL_CONTEXT_BUDGETS", {"gpt-4o-mini": 40}):
+        # Everything fits, so the summary does not eat into the budget
+        whole = await ChatContextBuilder(summaries=True).build(
+            db, session, ChatModelType.GPT_4
+        )
+        # Older turns lie beyond the fetched messages, so it is included
+        cut = await ChatContextBuilder(max_messages=2, summaries=True).build(
+            db, session, ChatModelType.GPT_4
+        )
+
+    assert [message["content"][0] for message in whole] == ["a", "b", "c"]
+    assert cut[0] == summary_message
+    assert [message["content"][0] for message in cut[1:]] == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_turns_pushed_out_of_the_window_are_summarized():
+    db = MockDB()
+    # Short turns that always fit the budget, but only two are kept
+    session = await make_session(db, ["a" * 8, "b" * 8, "c" * 8, "d" * 8])
+    builder = ChatContextBuilder(max_messages=2, summaries=True)
+    summarize = AsyncMock(return_value="Turns a and b.")
+
+    with patch("app.chat.llm_service.llm_service.summarize_conversation", summarize):
+        messages = await builder.build(db, session, ChatModelType.GPT_4)
+        await asyncio.sleep(0)
+
+        session = await db.get_session(session["_id"])
+        again = await builder.build(db, session, ChatModelType.GPT_4)
+        await asyncio.sleep(0)
+
+    assert [message["content"][0] for message in messages] == ["c", "d"]
+    folded = summarize.call_args[0][0]
+    assert [message["content"][0] for message in folded] == ["a", "b"]
+    assert again[0]["content"] == SUMMARY_PREFIX + "Turns a and b."
+    # Once the summary reaches the window, nothing is summarized again
+    summarize.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_claude_receives_the_summary_in_the_system_prompt():
+    db = MockDB()
+    session = await make_session(db, ["a" * 400, "b" * 40, "c" * 40])
+    session["context_summary"] = {
+        "text": "User runs a bakery.",
+        "tokens": 6,
+        "through": datetime.datetime(2024, 1, 1),
+    }
+    builder = ChatContextBuilder(summaries=True)
+
+    with patch.dict("app.chat.context.MODEL_CONTEXT_BUDGETS", {"claude": 40}):
+        messages = await builder.build(db, session, ChatModelType.CLAUDE)
+
+    response = MagicMock()
+    response.json.return_value = {"content": [{"text": "Happy to help."}]}
+    client = MagicMock()
+    client.post = AsyncMock(return_value=response)
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=False)
+
+    with patch.object(llm_service, "anthropic_api_key", "test-key"), patch(
+        "app.chat.llm_service.httpx.AsyncClient", return_value=client
+    ):
+        reply = await llm_service.get_llm_response(
+            messages, model_type=ChatModelType.CLAUDE, system_prompt="Be brief."
+        )
+
+    assert reply == {"message": "Happy to help."}
+    payload = client.post.call_args.kwargs["json"]
+    assert {message["role"] for message in payload["messages"]} == {
+        "user",
+        "assistant",
+    }
+    assert payload["system"].endswith(
+        "Be brief.\n\n" + SUMMARY_PREFIX + "User runs a bakery."
+    )
@@ -0,0 +1,98 @@
+import datetime
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.chat.database import (
+    MESSAGE_KIND_CHAT,
+    MESSAGE_KIND_TOOL_SUMMARY,
+    ChatDB,
+    MockDB,
+    classify_message,
+)
+
+SUMMARY = "Hey! Great News! I have found Plenty of tools to help you."
+
+
+def make_cursor(documents):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.skip.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=list(documents))
+    return cursor
+
+
+def test_classify_message():
+    assert classify_message({"role": "assistant", "content": SUMMARY}) == (
+        MESSAGE_KIND_TOOL_SUMMARY
+    )
+    assert classify_message({"role": "user", "content": SUMMARY}) == MESSAGE_KIND_CHAT
+    assert classify_message({"role": "assistant", "content": None}) == MESSAGE_KIND_CHAT
+
+
+@pytest.mark.asyncio
+async def test_get_messages_pushes_filter_and_paging_into_the_query():
+    chat_id = ObjectId()
+    cursor = make_cursor([{"content": "hi"}])
+    messages = MagicMock()
+    messages.find.return_value = cursor
+
+    result = await ChatDB(MagicMock(), messages).get_messages(
+        str(chat_id), limit=20, skip=40
+    )
+
+    assert result == [{"content": "hi"}]
+    messages.find.assert_called_once_with(
+        {"chat_id": chat_id, "kind": {"$ne": MESSAGE_KIND_TOOL_SUMMARY}}
+    )
+    cursor.sort.assert_called_once_with("timestamp", 1)
+    cursor.skip.assert_called_once_with(40)
+    cursor.limit.assert_called_once_with(20)
+    cursor.to_list.assert_awaited_once_with(length=20)
+
+
+@pytest.mark.asyncio
+async def test_get_recent_messages_scans_backwards_and_returns_oldest_first():
+    cursor = make_cursor([{"content": "third"}, {"content": "second"}])
+    messages = MagicMock()
+    messages.find.return_value = cursor
+
+    result = await ChatDB(MagicMock(), messages).get_recent_messages(
+        str(ObjectId()), limit=2
+    )
+
+    assert [message["content"] for message in result] == ["second", "third"]
+    cursor.sort.assert_called_once_with("timestamp", -1)
+    cursor.limit.assert_called_once_with(2)
+
+
+@pytest.mark.asyncio
+async def test_mock_db_matches_chat_db_behaviour():
+    db = MockDB()
+    session = await db.create_session({"title": "Test"})
+    start = datetime.datetime(2024, 1, 1)
+    contents = [("user", "one"), ("assistant", SUMMARY), ("assistant", "two")]
+    contents += [("user", "three"), ("assistant", "four")]
+    for index, (role, content) in enumerate(contents):
+        await db.add_message(
+            {
+                "chat_id": session["_id"],
+                "role": role,
+                "content": content,
+                "timestamp": start + datetime.timedelta(minutes=index),
+            }
+        )
+
+    history = await db.get_messages(session["_id"], limit=2, skip=1)
+    recent = await db.get_recent_messages(session["_id"], limit=3)
+
+    assert [message["content"] for message in history] == ["two", "three"]
+    assert [message["content"] for message in recent] == ["two", "three", "four"]
+    assert await db.get_recent_messages(session["_id"], limit=0) == []
@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.chat.streaming import (
+    STREAM_FORMAT_DELTA,
+    STREAM_FORMAT_FULL,
+    FullFrameAdapter,
+    coalesce_chunks,
+)
+from app.main import stream_llm_response
+from app.websocket import ConnectionManager
+
+
+async def fake_stream(items, pause_after=None, pause=0.0):
+    for index, item in enumerate(items):
+        yield item
+        if index == pause_after:
+            await asyncio.sleep(pause)
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+@pytest.mark.asyncio
+async def test_small_chunks_are_merged_up_to_the_size_limit():
+    chunks = ["ab"] * 10
+
+    merged = await collect(coalesce_chunks(fake_stream(chunks), max_chars=6, max_delay=10))
+
+    assert merged == ["ababab", "ababab", "ababab", "ab"]
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_flushed_when_the_llm_stalls():
+    stream = fake_stream(["a", "b", "c"], pause_after=0, pause=0.05)
+
+    merged = await collect(coalesce_chunks(stream, max_chars=100, max_delay=0.01))
+
+    assert merged == ["a", "bc"]
+
+
+@pytest.mark.asyncio
+async def test_non_text_items_flush_and_keep_their_order():
+    data = {"type": "formatted_data", "data": {}}
+    stream = fake_stream(["a", "b", data, "c", ""])
+
+    merged = await collect(coalesce_chunks(stream, max_chars=100, max_delay=10))
+
+    assert merged == ["ab", data, "c"]
+
+
+class FakeWebSocket:
+    def __init__(self, stream_format):
+        self.query_params = {"stream_format": stream_format}
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+@pytest.mark.asyncio
+async def test_delta_and_full_connections_get_their_own_frames():
+    chat_id = str(ObjectId())
+    manager = ConnectionManager()
+    delta_ws = FakeWebSocket(STREAM_FORMAT_DELTA)
+    full_ws = FakeWebSocket(STREAM_FORMAT_FULL)
+    for websocket in (delta_ws, full_ws):
+        await manager.connect(websocket)
+        await manager.associate_chat(websocket, chat_id)
+    chunks = ["Hello", ", wor", "ld ✓"] * 200
+    chat_db = MagicMock()
+    chat_db.add_message = AsyncMock()
+
+    with patch("app.main.manager", manager), patch(
+        "app.chat.llm_service.llm_service.get_streaming_llm_response",
+        lambda **kwargs: fake_stream(chunks),
+    ):
+        await stream_llm_response([], "gpt-4o-mini", None, chat_id, "user", chat_db)
+
+    writers = [conn["writer"] for conn in manager.active_connections]
+    while any(not conn["queue"].empty() for conn in manager.active_connections):
+        await asyncio.sleep(0)
+    for _ in range(5):
+        await asyncio.sleep(0)  # let the last sends finish
+    for websocket in (delta_ws, full_ws):
+        manager.disconnect(websocket)
+    await asyncio.gather(*writers, return_exceptions=True)
+
+    content = "".join(chunks)
+    delta_frames = delta_ws.sent
+    full_frames = full_ws.sent
+
+    # Chunks are coalesced, so there are far fewer frames than chunks
+    assert 1 < len(delta_frames) < len(chunks)
+    assert [frame["seq"] for frame in delta_frames[:-1]] == list(
+        range(1, len(delta_frames))
+    )
+    assert "".join(frame["delta"] for frame in delta_frames[:-1]) == content
+    assert all("content" not in frame for frame in delta_frames)
+
+    complete = delta_frames[-1]
+    assert complete["status"] == "complete"
+    assert complete["seq"] == len(delta_frames) - 1
+    assert complete["checksum"] == hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    assert len(full_frames) == len(delta_frames)
+    assert full_frames[-1] == {**complete, "content": content}
+    assert full_frames[-2]["content"] == content
+    assert all("delta" not in frame for frame in full_frames)
+    assert chat_db.add_message.call_args[0][0]["content"] == content
+
+
+def test_full_frame_adapter_accumulates_and_forgets_finished_responses():
+    adapter = FullFrameAdapter()
+    base = {"type": "chat_response", "message_id": "m1"}
+
+    first = adapter.adapt({**base, "status": "streaming", "seq": 1, "delta": "Hel"})
+    second = adapter.adapt({**base, "status": "streaming", "seq": 2, "delta": "lo"})
+    complete = adapter.adapt({**base, "status": "complete", "seq": 2})
+
+    assert first["content"] == "Hel" and "delta" not in first
+    assert second["content"] == "Hello"
+    assert complete["content"] == "Hello"
+    assert not adapter.pending
+    error = {"type": "error", "message": "boom"}
+    assert adapter.adapt(error) is error
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_ends_the_full_frame_response():
+    chat_id = str(ObjectId())
+    manager = ConnectionManager()
+    full_ws = FakeWebSocket(STREAM_FORMAT_FULL)
+    await manager.connect(full_ws)
+    await manager.associate_chat(full_ws, chat_id)
+
+    async def failing_stream():
+        yield "partial answer"
+        await asyncio.sleep(0.2)  # past the flush delay, so the text is sent
+        raise RuntimeError("LLM went away")
+
+    with patch("app.main.manager", manager), patch(
+        "app.chat.llm_service.llm_service.get_streaming_llm_response",
+        lambda **kwargs: failing_stream(),
+    ):
+        await stream_llm_response([], "gpt-4o-mini", None, chat_id, "user", MagicMock())
+
+    writer = manager.get_connection_by_websocket(full_ws)["writer"]
+    for _ in range(5):
+        await asyncio.sleep(0)
+    manager.disconnect(full_ws)
+    await asyncio.gather(writer, return_exceptions=True)
+
+    streaming, error = full_ws.sent
+    assert streaming["content"] == "partial answer"
+    assert error["type"] == "error"
+    assert error["message_id"] == streaming["message_id"]
+    # Nothing is left accumulating, so later messages are not decoded
+    assert not manager._full_frames.pending
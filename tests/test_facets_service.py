@@ -0,0 +1,146 @@
+import os
+import sys
+from unittest.mock import MagicMock, AsyncMock, patch
+
+import pytest
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.facets_service import FacetCounter, tool_category_ids
+
+
+def make_tool(category=None, categories=None, price="free", is_featured=False):
+    tool = {"price": price, "is_featured": is_featured}
+    if category is not None:
+        tool["category"] = category
+    if categories is not None:
+        tool["categories"] = [{"id": cat_id} for cat_id in categories]
+    return tool
+
+
+@pytest.fixture
+def counter():
+    counter = FacetCounter()
+    counter.loaded = True
+    counter.apply(None, make_tool("marketing", ["marketing", "seo"], "free", True))
+    counter.apply(None, make_tool("marketing", price="paid"))
+    counter.apply(None, make_tool(categories=["design"], price="free"))
+    return counter
+
+
+def test_tool_category_ids_only_uses_categories_ids():
+    tool = make_tool("marketing", ["marketing", "seo"])
+    assert tool_category_ids(tool) == {"marketing", "seo"}
+    # The legacy category field is not counted
+    assert tool_category_ids(make_tool("marketing")) == set()
+
+
+def test_facets_without_filters(counter):
+    facets = counter.facets()
+    assert facets["total"] == 3
+    assert facets["categories"] == {"marketing": 1, "seo": 1, "design": 1}
+    assert facets["pricing"] == {"free": 2, "paid": 1}
+    assert facets["featured"] == {"true": 1, "false": 2}
+
+
+def test_facets_apply_other_filters(counter):
+    counter.apply(None, make_tool(categories=["marketing"], price="paid"))
+    facets = counter.facets(category="marketing", price="free")
+    assert facets["total"] == 1
+    # The pricing facet ignores the price filter but keeps the category
+    assert facets["pricing"] == {"free": 1, "paid": 1}
+    assert facets["categories"] == {"marketing": 1, "seo": 1, "design": 1}
+    assert counter.category_count("marketing") == 2
+
+
+def test_apply_update_and_delete(counter):
+    before = make_tool(categories=["design"], price="free")
+    after = make_tool(categories=["design"], price="paid", is_featured=True)
+    counter.apply(before, after)
+    assert counter.facets(category="design")["pricing"] == {"paid": 1}
+
+    assert counter.category_count("design") == 1
+
+    counter.apply(after, None)
+    assert counter.category_count("design") == 0
+    assert "design" not in counter.category_ids()
+    assert counter.category_totals == {"marketing": 1, "seo": 1}
+
+
+def test_apply_is_ignored_until_loaded():
+    counter = FacetCounter()
+    counter.apply(None, make_tool("marketing"))
+    assert counter.facets()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_load_uses_single_aggregation():
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(
+        return_value=[
+            {
+                "tools": [
+                    {"_id": {"price": "free", "is_featured": True}, "count": 4},
+                    {"_id": {"price": "paid", "is_featured": False}, "count": 2},
+                ],
+                "categories": [
+                    {
+                        "_id": {
+                            "category": "seo",
+                            "price": "free",
+                            "is_featured": True,
+                        },
+                        "count": 3,
+                    }
+                ],
+            }
+        ]
+    )
+    collection = MagicMock()
+    collection.aggregate.return_value = cursor
+
+    counter = FacetCounter()
+    with patch("app.services.facets_service.tools", collection):
+        await counter.ensure_loaded()
+        await counter.ensure_loaded()
+        await counter.refresh_if_stale()
+
+    assert collection.aggregate.call_count == 1
+    assert counter.loaded
+    assert counter.facets()["total"] == 6
+    assert counter.category_count("seo") == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_counts_are_reloaded():
+    collection = MagicMock()
+    collection.aggregate.return_value.to_list = AsyncMock(return_value=[])
+    counter = FacetCounter(max_age=60)
+
+    with patch("app.services.facets_service.tools", collection):
+        # Never loads on its own, so TEST_MODE keeps the stored counts
+        await counter.refresh_if_stale()
+        assert collection.aggregate.call_count == 0
+
+        await counter.ensure_loaded()
+        counter.loaded_at -= 61
+        assert counter.stale
+        await counter.refresh_if_stale()
+
+    assert collection.aggregate.call_count == 2
+    assert not counter.stale
+
+
+@pytest.mark.asyncio
+async def test_failed_reload_keeps_the_old_counts(counter):
+    counter.loaded_at -= counter.max_age + 1
+    collection = MagicMock()
+    collection.aggregate.side_effect = RuntimeError("database down")
+
+    with patch("app.services.facets_service.tools", collection):
+        await counter.refresh_if_stale()
+        await counter.refresh_if_stale()
+
+    assert collection.aggregate.call_count == 1
+    assert counter.facets()["total"] == 3
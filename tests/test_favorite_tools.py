@@ -0,0 +1,63 @@
+import os
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.favorites_service import (
+    _build_favorite_tools_pipeline,
+    get_user_favorite_tools,
+)
+from helpers import AsyncCursor
+
+
+def test_page_is_cut_before_the_lookup():
+    pipeline = _build_favorite_tools_pipeline("user-1", skip=20, limit=10)
+
+    stages = [next(iter(stage)) for stage in pipeline]
+    assert stages == ["$match", "$sort", "$skip", "$limit", "$lookup", "$unwind", "$project"]
+    assert pipeline[0] == {"$match": {"user_id": "user-1"}}
+    assert pipeline[4]["$lookup"]["foreignField"] == "unique_id"
+    assert "tool.search_tokens" not in pipeline[6]["$project"]
+
+
+@pytest.mark.asyncio
+async def test_favorite_tools_come_from_one_aggregation():
+    favorite_id = ObjectId()
+    favorited_at = datetime(2024, 2, 1)
+    collection = MagicMock()
+    collection.aggregate.return_value = AsyncCursor(
+        [
+            {
+                "_id": favorite_id,
+                "created_at": favorited_at,
+                "tool": {
+                    "_id": ObjectId(),
+                    "id": "0b7d6f6e-8a53-4c57-9d0e-3e1e0f7b2a11",
+                    "unique_id": "writer",
+                    "name": "Writer",
+                    "description": "Drafts posts",
+                    "price": "free",
+                    "link": "https://example.com",
+                    "keywords": ["drafts"],
+                    "created_at": datetime(2024, 1, 1),
+                    "updated_at": datetime(2024, 1, 1),
+                },
+            }
+        ]
+    )
+
+    with patch("app.services.favorites_service.favorites", collection):
+        favorite_tools = await get_user_favorite_tools("user-1")
+
+    assert collection.aggregate.call_count == 1
+    assert len(favorite_tools) == 1
+    assert favorite_tools[0]["unique_id"] == "writer"
+    assert favorite_tools[0]["favorite_id"] == str(favorite_id)
+    assert favorite_tools[0]["favorited_at"] == favorited_at
+    assert favorite_tools[0]["saved_by_user"] is True
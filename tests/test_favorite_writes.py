@@ -0,0 +1,119 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.favorites import FavoriteCreate
+from app.services.favorites_service import add_favorite, remove_favorite, user_favorites
+from app.tools.tools_service import adjust_saved_numbers, tool_cache
+
+USER_ID = str(ObjectId())
+
+
+@pytest.fixture
+def collections():
+    user_favorites.clear()
+    favorites = MagicMock()
+    favorites.update_one = AsyncMock(return_value=MagicMock(upserted_id=ObjectId()))
+    favorites.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+    users = MagicMock()
+    users.update_one = AsyncMock()
+    adjust = AsyncMock(return_value=True)
+    with patch("app.services.favorites_service.favorites", favorites), patch(
+        "app.services.favorites_service.users", users
+    ), patch("app.services.favorites_service.adjust_saved_numbers", adjust), patch(
+        "app.services.favorites_service.get_tool_by_unique_id",
+        AsyncMock(return_value=object()),
+    ):
+        yield favorites, users, adjust
+    user_favorites.clear()
+
+
+@pytest.mark.asyncio
+async def test_add_favorite_is_one_upsert_then_concurrent_counters(collections):
+    favorites, users, adjust = collections
+
+    favorite = await add_favorite(USER_ID, FavoriteCreate(tool_unique_id="writer"))
+
+    assert favorite.tool_unique_id == "writer"
+    favorites.update_one.assert_awaited_once()
+    query, update = favorites.update_one.call_args[0]
+    assert query == {"user_id": USER_ID, "tool_unique_id": "writer"}
+    assert list(update) == ["$setOnInsert"]
+    assert favorites.update_one.call_args[1] == {"upsert": True}
+    users.update_one.assert_awaited_once()
+    adjust.assert_awaited_once_with("writer", 1)
+
+
+@pytest.mark.asyncio
+async def test_add_existing_favorite_conflicts_without_counting(collections):
+    favorites, users, adjust = collections
+    favorites.update_one.return_value = MagicMock(upserted_id=None)
+
+    with pytest.raises(HTTPException) as exc:
+        await add_favorite(USER_ID, FavoriteCreate(tool_unique_id="writer"))
+
+    assert exc.value.status_code == 409
+    adjust.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_racing_add_favorite_conflicts(collections):
+    favorites, users, adjust = collections
+    favorites.update_one.side_effect = DuplicateKeyError("E11000 duplicate key")
+
+    with pytest.raises(HTTPException) as exc:
+        await add_favorite(USER_ID, FavoriteCreate(tool_unique_id="writer"))
+
+    assert exc.value.status_code == 409
+    users.update_one.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_remove_favorite_uncounts_only_deleted_favorites(collections):
+    favorites, users, adjust = collections
+
+    assert await remove_favorite(USER_ID, "writer") is True
+    adjust.assert_awaited_once_with("writer", -1)
+
+    favorites.delete_one.return_value = MagicMock(deleted_count=0)
+    with pytest.raises(HTTPException) as exc:
+        await remove_favorite(USER_ID, "writer")
+    assert exc.value.status_code == 404
+    assert adjust.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_adjust_saved_numbers_is_one_atomic_update():
+    tool_cache.set(("unique_id", "writer"), object())
+    collection = MagicMock()
+    collection.find_one_and_update = AsyncMock(
+        return_value={"id": "tool-id", "unique_id": "writer"}
+    )
+
+    with patch("app.tools.tools_service.tools", collection):
+        assert await adjust_saved_numbers("writer", -1) is True
+
+    query, update = collection.find_one_and_update.call_args[0]
+    assert query == {"unique_id": "writer"}
+    # A pipeline update, so missing or null counters start from zero
+    assert update == [
+        {
+            "$set": {
+                "saved_numbers": {
+                    "$max": [
+                        0,
+                        {"$add": [{"$ifNull": ["$saved_numbers", 0]}, -1]},
+                    ]
+                }
+            }
+        }
+    ]
+    assert tool_cache.get(("unique_id", "writer")) is None
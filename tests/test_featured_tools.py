@@ -0,0 +1,95 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.setup import ensure_tools_text_index
+from app.tools.tools_service import (
+    _record_tool_mutation,
+    featured_tools_cache,
+    get_featured_tools_page,
+    tool_count_cache,
+)
+from helpers import AsyncCursor
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    featured_tools_cache.clear()
+    tool_count_cache.clear()
+    yield
+    featured_tools_cache.clear()
+    tool_count_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_filters_run_in_one_text_query():
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{"tools": [], "total": [{"count": 0}]}])
+    collection = MagicMock()
+    collection.aggregate.return_value = cursor
+
+    with patch("app.tools.tools_service.tools", collection):
+        page = await get_featured_tools_page(
+            skip=20, limit=10, search="video", category="media", price="free"
+        )
+
+    match = collection.aggregate.call_args[0][0][0]["$match"]
+    assert match["$text"] == {"$search": "video"}
+    assert match["is_featured"] is True
+    assert match["price"] == "free"
+    assert {"categories.id": "media"} in match["$or"]
+    page_stages = collection.aggregate.call_args[0][0][1]["$facet"]["tools"]
+    assert {"$skip": 20} in page_stages and {"$limit": 10} in page_stages
+    assert page == {"tools": [], "total": 0}
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_featured_set_is_cached_until_a_write():
+    tools = [MagicMock(name=f"tool{i}") for i in range(5)]
+    for tool in tools:
+        tool.model_copy.return_value = tool
+    get_page = AsyncMock(return_value={"tools": tools, "next_cursor": None})
+
+    with patch("app.tools.tools_service.get_tools_page", get_page), patch(
+        "app.tools.tools_service.facet_counter"
+    ):
+        first = await get_featured_tools_page(skip=1, limit=2)
+        second = await get_featured_tools_page(skip=3, limit=2)
+        assert get_page.await_count == 1
+        assert first == {"tools": tools[1:3], "total": 5}
+        assert second["tools"] == tools[3:5]
+
+        _record_tool_mutation(None, {"is_featured": True})
+        await get_featured_tools_page(skip=0, limit=2)
+        assert get_page.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_text_index_is_rebuilt_to_cover_keywords():
+    collection = MagicMock()
+    collection.list_indexes.return_value = AsyncCursor(
+        [
+            {"name": "_id_", "key": {"_id": 1}},
+            {
+                "name": "name_text_description_text",
+                "textIndexVersion": 3,
+                "weights": {"name": 1, "description": 1},
+            },
+        ]
+    )
+    collection.drop_index = AsyncMock()
+    collection.create_index = AsyncMock()
+
+    with patch("app.database.setup.database") as database:
+        database.tools = collection
+        await ensure_tools_text_index()
+
+    collection.drop_index.assert_awaited_once_with("name_text_description_text")
+    collection.create_index.assert_awaited_once_with(
+        [("name", "text"), ("description", "text"), ("keywords", "text")]
+    )
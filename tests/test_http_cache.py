@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+from fastapi import Request, Response
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.cache import catalog_version
+from app.services.favorites_service import user_favorites
+from app.tools.http_cache import (
+    PRIVATE_CACHE_CONTROL,
+    PUBLIC_CACHE_CONTROL,
+    check_listing,
+    etag_matches,
+    listing_etag,
+    tools_page_response,
+)
+from app.tools.models import PaginatedToolsResponse, ToolSummary
+from app.tools.routes import get_tool_by_unique_identifier
+from app.tools.tools_service import create_tool_response, tool_cache
+
+TOOL = {
+    "_id": ObjectId(),
+    "id": "0b7d6f6e-8a53-4c57-9d0e-3e1e0f7b2a11",
+    "unique_id": "writer",
+    "name": "Writer",
+    "description": "Drafts posts",
+    "price": "free",
+    "link": "https://example.com",
+    "keywords": ["drafts"],
+    "created_at": datetime(2024, 1, 1),
+    "updated_at": datetime(2024, 1, 1),
+}
+USER = MagicMock(id=str(ObjectId()))
+
+
+def make_request(path="/public/tools/", query="", if_none_match=None):
+    headers = []
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": headers,
+        }
+    )
+
+
+@pytest.fixture
+def collection():
+    tool_cache.clear()
+    user_favorites.clear()
+    collection = MagicMock()
+    collection.find_one = AsyncMock(return_value=dict(TOOL))
+    user_favorite_ids = MagicMock()
+    user_favorite_ids.distinct = AsyncMock(return_value=[])
+    with patch("app.tools.tools_service.tools", collection), patch(
+        "app.services.favorites_service.favorites", user_favorite_ids
+    ):
+        yield collection
+    tool_cache.clear()
+    user_favorites.clear()
+
+
+def test_etag_matches_weak_and_listed_validators():
+    etag = '"abc"'
+    assert etag_matches(make_request(if_none_match='W/"abc"'), etag)
+    assert etag_matches(make_request(if_none_match='"x", "abc"'), etag)
+    assert etag_matches(make_request(if_none_match="*"), etag)
+    assert not etag_matches(make_request(if_none_match='"x"'), etag)
+    assert not etag_matches(make_request(), etag)
+
+
+async def make_page(**fields):
+    tool = await create_tool_response(dict(TOOL, **fields))
+    return {"tools": [tool], "total": 1, "skip": 0, "limit": 10, "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_listing_etag_depends_only_on_the_page_and_query():
+    request = make_request(query="skip=0&limit=10")
+    first = listing_etag(request, await make_page())
+
+    # Stable over time and across processes while the page is unchanged
+    catalog_version.bump()
+    assert first == listing_etag(request, await make_page())
+    assert first == listing_etag(make_request(query="limit=10&skip=0"), await make_page())
+
+    assert first != listing_etag(request, await make_page(updated_at=datetime(2024, 2, 1)))
+    assert first != listing_etag(request, await make_page(saved_numbers=3))
+    assert first != listing_etag(make_request(query="fields=name"), await make_page())
+
+    saved = await make_page()
+    saved["tools"][0].saved_by_user = True
+    assert first != listing_etag(request, saved)
+
+
+def test_listing_etag_covers_projected_fields():
+    request = make_request(query="fields=name,price")
+
+    def sparse_page(**fields):
+        tool = ToolSummary(id=TOOL["id"], unique_id="writer", **fields)
+        return {"tools": [tool], "total": 1, "skip": 0, "limit": 10, "next_cursor": None}
+
+    first = listing_etag(request, sparse_page(name="Writer", price="free"))
+    assert first == listing_etag(request, sparse_page(name="Writer", price="free"))
+    assert first != listing_etag(request, sparse_page(name="Writer Pro", price="free"))
+    assert first != listing_etag(request, sparse_page(name="Writer", price="paid"))
+
+
+@pytest.mark.asyncio
+async def test_listing_etag_is_stable_without_timestamps():
+    request = make_request()
+    undated = {k: v for k, v in TOOL.items() if k not in ("created_at", "updated_at")}
+
+    async def page():
+        tool = await create_tool_response(dict(undated))
+        return {"tools": [tool], "total": 1, "skip": 0, "limit": 10}
+
+    assert listing_etag(request, await page()) == listing_etag(request, await page())
+
+
+@pytest.mark.asyncio
+async def test_check_listing_sets_headers_then_answers_304():
+    page = await make_page()
+    response = Response()
+    assert check_listing(make_request(), response, page) is None
+    assert response.headers["Cache-Control"] == PUBLIC_CACHE_CONTROL
+
+    etag = response.headers["ETag"]
+    assert not etag.startswith("W/")
+    not_modified = check_listing(make_request(if_none_match=etag), Response(), page)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_detail_304_from_warm_cache_skips_mongodb(collection):
+    response = Response()
+    tool = await get_tool_by_unique_identifier(
+        "writer", make_request("/tools/unique/writer"), response, current_user=USER
+    )
+    assert tool.unique_id == "writer"
+    assert response.headers["Cache-Control"] == PRIVATE_CACHE_CONTROL
+
+    conditional = make_request(
+        "/tools/unique/writer", if_none_match=response.headers["ETag"]
+    )
+    not_modified = await get_tool_by_unique_identifier(
+        "writer", conditional, Response(), current_user=USER
+    )
+
+    assert not_modified.status_code == 304
+    assert collection.find_one.await_count == 1
+
+    # Saving the tool changes saved_by_user, so the old ETag no longer matches
+    user_favorites.add(USER.id, "writer")
+    tool = await get_tool_by_unique_identifier(
+        "writer", conditional, Response(), current_user=USER
+    )
+    assert tool.saved_by_user is True
+
+
+@pytest.mark.asyncio
+async def test_tools_page_response_matches_the_validated_response():
+    tool = await create_tool_response(dict(TOOL))
+    page = {"tools": [tool], "total": 1, "skip": 0, "limit": 10}
+    response = Response()
+    response.headers["ETag"] = '"abc"'
+
+    rendered = tools_page_response(page, response)
+
+    expected = PaginatedToolsResponse(**page).model_dump(mode="json")
+    assert json.loads(rendered.body) == expected
+    assert rendered.headers["ETag"] == '"abc"'
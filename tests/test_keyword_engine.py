@@ -0,0 +1,130 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.setup import backfill_tool_keywords
+from app.services.keyword_engine import KeywordEngine, tokenize
+from app.tools.tools_service import extract_keywords, extract_keywords_batch
+from helpers import AsyncCursor
+
+
+CORPUS = [
+    "Writer drafts marketing content for blogs",
+    "Designer creates marketing images",
+    "Transcriber turns podcast audio into text-to-speech content",
+    "Marketing analytics dashboard for content teams",
+]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The AI tool, for text-to-speech!") == ["text-to-speech"]
+    assert tokenize(None) == []
+
+
+def test_idf_prefers_rare_terms():
+    engine = KeywordEngine(use_idf=True)
+    engine.fit(CORPUS)
+    keywords = engine.extract("marketing podcast", limit=2)
+    # Both appear once, but "podcast" is rare across the catalog
+    assert keywords[0] == "podcast"
+    assert engine.idf["marketing"] < engine.idf["podcast"] < engine.default_idf
+
+
+def test_unfitted_engine_ranks_by_frequency():
+    engine = KeywordEngine(use_idf=True)
+    assert engine.extract("video editing video captions video editing") == [
+        "video",
+        "editing",
+        "captions",
+    ]
+
+
+def test_weights_are_numeric():
+    engine = KeywordEngine()
+    keywords = engine.extract_weighted(
+        [("spreadsheet formulas", 0.5), ("presentation slides", 1.0)], limit=None
+    )
+    assert keywords == ["presentation", "slides", "spreadsheet", "formulas"]
+
+
+def test_default_extractor_ranks_whole_words_by_frequency():
+    engine = KeywordEngine()
+    engine.fit(CORPUS)
+    # IDF is ignored and punctuated words are skipped, as before TF-IDF
+    assert engine.extract("Marketing podcast marketing, text-to-speech podcast") == [
+        "podcast",
+        "marketing",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_default_engine_skips_catalog_fit():
+    engine = KeywordEngine()
+    with patch("app.database.database.tools") as tools:
+        await engine.fit_from_catalog()
+    tools.find.assert_not_called()
+    assert engine.idf == {}
+
+
+@pytest.mark.asyncio
+async def test_fit_from_catalog_streams_tools():
+    engine = KeywordEngine(use_idf=True)
+    documents = [{"name": text.split()[0], "description": text} for text in CORPUS]
+    with patch("app.database.database.tools") as tools:
+        tools.find.return_value = AsyncCursor(documents)
+        await engine.fit_from_catalog()
+    assert engine.document_count == len(CORPUS)
+    assert engine.idf["marketing"] < engine.idf["podcast"]
+
+
+@pytest.mark.parametrize("use_idf", [False, True])
+def test_extract_many_matches_single_extraction(use_idf):
+    engine = KeywordEngine(use_idf=use_idf)
+    engine.fit(CORPUS)
+    texts = CORPUS + ["", None]
+    assert engine.extract_many(texts) == [engine.extract(text) for text in texts]
+    assert engine.extract_many(["", None]) == [[], []]
+
+
+def test_extract_keywords_batch_matches_per_tool_extraction():
+    tool_list = [
+        {"name": "Podcast Studio", "description": CORPUS[2], "tags": ["Audio"]},
+        {"name": "Writer", "keywords": ["drafts"]},
+        {"name": "Deck", "features": ["slides", 3], "pricing_type": "Free"},
+    ]
+    batch = extract_keywords_batch(tool_list)
+    assert [sorted(keywords) for keywords in batch] == [
+        sorted(extract_keywords(tool)) for tool in tool_list
+    ]
+    assert "audio" in batch[0] and batch[1] == ["drafts"] and "free" in batch[2]
+
+
+@pytest.mark.asyncio
+async def test_backfill_keywords_tools_in_batches():
+    oids = [ObjectId() for _ in range(3)]
+    documents = [
+        {"_id": oid, "name": f"Tool {index}", "description": text}
+        for index, (oid, text) in enumerate(zip(oids, CORPUS))
+    ]
+    collection = MagicMock()
+    collection.find.return_value = AsyncCursor(documents)
+    collection.bulk_write = AsyncMock()
+    store = MagicMock(upsert_tool_keywords=AsyncMock())
+
+    with patch("app.database.setup.database") as database, patch(
+        "app.services.keyword_store.keyword_store", store
+    ):
+        database.tools = collection
+        assert await backfill_tool_keywords(batch_size=2) == 3
+
+    assert collection.bulk_write.await_count == 2
+    first_op = collection.bulk_write.call_args_list[0][0][0][0]
+    assert first_op._doc == {"$set": {"keywords": extract_keywords(documents[0])}}
+    tool_id, tool_name, _ = list(store.upsert_tool_keywords.call_args_list[0][0][0])[0]
+    assert (tool_id, tool_name) == (str(oids[0]), "Tool 0")
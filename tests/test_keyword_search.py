@@ -0,0 +1,70 @@
+import os
+import re
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.tools_service import (
+    _build_keyword_query,
+    build_search_tokens,
+    keyword_search_tools_page,
+    tool_count_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_count_cache():
+    tool_count_cache.clear()
+    yield
+    tool_count_cache.clear()
+
+
+def test_search_tokens_cover_name_description_category_and_keywords():
+    tokens = build_search_tokens(
+        {
+            "name": "Speech-Writer Pro",
+            "description": "Writes speeches. Writes them fast!",
+            "category": "text-to-speech",
+            "keywords": ["Public Speaking"],
+        }
+    )
+
+    assert tokens == sorted(
+        {"speech", "writer", "pro", "writes", "speeches", "them", "fast", "text",
+         "to", "public", "speaking"}
+    )
+
+
+def test_keyword_query_uses_escaped_anchored_prefixes():
+    query = _build_keyword_query(["Writ", "c++ (beta)", ".*"], {"is_featured": True})
+
+    patterns = [regex.pattern for regex in query["search_tokens"]["$in"]]
+    assert patterns == ["^writ", "^beta"]
+    assert query["is_featured"] is True
+
+
+def test_keyword_query_without_usable_terms_matches_nothing():
+    assert _build_keyword_query(["?!", "*"]) == {"search_tokens": {"$in": []}}
+
+
+@pytest.mark.asyncio
+async def test_keyword_page_is_ranked_before_skip_and_limit():
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{"tools": [], "total": [{"count": 0}]}])
+    collection = MagicMock()
+    collection.aggregate.return_value = cursor
+
+    with patch("app.tools.tools_service.tools", collection):
+        page = await keyword_search_tools_page(["video", "editor"], skip=10, limit=5)
+
+    pipeline = collection.aggregate.call_args[0][0]
+    assert isinstance(pipeline[0]["$match"]["search_tokens"]["$in"][0], re.Pattern)
+    page_stages = pipeline[1]["$facet"]["tools"]
+    assert "_keyword_score" in page_stages[0]["$addFields"]
+    assert page_stages[1]["$sort"]["_keyword_score"] == -1
+    assert page_stages[2:4] == [{"$skip": 10}, {"$limit": 5}]
+    assert page == {"tools": [], "total": 0}
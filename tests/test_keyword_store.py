@@ -0,0 +1,61 @@
+import os
+import sys
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.keyword_store import KeywordStore, normalize_keyword
+
+
+def test_normalize_keyword():
+    assert normalize_keyword("  Machine   Learning ") == "machine learning"
+    assert normalize_keyword(None) == ""
+
+
+def test_one_upsert_per_distinct_keyword():
+    operations = KeywordStore.build_upserts(
+        [
+            ("t1", "Tool One", ["SEO", "seo ", "writing"]),
+            ("t2", "Tool Two", ["seo", ""]),
+        ],
+        now=datetime(2024, 1, 1),
+    )
+    by_keyword = {op._filter["keyword"]: op for op in operations}
+    assert set(by_keyword) == {"seo", "writing"}
+
+    seo_update = by_keyword["seo"]._doc
+    new_tools = seo_update[0]["$set"]["tools"]["$concatArrays"][1]["$literal"]
+    assert [entry["tool_id"] for entry in new_tools] == ["t1", "t2"]
+    # Frequency is derived from the tools array, so rewrites are idempotent
+    assert seo_update[1] == {"$set": {"frequency": {"$size": "$tools"}}}
+    assert by_keyword["seo"]._upsert
+
+
+def test_tool_names_are_not_evaluated_as_expressions():
+    (operation,) = KeywordStore.build_upserts([("t1", "$price", ["seo"])])
+
+    new_tools = operation._doc[0]["$set"]["tools"]["$concatArrays"][1]
+    assert new_tools == {"$literal": [{"tool_id": "t1", "tool_name": "$price"}]}
+
+
+@pytest.mark.asyncio
+async def test_upsert_uses_single_unordered_bulk_write():
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock()
+    store = KeywordStore(collection)
+
+    written = await store.upsert_tool_keywords(
+        [("t1", "One", ["a", "b"]), ("t2", "Two", ["b", "c"])]
+    )
+
+    assert written == 3
+    collection.bulk_write.assert_awaited_once()
+    assert collection.bulk_write.call_args.kwargs == {"ordered": False}
+
+    collection.bulk_write.reset_mock()
+    assert await store.upsert_tool_keywords([("t3", "Three", [])]) == 0
+    collection.bulk_write.assert_not_awaited()
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pubsub import (
+    InMemoryPubSub,
+    RedisError,
+    RedisPubSub,
+    create_pubsub,
+    encode_command,
+    read_reply,
+)
+from app.websocket import ConnectionManager
+
+
+class FakeRedisServer:
+    """Local stand-in for a Redis server: PING, AUTH and pub/sub commands only"""
+
+    def __init__(self, password=None):
+        self.password = password
+        self.subscribers = {}  # channel -> set of writers
+        self.published = []
+        self.clients = []
+        self.server = None
+
+    @property
+    def url(self):
+        port = self.server.sockets[0].getsockname()[1]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{port}"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self):
+        self.server.close()
+        for writer in self.clients:
+            writer.close()
+        await self.server.wait_closed()
+
+    def disconnect_clients(self):
+        for writer in self.clients:
+            writer.close()
+        self.clients = []
+        self.subscribers = {}
+
+    async def _handle(self, reader, writer):
+        self.clients.append(writer)
+        authenticated = self.password is None
+        try:
+            while True:
+                command = await read_reply(reader)
+                name, args = command[0].upper(), [a.decode() for a in command[1:]]
+                if name == b"AUTH":
+                    authenticated = args[0] == self.password
+                    writer.write(b"+OK\r\n" if authenticated else b"-ERR invalid password\r\n")
+                elif not authenticated:
+                    writer.write(b"-NOAUTH Authentication required\r\n")
+                elif name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                elif name in (b"SUBSCRIBE", b"UNSUBSCRIBE"):
+                    for count, channel in enumerate(args, 1):
+                        writers = self.subscribers.setdefault(channel, set())
+                        if name == b"SUBSCRIBE":
+                            writers.add(writer)
+                        else:
+                            writers.discard(writer)
+                        writer.write(
+                            encode_command(name.lower(), channel)[:-2].replace(
+                                b"*2", b"*3", 1
+                            )
+                            + b"\r\n:%d\r\n" % count
+                        )
+                elif name == b"PUBLISH":
+                    channel, message = args
+                    self.published.append((channel, message))
+                    receivers = list(self.subscribers.get(channel, ()))
+                    for receiver in receivers:
+                        receiver.write(encode_command("message", channel, message))
+                    writer.write(b":%d\r\n" % len(receivers))
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+            writer.close()
+
+
+class FakeWebSocket:
+    def __init__(self, query_params=None):
+        self.query_params = query_params or {}
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+
+async def eventually(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def worker(url):
+    pubsub = RedisPubSub(url, reconnect_delay=0.05)
+    manager = ConnectionManager(pubsub=pubsub)
+    await manager.start()
+    await asyncio.wait_for(pubsub.connected.wait(), 2)
+    return manager
+
+
+async def shutdown(*managers):
+    for manager in managers:
+        writers = [conn["writer"] for conn in manager.active_connections]
+        for connection in manager.active_connections:
+            manager.disconnect(connection["websocket"])
+        await asyncio.gather(*writers, return_exceptions=True)
+        await manager.stop()
+
+
+@pytest.fixture
+async def redis_server():
+    server = FakeRedisServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_broadcasts_reach_connections_on_every_worker(redis_server):
+    first, second = await worker(redis_server.url), await worker(redis_server.url)
+    a, b, c = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    for manager, websocket, user in ((first, a, "u1"), (second, b, "u1"), (second, c, "u2")):
+        await manager.connect(websocket)
+        await manager.associate_user(websocket, user)
+        await manager.associate_chat(websocket, "chat-1")
+
+    # Associating waits for the subscription, so publishing right away is safe
+    await first.broadcast_to_chat({"n": 1}, "chat-1")
+    await second.broadcast_to_user({"n": 2}, "u1")
+    await first.broadcast_json({"n": 3})
+
+    await eventually(lambda: len(a.sent) == 3 and len(b.sent) == 3 and len(c.sent) == 2)
+    # Messages from different publishers have no order relative to each other
+    assert sorted(a.sent, key=lambda frame: frame["n"]) == sorted(
+        b.sent, key=lambda frame: frame["n"]
+    ) == [{"n": 1}, {"n": 2}, {"n": 3}]
+    assert c.sent == [{"n": 1}, {"n": 3}]
+
+    await shutdown(first, second)
+
+
+@pytest.mark.asyncio
+async def test_workers_only_subscribe_to_their_own_chats(redis_server):
+    manager = await worker(redis_server.url)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket)
+    await manager.associate_chat(websocket, "chat-1")
+    await eventually(lambda: redis_server.subscribers.get("taaft:ws:chat:chat-1"))
+
+    await manager.associate_chat(websocket, "chat-2")
+    await eventually(lambda: not redis_server.subscribers.get("taaft:ws:chat:chat-1"))
+    await eventually(lambda: redis_server.subscribers.get("taaft:ws:chat:chat-2"))
+
+    manager.disconnect(websocket)
+    await eventually(lambda: not redis_server.subscribers.get("taaft:ws:chat:chat-2"))
+    await shutdown(manager)
+
+
+@pytest.mark.asyncio
+async def test_worker_delivers_locally_and_resubscribes_after_losing_the_bus(
+    redis_server,
+):
+    manager = await worker(redis_server.url)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket)
+    await manager.associate_chat(websocket, "chat-1")
+
+    redis_server.disconnect_clients()
+    await eventually(lambda: not manager.pubsub.connected.is_set())
+    await manager.broadcast_to_chat({"n": 1}, "chat-1")
+    await eventually(lambda: websocket.sent == [{"n": 1}])
+
+    await asyncio.wait_for(manager.pubsub.connected.wait(), 2)
+    await eventually(lambda: redis_server.subscribers.get("taaft:ws:chat:chat-1"))
+    await manager.broadcast_to_chat({"n": 2}, "chat-1")
+    await eventually(lambda: websocket.sent == [{"n": 1}, {"n": 2}])
+    assert redis_server.published[-1] == ("taaft:ws:chat:chat-1", '{"n": 2}')
+
+    await shutdown(manager)
+
+
+@pytest.mark.asyncio
+async def test_password_from_the_url_is_sent_with_auth():
+    server = FakeRedisServer(password="s3cret")
+    await server.start()
+    try:
+        manager = await worker(server.url)
+        websocket = FakeWebSocket()
+        await manager.connect(websocket)
+        await manager.associate_user(websocket, "u1")
+        await eventually(lambda: server.subscribers.get("taaft:ws:user:u1"))
+        await manager.broadcast_to_user({"n": 1}, "u1")
+        await eventually(lambda: websocket.sent == [{"n": 1}])
+        await shutdown(manager)
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_in_memory_bus_delivers_to_subscribed_channels_only():
+    bus = InMemoryPubSub()
+    received = []
+    await bus.subscribe("a", lambda channel, message: received.append((channel, message)))
+
+    assert await bus.publish("a", "1")
+    assert await bus.publish("b", "2")
+    bus.unsubscribe("a")
+    assert await bus.publish("a", "3")
+
+    assert received == [("a", "1")]
+
+
+@pytest.mark.asyncio
+async def test_resp_encoding_and_replies():
+    assert encode_command("PUBLISH", "ch", "hé") == (
+        b"*3\r\n$7\r\nPUBLISH\r\n$2\r\nch\r\n$3\r\nh\xc3\xa9\r\n"
+    )
+
+    reader = asyncio.StreamReader()
+    reader.feed_data(b"+OK\r\n-ERR nope\r\n:3\r\n$-1\r\n*2\r\n$1\r\na\r\n:1\r\n")
+    reader.feed_eof()
+
+    assert await read_reply(reader) == "OK"
+    error = await read_reply(reader)
+    assert isinstance(error, RedisError) and str(error) == "ERR nope"
+    assert await read_reply(reader) == 3
+    assert await read_reply(reader) is None
+    assert await read_reply(reader) == [b"a", 1]
+    with pytest.raises(ConnectionError):
+        await read_reply(reader)
+
+
+def test_create_pubsub_picks_the_bus_from_the_url():
+    assert isinstance(create_pubsub(""), InMemoryPubSub)
+    bus = create_pubsub("redis://:pw@cache:6380")
+    assert isinstance(bus, RedisPubSub)
+    assert (bus.host, bus.port, bus.password) == ("cache", 6380, "pw")
+    with pytest.raises(ValueError):
+        create_pubsub("amqp://broker")
@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.shares_service import (
+    delete_share,
+    get_share_payload,
+    get_user_shares,
+    share_cache,
+)
+from app.tools.tools_service import _record_tool_mutation
+from helpers import AsyncCursor
+
+SHARE = {
+    "_id": ObjectId(),
+    "share_id": "share-1",
+    "user_id": "user-1",
+    "tool_unique_id": "writer",
+    "created_at": datetime(2024, 3, 1),
+}
+TOOL = {
+    "_id": ObjectId(),
+    "unique_id": "writer",
+    "name": "Writer",
+    "search_tokens": ["writer"],
+    "has_description": 0,
+}
+
+
+@pytest.fixture
+def collection():
+    share_cache.clear()
+    collection = MagicMock()
+    collection.aggregate.side_effect = lambda pipeline: AsyncCursor(
+        [dict(SHARE, tool=dict(TOOL))]
+    )
+    collection.find_one = AsyncMock(return_value=dict(SHARE))
+    collection.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+    with patch("app.services.shares_service.shares", collection), patch(
+        "app.tools.tools_service.facet_counter"
+    ):
+        yield collection
+    share_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_warm_share_page_costs_no_queries(collection):
+    payload = json.loads(await get_share_payload("share-1"))
+    assert payload["tool"]["name"] == "Writer"
+    assert payload["tool"]["_id"] == str(TOOL["_id"])
+    pipeline = collection.aggregate.call_args[0][0]
+    assert pipeline[-1] == {"$project": {"tool.search_tokens": 0, "tool.has_description": 0}}
+    assert payload["share"] == {
+        "id": "share-1",
+        "created_at": "2024-03-01T00:00:00",
+        "shared_by": "user-1",
+    }
+
+    await get_share_payload("share-1")
+    assert collection.aggregate.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_tool_writes_and_share_deletes_drop_the_page(collection):
+    await get_share_payload("share-1")
+    _record_tool_mutation(TOOL, dict(TOOL, name="Writer Pro"))
+    await get_share_payload("share-1")
+    assert collection.aggregate.call_count == 2
+
+    assert await delete_share("user-1", "share-1")
+    collection.aggregate.side_effect = lambda pipeline: AsyncCursor([])
+    assert await get_share_payload("share-1") is None
+    assert collection.aggregate.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_page_rendered_while_its_tool_is_written_is_not_cached(collection):
+    def aggregate(pipeline):
+        _record_tool_mutation(TOOL, dict(TOOL, name="Writer Pro"))
+        return AsyncCursor([dict(SHARE, tool=dict(TOOL))])
+
+    collection.aggregate.side_effect = aggregate
+    await get_share_payload("share-1")
+    await get_share_payload("share-1")
+
+    assert collection.aggregate.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_user_shares_are_joined_in_one_aggregation(collection):
+    collection.aggregate.side_effect = lambda pipeline: AsyncCursor([dict(SHARE)])
+
+    user_shares = await get_user_shares("user-1", skip=5, limit=10)
+
+    pipeline = collection.aggregate.call_args[0][0]
+    assert [next(iter(stage)) for stage in pipeline] == [
+        "$match", "$sort", "$skip", "$limit", "$lookup", "$match", "$project"
+    ]
+    assert [share.share_id for share in user_shares] == ["share-1"]
+    assert user_shares[0].share_link.endswith("/tool/writer?share=share-1")
@@ -0,0 +1,80 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.backfill import ToolBackfillQueue
+from app.tools.tools_service import create_tool_response
+
+
+def mock_collection(name):
+    collection = MagicMock()
+    collection.name = name
+    collection.bulk_write = AsyncMock()
+    return collection
+
+
+@pytest.fixture
+def collections():
+    tools = mock_collection("tools")
+    keywords = mock_collection("keywords")
+    with patch("app.tools.backfill.tools", tools), patch(
+        "app.tools.backfill.keyword_store.collection", keywords
+    ):
+        yield tools, keywords
+
+
+@pytest.mark.asyncio
+async def test_backfills_are_deduplicated_and_bulk_written(collections):
+    tools, keywords = collections
+    queue = ToolBackfillQueue(flush_interval=60)
+    first, second = ObjectId(), ObjectId()
+
+    for _ in range(3):
+        queue.enqueue(first, {"id": "uuid-1", "keywords": ["seo", "writing"]}, "A")
+    queue.enqueue(second, {"keywords": ["seo"]}, "B")
+    await queue.close()
+
+    tools.bulk_write.assert_awaited_once()
+    tool_ops, kwargs = tools.bulk_write.call_args
+    assert kwargs == {"ordered": False}
+    assert len(tool_ops[0]) == 3
+
+    keyword_ops = keywords.bulk_write.call_args[0][0]
+    assert sorted(op._filter["keyword"] for op in keyword_ops) == ["seo", "writing"]
+
+
+@pytest.mark.asyncio
+async def test_tools_are_backfilled_once(collections):
+    tools, _ = collections
+    queue = ToolBackfillQueue(flush_interval=60)
+    tool_oid = ObjectId()
+
+    queue.enqueue(tool_oid, {"id": "uuid-1"})
+    await queue.flush()
+    queue.enqueue(tool_oid, {"id": "uuid-1"})
+    await queue.close()
+
+    assert tools.bulk_write.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_create_tool_response_does_not_write():
+    tool = {"_id": ObjectId(), "name": "Writer", "description": "Drafts blog posts"}
+    queue = MagicMock()
+    tools = MagicMock()
+    with patch("app.tools.tools_service.tool_backfill_queue", queue), patch(
+        "app.tools.tools_service.tools", tools
+    ):
+        response = await create_tool_response(tool)
+
+    assert response is not None
+    assert not tools.method_calls
+    queued_fields = [call.args[1] for call in queue.enqueue.call_args_list]
+    assert {"id": str(response.id)} in queued_fields
+    assert {"keywords": response.keywords} in queued_fields
@@ -0,0 +1,64 @@
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException, Response
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.models import ToolBatchRequest
+from app.tools.routes import get_tools_batch
+from app.tools.tools_service import (
+    TOOL_BATCH_MAX_IDS,
+    get_tool_by_unique_id,
+    get_tools_by_unique_ids,
+    tool_cache,
+)
+from helpers import AsyncCursor, make_tool
+
+
+@pytest.fixture
+def collection():
+    tool_cache.clear()
+    catalog = {uid: make_tool(uid) for uid in ("writer", "painter", "coder")}
+    collection = MagicMock()
+    collection.find.side_effect = lambda query: AsyncCursor(
+        catalog[uid] for uid in catalog if uid in query["unique_id"]["$in"]
+    )
+    with patch("app.tools.tools_service.tools", collection):
+        yield collection
+    tool_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_batch_keeps_requested_order_and_reports_misses(collection):
+    result = await get_tools_by_unique_ids(["coder", "nope", "writer", "coder"])
+
+    assert [tool.unique_id for tool in result["tools"]] == ["coder", "writer"]
+    assert result["missing"] == ["nope"]
+    assert collection.find.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_only_queries_cold_ids(collection):
+    await get_tools_by_unique_ids(["writer", "nope"])
+
+    result = await get_tools_by_unique_ids(["painter", "writer", "nope"])
+
+    assert collection.find.call_args[0][0] == {"unique_id": {"$in": ["painter"]}}
+    assert [tool.unique_id for tool in result["tools"]] == ["painter", "writer"]
+    assert result["missing"] == ["nope"]
+
+    # The batch warms the single-tool lookup as well
+    collection.find_one = MagicMock(side_effect=AssertionError("not cached"))
+    assert (await get_tool_by_unique_id("painter")).name == "Painter"
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_caps_the_number_of_ids(collection):
+    batch = ToolBatchRequest(unique_ids=["t"] * (TOOL_BATCH_MAX_IDS + 1))
+    with pytest.raises(HTTPException) as exc:
+        await get_tools_batch(batch, Response(), current_user=None)
+    assert exc.value.status_code == 400
@@ -0,0 +1,79 @@
+import os
+import sys
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.tools_service import (
+    _record_tool_mutation,
+    get_tool_by_id,
+    get_tool_by_unique_id,
+    tool_cache,
+)
+
+TOOL = {
+    "_id": ObjectId(),
+    "id": "0b7d6f6e-8a53-4c57-9d0e-3e1e0f7b2a11",
+    "unique_id": "writer",
+    "name": "Writer",
+    "description": "Drafts posts",
+    "price": "free",
+    "link": "https://example.com",
+    "keywords": ["drafts"],
+    "created_at": datetime(2024, 1, 1),
+    "updated_at": datetime(2024, 1, 1),
+}
+
+
+@pytest.fixture
+def collection():
+    tool_cache.clear()
+    collection = MagicMock()
+    collection.find_one = AsyncMock(return_value=dict(TOOL))
+    with patch("app.tools.tools_service.tools", collection), patch(
+        "app.tools.tools_service.facet_counter"
+    ):
+        yield collection
+    tool_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_lookups_share_one_cache_entry_per_identifier(collection):
+    first = await get_tool_by_unique_id("writer")
+    by_id = await get_tool_by_id(TOOL["id"])
+
+    assert collection.find_one.await_count == 1
+    assert by_id.unique_id == first.unique_id
+
+    # Callers get copies, so per-user fields never leak into the cache
+    first.saved_by_user = True
+    assert (await get_tool_by_unique_id("writer")).saved_by_user is False
+
+
+@pytest.mark.asyncio
+async def test_unknown_identifiers_are_negatively_cached(collection):
+    collection.find_one.return_value = None
+    assert await get_tool_by_unique_id("missing") is None
+    assert await get_tool_by_unique_id("missing") is None
+    assert collection.find_one.await_count == 1
+
+    # Creating the tool clears the negative entry
+    _record_tool_mutation(None, {"unique_id": "missing", "id": "new-id"})
+    collection.find_one.return_value = dict(TOOL, unique_id="missing")
+    assert await get_tool_by_unique_id("missing") is not None
+
+
+@pytest.mark.asyncio
+async def test_mutations_invalidate_both_keys(collection):
+    await get_tool_by_unique_id("writer")
+    updated = dict(TOOL, name="Writer Pro")
+    _record_tool_mutation(TOOL, updated)
+
+    collection.find_one.return_value = updated
+    assert (await get_tool_by_id(TOOL["id"])).name == "Writer Pro"
+    assert collection.find_one.await_count == 2
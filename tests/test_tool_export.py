@@ -0,0 +1,64 @@
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.routes import _encode_ndjson
+from app.tools.tools_service import export_tools, objectid_to_uuid
+from helpers import AsyncCursor
+
+
+async def records(count):
+    for i in range(count):
+        yield {"id": str(i), "name": f"Tool {i}"}
+
+
+async def collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_is_chunked():
+    chunks = [chunk async for chunk in _encode_ndjson(records(100), False, chunk_size=256)]
+    assert len(chunks) > 1
+    lines = b"".join(chunks).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [str(i) for i in range(100)]
+
+
+@pytest.mark.asyncio
+async def test_gzip_stream_round_trips():
+    body = await collect(_encode_ndjson(records(50), True, chunk_size=128))
+    lines = gzip.decompress(body).decode().splitlines()
+    assert len(lines) == 50
+
+
+@pytest.mark.asyncio
+async def test_export_projects_and_filters_by_updated_since():
+    oid = ObjectId()
+    updated = datetime(2024, 5, 1)
+    collection = MagicMock()
+    collection.find.return_value = AsyncCursor(
+        [{"_id": oid, "name": "Legacy", "updated_at": updated}]
+    )
+
+    with patch("app.tools.tools_service.tools", collection):
+        exported = [record async for record in export_tools(updated_since=updated)]
+
+    query, projection = collection.find.call_args[0]
+    assert query == {"updated_at": {"$gte": updated}}
+    assert "_id" not in projection and projection["name"] == 1
+    assert exported == [
+        {
+            "id": str(objectid_to_uuid(oid)),
+            "name": "Legacy",
+            "updated_at": updated.isoformat(),
+        }
+    ]
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.http_cache import model_response
+from app.tools.models import SparseToolsResponse, ToolSummary
+from app.tools.tools_service import get_tools_page, parse_tool_fields
+
+
+def test_parse_tool_fields():
+    assert parse_tool_fields(None) is None
+    assert parse_tool_fields(" ") is None
+    assert parse_tool_fields("name, price,name,id") == ["name", "price"]
+    with pytest.raises(HTTPException) as exc:
+        parse_tool_fields("name,search_tokens")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_fields_are_projected_in_the_pipeline():
+    documents = [
+        {
+            "_id": ObjectId(),
+            "id": "0b7d6f6e-8a53-4c57-9d0e-3e1e0f7b2a11",
+            "unique_id": "writer",
+            "name": "Writer",
+            "has_description": 1,
+        },
+        {"_id": ObjectId(), "unique_id": "painter", "name": "Painter", "has_description": 1},
+    ]
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=documents)
+    collection = MagicMock()
+    collection.aggregate.return_value = cursor
+
+    with patch("app.tools.tools_service.tools", collection):
+        page = await get_tools_page(
+            limit=1, include_total=False, sort_by="name", fields=["name"]
+        )
+
+    pipeline = collection.aggregate.call_args[0][0]
+    assert pipeline[-1] == {
+        "$project": {"id": 1, "unique_id": 1, "name": 1, "has_description": 1, "_id": 1}
+    }
+    assert page["next_cursor"] is not None
+    assert [type(tool) for tool in page["tools"]] == [ToolSummary]
+    assert page["tools"][0].model_fields_set == {"id", "unique_id", "name"}
+
+
+def test_model_response_leaves_out_unset_fields_and_keeps_validators():
+    injected = Response()
+    injected.headers["ETag"] = '"abc"'
+    injected.headers["Cache-Control"] = "private, no-cache"
+    summary = ToolSummary(
+        id="0b7d6f6e-8a53-4c57-9d0e-3e1e0f7b2a11",
+        unique_id="writer",
+        updated_at=datetime(2024, 1, 1),
+    )
+
+    rendered = model_response(
+        SparseToolsResponse(tools=[summary], total=1, skip=0, limit=1), injected
+    )
+
+    body = json.loads(rendered.body)
+    assert body["tools"] == [
+        {
+            "id": "0b7d6f6e-8a53-4c57-9d0e-3e1e0f7b2a11",
+            "unique_id": "writer",
+            "updated_at": "2024-01-01T00:00:00",
+        }
+    ]
+    assert rendered.headers["ETag"] == '"abc"'
+    assert rendered.headers["Cache-Control"] == "private, no-cache"
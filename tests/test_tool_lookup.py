@@ -0,0 +1,41 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from bson import ObjectId
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.setup import backfill_tool_ids
+from app.tools.tools_service import get_tool_by_id, objectid_to_uuid
+from helpers import AsyncCursor
+
+
+@pytest.mark.asyncio
+async def test_backfill_sets_derived_ids_in_batches():
+    oids = [ObjectId() for _ in range(5)]
+    collection = MagicMock()
+    collection.find.return_value = AsyncCursor([{"_id": oid} for oid in oids])
+    collection.bulk_write = AsyncMock()
+
+    with patch("app.database.setup.database") as database:
+        database.tools = collection
+        assert await backfill_tool_ids(batch_size=2) == 5
+
+    assert collection.bulk_write.await_count == 3
+    first_op = collection.bulk_write.call_args_list[0][0][0][0]
+    assert first_op._doc == {"$set": {"id": str(objectid_to_uuid(oids[0]))}}
+
+
+@pytest.mark.asyncio
+async def test_unknown_id_is_a_single_lookup():
+    collection = MagicMock()
+    collection.find_one = AsyncMock(return_value=None)
+    with patch("app.tools.tools_service.tools", collection):
+        assert await get_tool_by_id(uuid4()) is None
+
+    collection.find_one.assert_awaited_once()
+    collection.find.assert_not_called()
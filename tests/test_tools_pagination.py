@@ -0,0 +1,229 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.tools_service import (
+    _build_keyset_filter,
+    _build_sort_spec,
+    _build_tools_pipeline,
+    decode_cursor,
+    encode_cursor,
+    get_tools,
+    get_tools_page,
+    tool_count_cache,
+    _record_tool_mutation,
+)
+
+
+def matches(doc, query):
+    """Evaluate the subset of MongoDB query syntax used by keyset filters."""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(key)
+            for op, operand in condition.items():
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$exists" and (key in doc) != operand:
+                    return False
+                if op == "$gt" and (value is None or not value > operand):
+                    return False
+                if op == "$lt" and (value is None or not value < operand):
+                    return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+def sort_docs(docs, sort_spec):
+    """Sort like MongoDB: null and missing values sort before everything else."""
+    result = list(docs)
+    for field, direction in reversed(sort_spec):
+        result.sort(
+            key=lambda doc: (doc.get(field) is not None, doc.get(field) or 0),
+            reverse=direction == -1,
+        )
+    return result
+
+
+def paginate(docs, sort_spec, limit):
+    ordered = sort_docs(docs, sort_spec)
+    pages, cursor = [], None
+    while True:
+        candidates = ordered
+        if cursor:
+            keyset = _build_keyset_filter(sort_spec, decode_cursor(cursor, sort_spec))
+            candidates = [doc for doc in ordered if matches(doc, keyset)]
+        page = candidates[: limit + 1]
+        if len(page) > limit:
+            page = page[:limit]
+            cursor = encode_cursor(page[-1], sort_spec)
+            pages.append(page)
+        else:
+            pages.append(page)
+            return ordered, pages
+
+
+@pytest.fixture
+def docs():
+    now = datetime(2024, 1, 1)
+    names = ["b", "a", None, "c", "a", "d", None, "b", "e", "a"]
+    return [
+        {
+            "_id": ObjectId(),
+            "name": name,
+            "has_description": i % 3 != 0,
+            "created_at": now + timedelta(minutes=i % 4),
+        }
+        for i, name in enumerate(names)
+    ]
+
+
+@pytest.mark.parametrize(
+    "sort_by,sort_order",
+    [(None, "asc"), ("name", "asc"), ("name", "desc"), ("created_at", "desc")],
+)
+def test_keyset_pages_cover_the_sorted_listing(docs, sort_by, sort_order):
+    sort_spec = _build_sort_spec(sort_by, sort_order)
+    ordered, pages = paginate(docs, sort_spec, limit=3)
+    flattened = [doc["_id"] for page in pages for doc in page]
+    assert flattened == [doc["_id"] for doc in ordered]
+
+
+def test_cursor_round_trip_preserves_types(docs):
+    sort_spec = _build_sort_spec("created_at", "desc")
+    values = decode_cursor(encode_cursor(docs[0], sort_spec), sort_spec)
+    assert values == [docs[0]["has_description"], docs[0]["created_at"], docs[0]["_id"]]
+
+
+def test_cursor_rejects_other_sort_orders(docs):
+    cursor = encode_cursor(docs[0], _build_sort_spec("name", "asc"))
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, _build_sort_spec("name", "desc"))
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", _build_sort_spec("name", "asc"))
+
+
+def test_pipeline_sorts_before_paginating():
+    sort_spec = _build_sort_spec("name", "asc")
+    pipeline = _build_tools_pipeline({"price": "free"}, sort_spec, skip=20, limit=10)
+    stages = [next(iter(stage)) for stage in pipeline]
+    assert stages == ["$match", "$sort", "$skip", "$limit"]
+    assert list(pipeline[1]["$sort"].items()) == sort_spec
+
+
+def test_pipeline_with_cursor_ignores_skip(docs):
+    sort_spec = _build_sort_spec("name", "asc")
+    cursor = encode_cursor(docs[0], sort_spec)
+    pipeline = _build_tools_pipeline(
+        {"price": "free"}, sort_spec, skip=20, limit=10, cursor=cursor
+    )
+    assert [next(iter(stage)) for stage in pipeline] == ["$match", "$sort", "$limit"]
+    assert pipeline[0]["$match"]["$and"][0] == {"price": "free"}
+
+
+@pytest.fixture(autouse=True)
+def empty_count_cache():
+    tool_count_cache.clear()
+    yield
+    tool_count_cache.clear()
+
+
+def aggregate_returning(result):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=result)
+    collection = MagicMock()
+    collection.aggregate.return_value = cursor
+    collection.estimated_document_count = AsyncMock(return_value=42)
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_page_and_total_come_from_one_aggregation(docs):
+    collection = aggregate_returning([{"tools": docs[:3], "total": [{"count": 7}]}])
+    with patch("app.tools.tools_service.tools", collection), patch(
+        "app.tools.tools_service.create_tool_response",
+        AsyncMock(side_effect=lambda tool: tool),
+    ):
+        page = await get_tools_page(limit=2, filters={"price": "free"})
+
+    assert collection.aggregate.call_count == 1
+    collection.count_documents.assert_not_called()
+    pipeline = collection.aggregate.call_args[0][0]
+    assert pipeline[0] == {"$match": {"price": "free"}}
+    assert set(pipeline[1]["$facet"]) == {"tools", "total"}
+    assert page["total"] == 7
+    assert page["tools"] == docs[:2]
+    assert page["next_cursor"] is not None
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_still_count_the_whole_listing(docs):
+    sort_spec = _build_sort_spec(None, "asc")
+    cursor = encode_cursor(docs[0], sort_spec)
+    collection = aggregate_returning([{"tools": [], "total": []}])
+    with patch("app.tools.tools_service.tools", collection):
+        page = await get_tools_page(limit=2, filters={"price": "free"}, cursor=cursor)
+
+    pipeline = collection.aggregate.call_args[0][0]
+    assert pipeline[0] == {"$match": {"price": "free"}}
+    # The keyset filter only narrows the page branch, not the count
+    assert "$or" in pipeline[1]["$facet"]["tools"][0]["$match"]
+    assert page == {"tools": [], "total": 0, "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_listing_can_use_estimated_total():
+    collection = aggregate_returning([])
+    with patch("app.tools.tools_service.tools", collection):
+        page = await get_tools_page(limit=2, estimate_total=True)
+
+    pipeline = collection.aggregate.call_args[0][0]
+    assert [next(iter(stage)) for stage in pipeline] == ["$match", "$sort", "$limit"]
+    assert page["total"] == 42
+
+
+@pytest.mark.asyncio
+async def test_cached_count_skips_the_facet(docs):
+    collection = aggregate_returning([{"tools": docs[:1], "total": [{"count": 1}]}])
+    with patch("app.tools.tools_service.tools", collection), patch(
+        "app.tools.tools_service.create_tool_response",
+        AsyncMock(side_effect=lambda tool: tool),
+    ):
+        await get_tools_page(limit=2, filters={"price": "free"})
+        collection.aggregate.return_value.to_list = AsyncMock(return_value=docs[:1])
+        page = await get_tools_page(limit=2, filters={"price": "free"})
+
+    second_pipeline = collection.aggregate.call_args[0][0]
+    assert all("$facet" not in stage for stage in second_pipeline)
+    assert page["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tool_mutations_invalidate_cached_counts():
+    collection = aggregate_returning([])
+    collection.count_documents = AsyncMock(side_effect=[3, 4])
+    with patch("app.tools.tools_service.tools", collection), patch(
+        "app.tools.tools_service.facet_counter"
+    ):
+        assert await get_tools(count_only=True, filters={"price": "free"}) == 3
+        assert await get_tools(count_only=True, filters={"price": "free"}) == 3
+        assert collection.count_documents.call_count == 1
+
+        _record_tool_mutation(None, {"price": "free"})
+        assert await get_tools(count_only=True, filters={"price": "free"}) == 4
@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+from fastapi import Response
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.favorites import FavoriteCreate
+from app.services.favorites_service import (
+    UserFavoritesCache,
+    add_favorite,
+    remove_favorite,
+    user_favorites,
+)
+from app.tools.models import ToolBatchRequest
+from app.tools.routes import get_tools_batch
+from app.tools.tools_service import tool_cache
+from helpers import AsyncCursor, make_tool
+
+USER_ID = str(ObjectId())
+
+
+@pytest.fixture
+def favorites_collection():
+    user_favorites.clear()
+    collection = MagicMock()
+    collection.distinct = AsyncMock(return_value=["writer"])
+    with patch("app.services.favorites_service.favorites", collection):
+        yield collection
+    user_favorites.clear()
+
+
+@pytest.mark.asyncio
+async def test_favorites_set_is_loaded_once_per_user(favorites_collection):
+    assert await user_favorites.get(USER_ID) == {"writer"}
+    assert await user_favorites.get(USER_ID) == {"writer"}
+
+    favorites_collection.distinct.assert_awaited_once_with(
+        "tool_unique_id", {"user_id": USER_ID}
+    )
+
+
+@pytest.mark.asyncio
+async def test_cached_set_is_updated_in_place(favorites_collection):
+    await user_favorites.get(USER_ID)
+
+    user_favorites.add(USER_ID, "painter")
+    assert await user_favorites.get(USER_ID) == {"writer", "painter"}
+
+    user_favorites.discard(USER_ID, "writer")
+    assert await user_favorites.get(USER_ID) == {"painter"}
+    assert favorites_collection.distinct.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_over_users(favorites_collection):
+    cache = UserFavoritesCache(max_size=1)
+    await cache.get("first")
+    await cache.get("second")
+    await cache.get("first")
+
+    assert favorites_collection.distinct.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_add_and_remove_favorite_keep_the_set_current(favorites_collection):
+    await user_favorites.get(USER_ID)
+    favorites_collection.update_one = AsyncMock(
+        return_value=MagicMock(upserted_id=ObjectId())
+    )
+    favorites_collection.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+    users = MagicMock()
+    users.update_one = AsyncMock()
+
+    with patch(
+        "app.services.favorites_service.get_tool_by_unique_id",
+        AsyncMock(return_value=object()),
+    ), patch(
+        "app.services.favorites_service.adjust_saved_numbers", AsyncMock()
+    ), patch("app.services.favorites_service.users", users):
+        await add_favorite(USER_ID, FavoriteCreate(tool_unique_id="painter"))
+        assert await user_favorites.get(USER_ID) == {"writer", "painter"}
+
+        await remove_favorite(USER_ID, "writer")
+        assert await user_favorites.get(USER_ID) == {"painter"}
+
+    favorites_collection.distinct.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_marks_saved_tools(favorites_collection):
+    tool_cache.clear()
+    tools = MagicMock()
+    tools.find.return_value = AsyncCursor([make_tool("writer"), make_tool("painter")])
+
+    with patch("app.tools.tools_service.tools", tools):
+        rendered = await get_tools_batch(
+            ToolBatchRequest(unique_ids=["writer", "painter"]),
+            Response(),
+            current_user=MagicMock(id=USER_ID),
+        )
+    tool_cache.clear()
+
+    body = json.loads(rendered.body)
+    assert [tool["saved_by_user"] for tool in body["tools"]] == [True, False]
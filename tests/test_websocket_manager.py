@@ -0,0 +1,145 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to sys.path to allow importing from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.chat.streaming import STREAM_FORMAT_DELTA, STREAM_FORMAT_FULL
+from app.websocket import SLOW_CONSUMER_CLOSE_CODE, ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0, query_params=None, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.query_params = query_params or {}
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def connect(manager, websocket, chat_id=None):
+    await manager.connect(websocket)
+    if chat_id:
+        await manager.associate_chat(websocket, chat_id)
+    return manager.get_connection_by_websocket(websocket)["writer"]
+
+
+async def shutdown(manager, writers):
+    for connection in manager.active_connections:
+        manager.disconnect(connection["websocket"])
+    await asyncio.gather(*writers, return_exceptions=True)
+    await settle()
+
+
+@pytest.mark.asyncio
+async def test_connections_are_indexed_by_user_and_chat():
+    manager = ConnectionManager()
+    first = FakeWebSocket()
+    second = FakeWebSocket(query_params={"stream_format": STREAM_FORMAT_FULL})
+    writers = [await connect(manager, first), await connect(manager, second)]
+    await manager.associate_user(first, "alice")
+    await manager.associate_chat(first, "chat-1")
+    await manager.associate_chat(second, "chat-1")
+
+    assert [c["websocket"] for c in manager.get_connections_by_user("alice")] == [first]
+    assert {c["websocket"] for c in manager.get_connections_by_chat("chat-1")} == {
+        first,
+        second,
+    }
+    assert manager.get_connection_by_websocket(first)["stream_format"] == (
+        STREAM_FORMAT_DELTA
+    )
+    assert manager.get_connection_by_websocket(second)["stream_format"] == (
+        STREAM_FORMAT_FULL
+    )
+
+    # Moving to another chat leaves the old one
+    await manager.associate_chat(first, "chat-2")
+    assert [c["websocket"] for c in manager.get_connections_by_chat("chat-1")] == [second]
+
+    manager.disconnect(first)
+    manager.disconnect(first)
+    assert manager.get_connections_by_user("alice") == []
+    assert manager.get_connections_by_chat("chat-2") == []
+    assert len(manager.active_connections) == 1
+    await shutdown(manager, writers)
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_the_others():
+    manager = ConnectionManager()
+    slow, fast = FakeWebSocket(delay=10), FakeWebSocket()
+    writers = [await connect(manager, slow, "chat"), await connect(manager, fast, "chat")]
+
+    await asyncio.wait_for(manager.broadcast_to_chat({"n": 1}, "chat"), timeout=1)
+    await settle()
+
+    assert fast.sent == ['{"n": 1}']
+    assert slow.sent == []
+    await shutdown(manager, writers)
+
+
+@pytest.mark.asyncio
+async def test_client_with_a_full_queue_is_dropped():
+    manager = ConnectionManager(queue_size=2)
+    slow = FakeWebSocket(delay=10)
+    writers = [await connect(manager, slow, "chat")]
+
+    for n in range(4):
+        await manager.broadcast_to_chat({"n": n}, "chat")
+    await settle()
+
+    assert manager.get_connections_by_chat("chat") == []
+    assert manager.dropped == 1
+    assert slow.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    await shutdown(manager, writers)
+
+
+@pytest.mark.asyncio
+async def test_failed_send_drops_the_client():
+    manager = ConnectionManager()
+    broken = FakeWebSocket(fail=True)
+    writers = [await connect(manager, broken)]
+
+    await manager.send_personal_json({"type": "connected"}, broken)
+    await settle()
+
+    assert manager.get_connection_by_websocket(broken) is None
+    assert manager.dropped == 1
+    await shutdown(manager, writers)
+
+
+@pytest.mark.asyncio
+async def test_messages_keep_their_order_per_connection():
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    writers = [await connect(manager, websocket)]
+
+    for n in range(50):
+        await manager.send_personal_message(str(n), websocket)
+    while len(websocket.sent) < 50:
+        await asyncio.sleep(0)
+
+    assert websocket.sent == [str(n) for n in range(50)]
+    await shutdown(manager, writers)